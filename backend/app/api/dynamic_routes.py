@@ -4,13 +4,21 @@ Endpoints for personalized learning paths
 """
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
+from app.models import models
 from app.services.nvidia_service import nvidia_llm_service
+from app.services.question_bank import get_question_bank
+from app.services.band_series import load_series
+from app.services.progress import ProgressEvent, record_band_point, record_event, progress_summary
 import json
+import zlib
 
 router = APIRouter()
 
@@ -28,13 +36,24 @@ class DailyPracticeRequest(BaseModel):
     user_id: int
     date: str
     part: int  # 1, 2, or 3
+    difficulty: Optional[str] = None  # foundation, intermediate, advanced
+
+# Static tips served with bank practice content
+PRACTICE_TIPS = {
+    1: ["Answer directly, then add a reason or an example", "Keep answers to two or three sentences"],
+    2: ["Use the minute to note one idea per point", "Keep talking until the examiner stops you"],
+    3: ["Give your opinion, then justify it", "Compare the past, present and future where you can"],
+}
 
 class ProgressUpdateRequest(BaseModel):
     user_id: int
-    activity_type: str  # practice, quiz, vocabulary
+    activity_type: str  # practice, mock_test, quiz, vocabulary
     score: Optional[float] = None
     duration: int  # minutes
     notes: Optional[str] = None
+    part: Optional[int] = None  # practice of a single part is counted as part1/part2/part3
+    target_band: Optional[float] = None
+    language: str = "English"
 
 # Generate Personalized Roadmap
 @router.post("/roadmap/generate")
@@ -116,8 +135,30 @@ Return JSON:
 async def get_daily_practice(request: DailyPracticeRequest):
     """
     Get dynamic practice content for a specific day and part
+    
+    Served from the question bank (topic rotates by day, questions the
+    learner has already seen are skipped); the LLM is only used when the
+    bank has nothing for the part
     """
     try:
+        bank = get_question_bank()
+        topics = bank.topics(request.part)
+        if topics:
+            topic = topics[zlib.crc32(f"{request.user_id}:{request.date}".encode()) % len(topics)]
+            difficulty = request.difficulty or "intermediate"
+            content = {
+                "topic": topic,
+                "tips": PRACTICE_TIPS.get(request.part, []),
+                "vocabulary": [],
+                "expected_duration": "3-4" if request.part == 2 else "4-5"
+            }
+            if request.part == 2:
+                content["cue_card"] = bank.draw(2, topic, difficulty, request.user_id)["cue_card"]
+            else:
+                items = bank.draw_many(request.part, topic, 5, difficulty, request.user_id)
+                content["questions"] = [item["question"] for item in items]
+            return {"part": request.part, "date": request.date, "content": content}
+        
         prompt = f"""Generate IELTS Speaking Part {request.part} practice content.
 
 Part {request.part} Requirements:
@@ -168,60 +209,51 @@ Return JSON:
 
 # Track Progress
 @router.post("/progress/update")
-async def update_progress(request: ProgressUpdateRequest):
+async def update_progress(request: ProgressUpdateRequest, db: AsyncSession = Depends(get_async_db)):
     """
-    Update user's progress after completing an activity
+    Update user's progress after completing an activity (one row, O(1))
     """
-    # In a real app, this would save to database
+    activity_type = request.activity_type
+    if activity_type == "practice" and request.part in (1, 2, 3):
+        activity_type = f"part{request.part}"
+    
+    event = ProgressEvent(
+        user_id=request.user_id,
+        activity_type=activity_type,
+        score=request.score,
+        duration_minutes=request.duration,
+        language=request.language,
+        target_band=request.target_band
+    )
+    try:
+        await record_event(db, event)
+        await record_band_point(db, event)
+        await db.commit()
+    except IntegrityError:
+        # Racing first events are absorbed by the upsert; this is the users FK
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="User not found")
+    
     return {
         "success": True,
         "message": "Progress updated",
         "user_id": request.user_id,
-        "activity_type": request.activity_type,
+        "activity_type": activity_type,
         "timestamp": datetime.now().isoformat()
     }
 
 # Get User Progress
 @router.get("/progress/{user_id}")
-async def get_user_progress(user_id: int):
+async def get_user_progress(user_id: int, language: str = "English", db: AsyncSession = Depends(get_async_db)):
     """
-    Get user's overall progress and statistics
+    Get user's overall progress and statistics (progress row and band series, two indexed lookups)
     """
-    try:
-        # In a real app, fetch from database
-        # For now, return dynamic mock data
-        return {
-            "user_id": user_id,
-            "current_band": 6.5,
-            "target_band": 7.5,
-            "progress_percentage": 65,
-            "stats": {
-                "total_practice_sessions": 24,
-                "total_hours": 18,
-                "current_streak": 7,
-                "completed_activities": {
-                    "part1": 10,
-                    "part2": 8,
-                    "part3": 6,
-                    "vocabulary": 15,
-                    "mock_tests": 2
-                }
-            },
-            "recent_scores": [
-                {"date": "2025-12-25", "part": 1, "band": 6.5},
-                {"date": "2025-12-27", "part": 2, "band": 7.0},
-                {"date": "2025-12-29", "part": 3, "band": 6.5}
-            ],
-            "next_milestone": "Complete 30 practice sessions",
-            "recommendations": [
-                "Focus on Part 3 abstract questions",
-                "Expand vocabulary range",
-                "Practice complex sentence structures"
-            ]
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    progress = await db.scalar(
+        select(models.UserProgress)
+        .where(models.UserProgress.user_id == user_id)
+        .where(models.UserProgress.language == language)
+    )
+    return progress_summary(user_id, progress, series=await load_series(db, user_id))
 
 # Get Coming Soon Features
 @router.get("/features/coming-soon")
@@ -3,30 +3,51 @@ IELTS Agentic AI API Routes
 Endpoints for multi-agent IELTS speaking coach
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Literal
 from app.db.database import get_db
 from app.services.agent_orchestrator import agent_orchestrator
+from app.services.transcript_analysis import analyze_transcript, quick_feedback
+from app.services.audio_storage import discard, save_stream, turn_audio_path, UploadTooLarge
+from app.services.live_audio import LiveFluencyTracker, FRAME_MS
+from app.core.config import settings
 from pydantic import BaseModel
+import asyncio
+import json
 
 router = APIRouter()
 
+# Bounds CPU-heavy audio analysis running in the threadpool
+audio_analysis_slots = asyncio.Semaphore(settings.audio_analysis_concurrency)
+
+# Accepted sample rates for uploaded and streamed PCM
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 48000
+
 # Request/Response Models
 class StartSessionRequest(BaseModel):
     user_id: int
     session_type: str = "practice"  # practice|mock|exam
     user_profile: Dict[str, Any] = {}
+    incremental_scoring: bool = True  # score each turn as it arrives
 
 class UserResponseRequest(BaseModel):
     session_id: str
     user_response: str
     transcript_metadata: Dict[str, Any] = {}
 
+class PartialTranscriptRequest(BaseModel):
+    text: str
+    elapsed_seconds: Optional[float] = None
+
 class EndSessionRequest(BaseModel):
     session_id: str
     full_transcript: str
     metadata: Dict[str, Any] = {}
+    # None: incremental aggregation if available, else auto
+    scoring_mode: Optional[Literal["auto", "fused", "multi_agent"]] = None
 
 class StudyPlanRequest(BaseModel):
     user_id: int
@@ -41,6 +62,10 @@ class ContentIdeasRequest(BaseModel):
 class CueCardRequest(BaseModel):
     user_profile: Dict[str, Any] = {}
 
+class QuickFeedbackRequest(BaseModel):
+    transcript: str
+    duration_seconds: Optional[float] = None
+
 # IELTS Speaking Session Endpoints
 @router.post("/ielts/session/start")
 def start_ielts_session(request: StartSessionRequest):
@@ -56,7 +81,8 @@ def start_ielts_session(request: StartSessionRequest):
         result = agent_orchestrator.start_speaking_session(
             user_id=request.user_id,
             user_profile=request.user_profile,
-            session_type=request.session_type
+            session_type=request.session_type,
+            incremental_scoring=request.incremental_scoring
         )
         return result
     except Exception as e:
@@ -83,6 +109,19 @@ def process_user_response(request: UserResponseRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/ielts/session/{session_id}/partial-transcript")
+def submit_partial_transcript(session_id: str, request: PartialTranscriptRequest):
+    """
+    Partial transcript of the answer in progress
+    Lets the server prepare the examiner's next question before the turn ends
+    """
+    try:
+        return agent_orchestrator.speculate_next_question(
+            session_id, request.text, request.elapsed_seconds
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 @router.post("/ielts/session/end")
 def end_session_and_score(request: EndSessionRequest):
     """
@@ -102,7 +141,8 @@ def end_session_and_score(request: EndSessionRequest):
         result = agent_orchestrator.end_session_and_score(
             session_id=request.session_id,
             full_transcript=request.full_transcript,
-            metadata=request.metadata
+            metadata=request.metadata,
+            scoring_mode=request.scoring_mode
         )
         return result
     except ValueError as e:
@@ -110,6 +150,150 @@ def end_session_and_score(request: EndSessionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.put("/ielts/session/{session_id}/turns/{turn_index}/audio")
+async def upload_turn_audio(
+    session_id: str,
+    turn_index: int,
+    request: Request,
+    sample_rate: Optional[int] = Query(None, ge=MIN_SAMPLE_RATE, le=MAX_SAMPLE_RATE)
+):
+    """
+    Upload the recording of one speaking turn
+    
+    Send the audio as the raw request body: a PCM WAV file, or raw 16-bit
+    mono PCM together with ?sample_rate=. The body is streamed to disk in
+    chunks, then memory-mapped for prosody analysis. The resulting features
+    feed the fluency, pronunciation and confidence agents for that turn.
+    Recordings that fail analysis are deleted; the rest are kept for
+    AUDIO_RETENTION_HOURS.
+    """
+    try:
+        await run_in_threadpool(agent_orchestrator.get_session, session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if turn_index < 0:
+        raise HTTPException(status_code=422, detail="turn_index must be >= 0")
+    
+    extension = "pcm" if sample_rate else "wav"
+    try:
+        path = turn_audio_path(session_id, turn_index, extension)
+        size = await save_stream(
+            request.stream(),
+            path,
+            max_bytes=settings.audio_max_upload_mb * 1024 * 1024
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        async with audio_analysis_slots:
+            features = await run_in_threadpool(
+                agent_orchestrator.process_turn_audio_file,
+                session_id, turn_index, path, sample_rate
+            )
+    except ValueError as e:
+        await run_in_threadpool(discard, path)
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        await run_in_threadpool(discard, path)
+        raise
+    
+    return {
+        "session_id": session_id,
+        "turn_index": turn_index,
+        "bytes": size,
+        "features": features
+    }
+
+@router.websocket("/ielts/session/{session_id}/live")
+async def live_turn_audio(
+    websocket: WebSocket,
+    session_id: str,
+    sample_rate: int = 16000,
+    part: Optional[int] = None
+):
+    """
+    Stream a speaking turn while the learner is talking
+    
+    Binary messages are raw 16-bit mono PCM frames. Text messages are JSON:
+    {"type": "transcript", "text": "..."} with the partial transcript so far,
+    and {"type": "end_turn"} once the learner stops. Live indicators (silence,
+    pauses, words per minute) are pushed back as the audio arrives; at the end
+    of each turn the running statistics are stored for the agents and sent as
+    {"type": "turn_stats"}. The socket can carry several turns in a row.
+    """
+    await websocket.accept()
+    if not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+        await websocket.close(
+            code=4400, reason=f"sample_rate must be between {MIN_SAMPLE_RATE} and {MAX_SAMPLE_RATE}"
+        )
+        return
+    try:
+        session = await run_in_threadpool(agent_orchestrator.get_session, session_id)
+    except ValueError:
+        await websocket.close(code=4404, reason="Invalid session ID")
+        return
+    
+    def new_tracker() -> LiveFluencyTracker:
+        return LiveFluencyTracker(sample_rate, part or session["exam"]["part"])
+    
+    tracker = new_tracker()
+    push_every = max(1, settings.live_indicator_interval_ms // FRAME_MS)
+    next_push = push_every
+    
+    async def end_turn() -> Dict[str, Any]:
+        # The session may have moved on (or ended) on another worker meanwhile
+        recorded = await run_in_threadpool(
+            agent_orchestrator.record_live_stats, session_id, None, tracker.snapshot()
+        )
+        return {"type": "turn_stats", **recorded}
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            
+            if message.get("bytes") is not None:
+                tracker.feed(message["bytes"])
+                if tracker.frames >= next_push:
+                    next_push = tracker.frames + push_every
+                    await websocket.send_json(tracker.indicators())
+                continue
+            
+            try:
+                event = json.loads(message.get("text") or "")
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Expected JSON text messages"})
+                continue
+            
+            if event.get("type") == "transcript":
+                text = str(event.get("text", ""))
+                tracker.set_transcript(text)
+                await run_in_threadpool(
+                    agent_orchestrator.speculate_next_question, session_id, text, tracker.elapsed_seconds
+                )
+                await websocket.send_json(tracker.indicators())
+            elif event.get("type") == "end_turn":
+                try:
+                    await websocket.send_json(await end_turn())
+                except ValueError:
+                    await websocket.close(code=4404, reason="Session has ended")
+                    return
+                tracker = new_tracker()
+                next_push = push_every
+            else:
+                await websocket.send_json({"type": "error", "detail": f"Unknown message type: {event.get('type')}"})
+    except WebSocketDisconnect:
+        # Keep what was streamed if the client hung up mid-turn
+        if tracker.frames and session_id in agent_orchestrator.active_sessions:
+            try:
+                await end_turn()
+            except ValueError:
+                pass  # the session ended meanwhile
+
 # Study Planning Endpoints
 @router.post("/ielts/study-plan/generate")
 def generate_study_plan(request: StudyPlanRequest):
@@ -123,7 +307,8 @@ def generate_study_plan(request: StudyPlanRequest):
         plan = agent_orchestrator.generate_study_plan(
             user_profile=request.user_profile,
             target_band=request.target_band,
-            available_days=request.available_days
+            available_days=request.available_days,
+            user_id=request.user_id
         )
         return plan
     except Exception as e:
@@ -163,6 +348,17 @@ def generate_cue_card(request: CueCardRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/ielts/feedback/quick")
+def get_quick_feedback(request: QuickFeedbackRequest):
+    """
+    Instant feedback from locally computed transcript features
+    
+    No agents involved: fillers, speech rate, lexical diversity,
+    repetitions and sentence complexity are measured in-process
+    """
+    features = analyze_transcript(request.transcript, request.duration_seconds)
+    return quick_feedback(features)
+
 # Agent Status Endpoints
 @router.get("/ielts/agents/status")
 def get_agents_status():
@@ -174,9 +370,20 @@ def get_agents_status():
         "coach": agent_orchestrator.coach.state.dict(),
         "confidence": agent_orchestrator.confidence.state.dict(),
         "content": agent_orchestrator.content.state.dict(),
-        "reflection": agent_orchestrator.reflection.state.dict()
+        "reflection": agent_orchestrator.reflection.state.dict(),
+        "semantic_cache": agent_orchestrator.content.cache.metrics()
     }
 
+@router.get("/ielts/users/{user_id}/sessions")
+def get_recent_sessions(user_id: int, limit: int = Query(3, ge=1, le=50)):
+    """A user's last completed sessions with their band scores, newest first"""
+    return {"sessions": agent_orchestrator.recent_sessions(user_id, limit)}
+
+@router.get("/ielts/users/{user_id}/bands")
+def get_band_series(user_id: int, limit: int = Query(100, ge=1, le=1000)):
+    """A user's overall and per-criterion bands over time, with trend and projection"""
+    return agent_orchestrator.band_chart(user_id, limit)
+
 @router.get("/ielts/sessions/active")
 def get_active_sessions():
     """Get all active sessions"""
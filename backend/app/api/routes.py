@@ -1,72 +1,99 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
 from typing import List
+from datetime import datetime
 from app.models import models
 from app.schemas import schemas
-from app.db.database import get_db
+from app.db.database import get_async_db, get_async_sessionmaker, async_engine, engine, pool_status
+from app.db.write_behind import WriteBehindQueue, get_write_behind
+from app.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset_page
 from app.services.nvidia_service import nvidia_llm_service
+from app.services.lexicon import tag_vocabulary
+from app.services.near_duplicates import get_near_duplicate_index
+from app.services.progress import ProgressEvent, record_event
+from app.services.spaced_repetition import review_item
 from fastapi.responses import StreamingResponse
 import json
 
 router = APIRouter()
 
+# Generated vocabulary: words requested per missing word, and request rounds
+VOCABULARY_OVERGENERATE = 2
+VOCABULARY_ROUNDS = 3
+
+async def _page(db, query, model, response, cursor, limit, descending=True):
+    """Keyset page of query; the next cursor goes into a response header"""
+    try:
+        rows, next_cursor = await keyset_page(db, query, model, cursor, limit, descending)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
+
 # Conversation Practice Endpoints
 @router.post("/conversations/", response_model=schemas.ConversationResponse)
-def create_conversation(
+async def create_conversation(
     conversation: schemas.ConversationCreate,
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new conversation session"""
     db_conversation = models.Conversation(
         user_id=user_id,
         language=conversation.language,
-        level=conversation.level
+        level=conversation.level,
+        messages=[]
     )
     db.add(db_conversation)
-    db.commit()
-    db.refresh(db_conversation)
+    await record_event(db, ProgressEvent(
+        user_id=user_id, activity_type="conversation", language=conversation.language
+    ))
+    await db.commit()
     return db_conversation
 
 @router.post("/conversations/{conversation_id}/messages")
-def send_message(
+async def send_message(
     conversation_id: int,
     message: schemas.MessageCreate,
-    db: Session = Depends(get_db)
+    sessions: async_sessionmaker = Depends(get_async_sessionmaker),
+    writes: WriteBehindQueue = Depends(get_write_behind)
 ):
     """Send a message and get AI response"""
-    # Get conversation
-    conversation = db.query(models.Conversation).filter(
-        models.Conversation.id == conversation_id
-    ).first()
-    
-    if not conversation:
-        raise HTTPException(status_code=404, detail="Conversation not found")
+    # Short read: get conversation
+    async with sessions() as db:
+        conversation = await db.get(models.Conversation, conversation_id)
+        
+        if not conversation:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        language, level = conversation.language, conversation.level
     
-    # Save user message
-    user_message = models.Message(
+    # Messages are append-only, written behind in batches
+    writes.add(
+        models.Message,
         conversation_id=conversation_id,
         role="user",
         content=message.content
     )
-    db.add(user_message)
-    db.commit()
     
-    # Get AI response
-    ai_response = nvidia_llm_service.practice_conversation(
+    # Get AI response, no connection is held while waiting
+    ai_response = await run_in_threadpool(
+        nvidia_llm_service.practice_conversation,
         message.content,
-        conversation.language,
-        conversation.level
+        language,
+        level
     )
     
     # Save AI message
-    ai_message = models.Message(
+    writes.add(
+        models.Message,
         conversation_id=conversation_id,
         role="assistant",
         content=ai_response
     )
-    db.add(ai_message)
-    db.commit()
     
     return {
         "user_message": message.content,
@@ -74,64 +101,148 @@ def send_message(
     }
 
 @router.get("/conversations/{conversation_id}", response_model=schemas.ConversationResponse)
-def get_conversation(conversation_id: int, db: Session = Depends(get_db)):
+async def get_conversation(
+    conversation_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    writes: WriteBehindQueue = Depends(get_write_behind)
+):
     """Get conversation with all messages"""
-    conversation = db.query(models.Conversation).filter(
-        models.Conversation.id == conversation_id
-    ).first()
+    await writes.flush_if_pending(models.Message, conversation_id=conversation_id)
+    conversation = await db.scalar(
+        select(models.Conversation)
+        .where(models.Conversation.id == conversation_id)
+        .options(selectinload(models.Conversation.messages))
+    )
     
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
     return conversation
 
-@router.get("/users/{user_id}/conversations", response_model=List[schemas.ConversationResponse])
-def get_user_conversations(user_id: int, db: Session = Depends(get_db)):
-    """Get all conversations for a user"""
-    conversations = db.query(models.Conversation).filter(
-        models.Conversation.user_id == user_id
-    ).all()
-    return conversations
+@router.get("/conversations/{conversation_id}/messages", response_model=List[schemas.MessageResponse])
+async def get_conversation_messages(
+    conversation_id: int,
+    response: Response,
+    cursor: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    writes: WriteBehindQueue = Depends(get_write_behind)
+):
+    """Page through a conversation's messages, oldest first"""
+    await writes.flush_if_pending(models.Message, conversation_id=conversation_id)
+    query = select(models.Message).where(models.Message.conversation_id == conversation_id)
+    return await _page(db, query, models.Message, response, cursor, limit, descending=False)
+
+@router.get(
+    "/users/{user_id}/conversations",
+    response_model=List[schemas.ConversationListItem],
+    response_model_exclude_none=True
+)
+async def get_user_conversations(
+    user_id: int,
+    response: Response,
+    cursor: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_messages: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    writes: WriteBehindQueue = Depends(get_write_behind)
+):
+    """Page through a user's conversations, newest first"""
+    query = select(models.Conversation).where(models.Conversation.user_id == user_id)
+    if include_messages:
+        # One batched IN query for the messages of the whole page
+        await writes.flush_if_pending(models.Message)
+        query = query.options(selectinload(models.Conversation.messages))
+    conversations = await _page(db, query, models.Conversation, response, cursor, limit)
+    if include_messages:
+        return [schemas.ConversationResponse.model_validate(c) for c in conversations]
+    return [schemas.ConversationSummary.model_validate(c) for c in conversations]
 
 # Grammar Correction Endpoints
 @router.post("/grammar/correct", response_model=schemas.GrammarCorrectionResponse)
-def correct_grammar(
+async def correct_grammar(
     request: schemas.GrammarCorrectionRequest,
     user_id: int = None,
-    db: Session = Depends(get_db)
+    writes: WriteBehindQueue = Depends(get_write_behind)
 ):
     """Correct grammar and provide explanations"""
-    result = nvidia_llm_service.grammar_correction(request.text, request.language)
+    result = await run_in_threadpool(
+        nvidia_llm_service.grammar_correction, request.text, request.language
+    )
     
-    # Save to database
-    correction = models.GrammarCorrection(
+    # Correction log is append-only, written behind in batches
+    writes.add(
+        models.GrammarCorrection,
         user_id=user_id,
         original_text=request.text,
         corrected_text=result.get("corrected", ""),
         mistakes=result.get("mistakes", []),
         language=request.language
     )
-    db.add(correction)
-    db.commit()
     
     return result
 
 # Vocabulary Endpoints
 @router.post("/vocabulary/generate", response_model=List[schemas.VocabularyWord])
 def generate_vocabulary(request: schemas.VocabularyRequest):
-    """Generate vocabulary words for a topic"""
-    words = nvidia_llm_service.vocabulary_builder(
-        request.topic,
-        request.language,
-        request.count
-    )
+    """
+    Generate vocabulary words for a topic. The CEFR band goes into the prompt
+    and each round over-generates, so level and near-repeat filtering still
+    leave `count` words; short rounds are topped up, extras are cut.
+    """
+    english = request.language.lower() == "english"
+    band = _level_band(request.min_level, request.max_level) if english else None
+    index = get_near_duplicate_index() if request.user_id is not None else None
+    kind = f"vocabulary:{request.language.lower()}"
+
+    words, chosen = [], set()
+    for _ in range(VOCABULARY_ROUNDS):
+        missing = request.count - len(words)
+        batch = nvidia_llm_service.vocabulary_builder(
+            request.topic,
+            request.language,
+            missing * VOCABULARY_OVERGENERATE,
+            band,
+            [w["word"] for w in words]
+        )
+        # CEFR tagging and level filtering come from the local lexicon (English only)
+        if english:
+            batch = tag_vocabulary(batch, request.min_level, request.max_level)
+        accepted = 0
+        for w in batch:
+            word = str(w.get("word") or "").strip()
+            if not word or word.lower() in chosen:
+                continue
+            # Drop near-repeats of words this learner was already given; recorded
+            # as soon as accepted, so near-repeats within this batch are dropped too
+            if index is not None:
+                if not index.is_novel_for_user(request.user_id, word, kind):
+                    continue
+                index.record_seen(request.user_id, word, kind)
+            chosen.add(word.lower())
+            words.append(w)
+            accepted += 1
+            if len(words) == request.count:
+                return words
+        if not accepted:
+            break
     return words
 
+def _level_band(min_level, max_level):
+    """CEFR band for the prompt: "B2", "B1-C1", "B2 or above", "up to B1" """
+    if min_level and max_level:
+        return min_level if min_level == max_level else f"{min_level}-{max_level}"
+    if min_level:
+        return f"{min_level} or above"
+    if max_level:
+        return f"up to {max_level}"
+    return None
+
 @router.post("/vocabulary/save", response_model=schemas.VocabularyItemResponse)
-def save_vocabulary(
+async def save_vocabulary(
     item: schemas.VocabularyItemCreate,
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Save a vocabulary item to user's collection"""
     db_item = models.VocabularyItem(
@@ -139,57 +250,117 @@ def save_vocabulary(
         **item.dict()
     )
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    await record_event(db, ProgressEvent(
+        user_id=user_id, activity_type="vocabulary", language=item.language
+    ))
+    await db.commit()
+    await db.refresh(db_item)
     return db_item
 
 @router.get("/users/{user_id}/vocabulary", response_model=List[schemas.VocabularyItemResponse])
-def get_user_vocabulary(
+async def get_user_vocabulary(
     user_id: int,
+    response: Response,
     language: str = None,
-    db: Session = Depends(get_db)
+    cursor: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get user's vocabulary collection"""
-    query = db.query(models.VocabularyItem).filter(
+    """Page through a user's vocabulary collection, newest first"""
+    query = select(models.VocabularyItem).where(
         models.VocabularyItem.user_id == user_id
     )
     
     if language:
-        query = query.filter(models.VocabularyItem.language == language)
+        query = query.where(models.VocabularyItem.language == language)
     
-    return query.all()
+    return await _page(db, query, models.VocabularyItem, response, cursor, limit)
+
+@router.get("/users/{user_id}/vocabulary/due", response_model=List[schemas.VocabularyItemResponse])
+async def get_due_vocabulary(
+    user_id: int,
+    language: str = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """The next vocabulary items due for review, most overdue first"""
+    query = select(models.VocabularyItem).where(
+        models.VocabularyItem.user_id == user_id,
+        models.VocabularyItem.next_due_at <= datetime.utcnow()
+    )
+    
+    if language:
+        query = query.where(models.VocabularyItem.language == language)
+    
+    items = await db.scalars(
+        query.order_by(models.VocabularyItem.next_due_at, models.VocabularyItem.id).limit(limit)
+    )
+    return items.all()
+
+@router.post("/vocabulary/reviews", response_model=List[schemas.VocabularyItemResponse])
+async def submit_vocabulary_reviews(
+    batch: schemas.VocabularyReviewBatch,
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Grade many reviewed items and reschedule them in one transaction"""
+    item_ids = {review.item_id for review in batch.reviews}
+    items = {
+        item.id: item
+        for item in await db.scalars(
+            select(models.VocabularyItem)
+            .where(models.VocabularyItem.user_id == user_id)
+            .where(models.VocabularyItem.id.in_(item_ids))
+            .with_for_update()
+        )
+    }
+    
+    missing = sorted(item_ids - items.keys())
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Vocabulary items not found: {missing}")
+    
+    # Applied in submission order, so repeated reviews of an item compound
+    for review in batch.reviews:
+        review_item(items[review.item_id], review.quality, review.reviewed_at)
+    await db.commit()
+    
+    return list(items.values())
 
 # Quiz Endpoints
 @router.post("/quiz/generate", response_model=schemas.QuizResponse)
-def generate_quiz(request: schemas.QuizRequest, db: Session = Depends(get_db)):
+async def generate_quiz(
+    request: schemas.QuizRequest,
+    sessions: async_sessionmaker = Depends(get_async_sessionmaker)
+):
     """Generate a language quiz"""
-    quiz_data = nvidia_llm_service.generate_quiz(
+    quiz_data = await run_in_threadpool(
+        nvidia_llm_service.generate_quiz,
         request.topic,
         request.language,
         request.difficulty
     )
     
-    # Save quiz to database
-    db_quiz = models.Quiz(
-        title=quiz_data.get("title", request.topic),
-        topic=request.topic,
-        language=request.language,
-        difficulty=request.difficulty,
-        questions=quiz_data.get("questions", [])
-    )
-    db.add(db_quiz)
-    db.commit()
+    # Save quiz to database once the LLM is done
+    async with sessions.begin() as db:
+        db.add(models.Quiz(
+            title=quiz_data.get("title", request.topic),
+            topic=request.topic,
+            language=request.language,
+            difficulty=request.difficulty,
+            questions=quiz_data.get("questions", [])
+        ))
     
     return quiz_data
 
 @router.post("/quiz/submit", response_model=schemas.QuizAttemptResponse)
-def submit_quiz(
+async def submit_quiz(
     attempt: schemas.QuizAttemptCreate,
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    writes: WriteBehindQueue = Depends(get_write_behind)
 ):
     """Submit quiz answers and get score"""
-    quiz = db.query(models.Quiz).filter(models.Quiz.id == attempt.quiz_id).first()
+    quiz = await db.get(models.Quiz, attempt.quiz_id)
     
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
@@ -205,18 +376,20 @@ def submit_quiz(
     
     score = (correct / total) * 100 if total > 0 else 0
     
-    # Save attempt
-    db_attempt = models.QuizAttempt(
+    # Save attempt behind the response; the id is assigned on flush
+    row = writes.add(
+        models.QuizAttempt,
         user_id=user_id,
         quiz_id=attempt.quiz_id,
         score=score,
         answers=attempt.answers
     )
-    db.add(db_attempt)
-    db.commit()
-    db.refresh(db_attempt)
+    await record_event(db, ProgressEvent(
+        user_id=user_id, activity_type="quiz", score=score, language=quiz.language
+    ))
+    await db.commit()
     
-    return db_attempt
+    return {"id": None, **row}
 
 # Translation Endpoints
 @router.post("/translate", response_model=schemas.TranslationResponse)
@@ -245,9 +418,19 @@ async def stream_chat(request: schemas.StreamingChatRequest):
 
 # User Progress Endpoints
 @router.get("/users/{user_id}/progress", response_model=List[schemas.UserProgressResponse])
-def get_user_progress(user_id: int, db: Session = Depends(get_db)):
+async def get_user_progress(user_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get user's learning progress"""
-    progress = db.query(models.UserProgress).filter(
-        models.UserProgress.user_id == user_id
-    ).all()
-    return progress
+    progress = await db.scalars(
+        select(models.UserProgress).where(models.UserProgress.user_id == user_id)
+    )
+    return progress.all()
+
+# Database Metrics
+@router.get("/db/pool")
+def get_pool_status():
+    """Connection counts and checkout wait times for the DB pools"""
+    return {
+        "async": pool_status(async_engine),
+        "sync": pool_status(engine),
+        "write_behind": get_write_behind().metrics()
+    }
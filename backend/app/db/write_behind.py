@@ -0,0 +1,225 @@
+"""
+Write-Behind Persistence
+Append-only rows (messages, grammar corrections, quiz attempts, exchange
+logs) are queued on the request path and written by a background task:
+- Bulk INSERT per model, flushed by batch size or time window
+- Final flush on shutdown
+- Read-your-writes: readers flush pending rows they depend on first
+- A batch that fails on a bad row is retried row by row; rows that still
+  fail go to a logged dead-letter list instead of blocking the queue
+"""
+
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+import asyncio
+import logging
+import threading
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Errors caused by the rows themselves (FK, unique, value); retrying won't help
+ROW_ERRORS = (IntegrityError, DataError)
+
+
+class WriteBehindQueue:
+    """
+    Thread-safe: add() may be called from the event loop or from threadpool
+    routes. Flushing runs on the loop that called start().
+    """
+
+    def __init__(
+        self,
+        sessions: Optional[async_sessionmaker] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None
+    ):
+        self.sessions = sessions or AsyncSessionLocal
+        self.batch_size = batch_size or settings.write_behind_batch_size
+        self.flush_interval = flush_interval or settings.write_behind_flush_ms / 1000
+        self.max_pending = settings.write_behind_max_pending
+
+        self.pending: Dict[Any, List[Dict[str, Any]]] = {}
+        self.size = 0
+        self.lock = threading.Lock()
+        self.dead_letters: Deque[Tuple[Any, Dict[str, Any], str]] = deque(maxlen=self.max_pending)
+        self.stats = {"queued": 0, "written": 0, "batches": 0, "failures": 0, "dropped": 0, "dead_lettered": 0}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._flushing: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, model, **row) -> Dict[str, Any]:
+        """Queue one row; Python-side defaults are filled in now"""
+        for column in model.__table__.columns:
+            default = column.default
+            if column.name in row or default is None:
+                continue
+            # Timestamps record when the event happened, not when it was written
+            if default.is_callable:
+                row[column.name] = default.arg(None)
+            elif default.is_scalar:
+                row[column.name] = default.arg
+        with self.lock:
+            self.pending.setdefault(model, []).append(row)
+            self.size += 1
+            self.stats["queued"] += 1
+            full = self.size >= self.batch_size
+        if full and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        return row
+
+    def wake(self):
+        """Flush now instead of waiting for the batch size or time window"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def has_pending(self, model, **match) -> bool:
+        with self.lock:
+            return any(
+                all(row.get(key) == value for key, value in match.items())
+                for row in self.pending.get(model, ())
+            )
+
+    async def flush(self):
+        """
+        Write everything queued so far, one bulk INSERT per model.
+        Never raises: rows are requeued while the database is unreachable
+        and dead-lettered when they cannot be written at all.
+        """
+        if self._flushing is None:
+            self._flushing = asyncio.Lock()
+        # Serialized so batches reach the database in queue order
+        async with self._flushing:
+            with self.lock:
+                batch, self.pending, self.size = self.pending, {}, 0
+            if not batch:
+                return
+            written = 0
+            for model, rows in batch.items():
+                written += await self._write(model, rows)
+            with self.lock:
+                self.stats["written"] += written
+                self.stats["batches"] += 1
+
+    async def _write(self, model, rows: List[Dict[str, Any]]) -> int:
+        try:
+            async with self.sessions.begin() as db:
+                await db.execute(insert(model), rows)
+            return len(rows)
+        except ROW_ERRORS:
+            logger.warning("write-behind batch of %s rejected, retrying row by row", model.__tablename__)
+        except Exception:
+            logger.exception("write-behind flush of %s failed, rows requeued", model.__tablename__)
+            self._requeue(model, rows)
+            return 0
+
+        written = 0
+        for i, row in enumerate(rows):
+            try:
+                async with self.sessions.begin() as db:
+                    await db.execute(insert(model), [row])
+                written += 1
+            except ROW_ERRORS as e:
+                self._dead_letter(model, row, e)
+            except Exception:
+                logger.exception("write-behind flush of %s failed, rows requeued", model.__tablename__)
+                self._requeue(model, rows[i:])
+                break
+        return written
+
+    def _requeue(self, model, rows: List[Dict[str, Any]]):
+        """Put rows back at the head of the queue, ahead of rows added since"""
+        with self.lock:
+            self.pending[model] = rows + self.pending.get(model, [])
+            self.size += len(rows)
+            self.stats["failures"] += 1
+            self._trim()
+
+    def _dead_letter(self, model, row: Dict[str, Any], error: Exception):
+        logger.error(
+            "write-behind row for %s dead-lettered: %s | %r",
+            model.__tablename__, getattr(error, "orig", error), row
+        )
+        with self.lock:
+            self.dead_letters.append((model, row, str(getattr(error, "orig", error))))
+            self.stats["dead_lettered"] += 1
+
+    def _trim(self):
+        """While the database is unreachable, drop the oldest rows beyond max_pending"""
+        overflow = self.size - self.max_pending
+        for rows in self.pending.values():
+            if overflow <= 0:
+                break
+            dropped = min(overflow, len(rows))
+            del rows[:dropped]
+            self.size -= dropped
+            self.stats["dropped"] += dropped
+            overflow -= dropped
+        if self.stats["dropped"]:
+            logger.warning("write-behind queue full, %d rows dropped so far", self.stats["dropped"])
+
+    async def flush_if_pending(self, model, **match):
+        """Read-your-writes: flush before reading rows that may still be queued"""
+        if self.has_pending(model, **match):
+            await self.flush()
+
+    def flush_if_pending_sync(self, model, **match):
+        """Read-your-writes for threadpool code: flush on the queue's loop and wait"""
+        if not self.has_pending(model, **match):
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("flush_if_pending_sync called on an event loop; await flush_if_pending instead")
+        if self._loop is None:
+            asyncio.run(self.flush())  # no flusher running (scripts, tests)
+        else:
+            asyncio.run_coroutine_threadsafe(self.flush(), self._loop).result()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            # Failed rows stay queued and are retried on the next window
+            await self.flush()
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._flushing = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+        await self.flush()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            return {**self.stats, "pending": self.size}
+
+
+write_behind = WriteBehindQueue()
+
+
+def get_write_behind() -> WriteBehindQueue:
+    return write_behind
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Float, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Float, JSON, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
@@ -30,7 +30,10 @@ class Conversation(Base):
     
     # Relationships
     user = relationship("User", back_populates="conversations")
-    messages = relationship("Message", back_populates="conversation")
+    messages = relationship("Message", back_populates="conversation", order_by="Message.created_at")
+    
+    # Keyset pagination of a user's conversations
+    __table_args__ = (Index("ix_conversations_user_id_created_at", "user_id", "created_at"),)
 
 class Message(Base):
     __tablename__ = "messages"
@@ -43,6 +46,9 @@ class Message(Base):
     
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
+    
+    # Keyset pagination of a conversation's messages
+    __table_args__ = (Index("ix_messages_conversation_id_created_at", "conversation_id", "created_at"),)
 
 class VocabularyItem(Base):
     __tablename__ = "vocabulary_items"
@@ -59,8 +65,22 @@ class VocabularyItem(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     last_reviewed = Column(DateTime, nullable=True)
     
+    # SM-2 review schedule (app/services/spaced_repetition.py); new items are due at once
+    easiness = Column(Float, nullable=False, default=2.5, server_default="2.5")
+    repetitions = Column(Integer, nullable=False, default=0, server_default="0")
+    interval_days = Column(Float, nullable=False, default=0.0, server_default="0")
+    next_due_at = Column(DateTime, default=datetime.utcnow)
+    
     # Relationships
     user = relationship("User", back_populates="vocabulary_items")
+    
+    # Keyset pagination of a user's vocabulary, optionally filtered by language
+    __table_args__ = (
+        Index("ix_vocabulary_items_user_id_created_at", "user_id", "created_at"),
+        Index("ix_vocabulary_items_user_id_language_created_at", "user_id", "language", "created_at"),
+        # Due reviews: range scan up to now, earliest first
+        Index("ix_vocabulary_items_user_id_next_due_at", "user_id", "next_due_at"),
+    )
 
 class UserProgress(Base):
     __tablename__ = "user_progress"
@@ -76,6 +96,21 @@ class UserProgress(Base):
     streak_days = Column(Integer, default=0)
     last_activity = Column(DateTime, default=datetime.utcnow)
     
+    # Incremental aggregates (app/services/progress.py), one row per user and language
+    total_practice_sessions = Column(Integer, nullable=False, default=0, server_default="0")
+    total_minutes = Column(Float, nullable=False, default=0.0, server_default="0")
+    activity_counts = Column(JSON)  # {"part1": 3, "quiz": 2, ...}
+    longest_streak = Column(Integer, nullable=False, default=0, server_default="0")
+    band_count = Column(Integer, nullable=False, default=0, server_default="0")
+    band_avg = Column(Float)  # running mean
+    band_ema = Column(Float)  # rolling (exponential) average
+    latest_band = Column(Float)
+    target_band = Column(Float)
+    
+    __table_args__ = (
+        Index("ix_user_progress_user_id_language", "user_id", "language", unique=True),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="progress")
 
@@ -97,8 +132,8 @@ class QuizAttempt(Base):
     __tablename__ = "quiz_attempts"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    quiz_id = Column(Integer, ForeignKey("quizzes.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id"), index=True)
     score = Column(Float)
     answers = Column(JSON)  # Store user answers as JSON
     completed_at = Column(DateTime, default=datetime.utcnow)
@@ -111,10 +146,87 @@ class GrammarCorrection(Base):
     __tablename__ = "grammar_corrections"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     original_text = Column(Text)
     corrected_text = Column(Text)
     mistakes = Column(JSON)  # Store mistakes as JSON
     language = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+
+# IELTS speaking sessions
+# user_id carries no foreign key: IELTS sessions are started for any learner id
+
+class IELTSSession(Base):
+    __tablename__ = "ielts_sessions"
+    
+    id = Column(String, primary_key=True)  # orchestrator session id
+    user_id = Column(Integer, nullable=False)
+    session_type = Column(String)  # practice|mock|exam
+    status = Column(String, default="active")  # active|completed
+    incremental_scoring = Column(Boolean, default=True)
+    exam_state = Column(JSON)  # ExamState at start, later states are on the turns
+    turn_count = Column(Integer, default=0)
+    overall_band = Column(Float, nullable=True)
+    digest = Column(JSON, nullable=True)  # fixed-size summary, set when the session ends
+    started_at = Column(DateTime, default=datetime.utcnow)
+    ended_at = Column(DateTime, nullable=True)
+    
+    # Relationships
+    turns = relationship("IELTSTurn", back_populates="session", order_by="IELTSTurn.turn_index")
+    score = relationship("IELTSScore", back_populates="session", uselist=False)
+    
+    # A user's last k sessions
+    __table_args__ = (Index("ix_ielts_sessions_user_id_started_at", "user_id", "started_at"),)
+
+class IELTSTurn(Base):
+    """Append-only log of a session's exchanges"""
+    __tablename__ = "ielts_turns"
+    
+    id = Column(Integer, primary_key=True)
+    session_id = Column(String, ForeignKey("ielts_sessions.id"), nullable=False)
+    turn_index = Column(Integer, nullable=False)
+    part = Column(Integer)
+    user_response = Column(Text)
+    exchange = Column(JSON)  # metadata, confidence and examiner analyses
+    exam_state = Column(JSON)  # ExamState after this turn
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    session = relationship("IELTSSession", back_populates="turns")
+    
+    __table_args__ = (
+        Index("ix_ielts_turns_session_id_turn_index", "session_id", "turn_index", unique=True),
+    )
+
+class IELTSScore(Base):
+    __tablename__ = "ielts_scores"
+    
+    id = Column(Integer, primary_key=True)
+    session_id = Column(String, ForeignKey("ielts_sessions.id"), nullable=False, unique=True)
+    user_id = Column(Integer, nullable=False)
+    overall_band = Column(Float)
+    fluency_band = Column(Float)
+    grammar_band = Column(Float)
+    vocabulary_band = Column(Float)
+    pronunciation_band = Column(Float)
+    score = Column(JSON)  # full score incl. detailed_analyses
+    validation = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    session = relationship("IELTSSession", back_populates="score")
+    
+    __table_args__ = (Index("ix_ielts_scores_user_id_created_at", "user_id", "created_at"),)
+
+class BandSeriesChunk(Base):
+    """Packed band trajectory of a user in fixed-size chunks (app/services/band_series.py)"""
+    __tablename__ = "band_series_chunks"
+    
+    user_id = Column(Integer, primary_key=True)
+    chunk = Column(Integer, primary_key=True, autoincrement=False)  # 0, 1, ... oldest first
+    points = Column(Integer, nullable=False, default=0)
+    timestamps = Column(LargeBinary)  # little-endian float64 epoch seconds
+    bands = Column(LargeBinary)  # little-endian float32, overall + 4 criteria per point
+    parts = Column(LargeBinary)  # uint8 IELTS part per point, 0 for a full test or unknown
+    updated_at = Column(DateTime, default=datetime.utcnow)
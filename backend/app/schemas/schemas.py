@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import List, Optional, Dict
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional, Dict, Literal
 from datetime import datetime
 
 # User Schemas
@@ -36,16 +36,21 @@ class MessageResponse(BaseModel):
     class Config:
         from_attributes = True
 
-class ConversationResponse(BaseModel):
+class ConversationSummary(BaseModel):
     id: int
     language: str
     level: str
     created_at: datetime
-    messages: List[MessageResponse] = []
     
     class Config:
         from_attributes = True
 
+class ConversationResponse(ConversationSummary):
+    messages: List[MessageResponse] = []
+
+class ConversationListItem(ConversationSummary):
+    messages: Optional[List[MessageResponse]] = None  # only with include_messages
+
 # Grammar Correction Schemas
 class GrammarCorrectionRequest(BaseModel):
     text: str
@@ -66,12 +71,17 @@ class VocabularyRequest(BaseModel):
     topic: str
     language: str = "English"
     count: int = 10
+    min_level: Optional[Literal["A1", "A2", "B1", "B2", "C1", "C2"]] = None  # CEFR
+    max_level: Optional[Literal["A1", "A2", "B1", "B2", "C1", "C2"]] = None
+    user_id: Optional[int] = None  # skip words this learner has already been given
 
 class VocabularyWord(BaseModel):
     word: str
     definition: str
     example: str
     pronunciation: Optional[str] = None
+    cefr_level: Optional[str] = None
+    frequency_rank: Optional[int] = None
 
 class VocabularyItemCreate(BaseModel):
     word: str
@@ -91,10 +101,22 @@ class VocabularyItemResponse(BaseModel):
     topic: Optional[str]
     mastery_level: int
     created_at: datetime
+    last_reviewed: Optional[datetime] = None
+    next_due_at: Optional[datetime] = None
+    interval_days: float = 0.0
+    repetitions: int = 0
     
     class Config:
         from_attributes = True
 
+class VocabularyReview(BaseModel):
+    item_id: int
+    quality: int = Field(ge=0, le=5)  # SM-2 grade: 0 blackout ... 5 perfect recall
+    reviewed_at: Optional[datetime] = None
+
+class VocabularyReviewBatch(BaseModel):
+    reviews: List[VocabularyReview] = Field(min_length=1, max_length=500)
+
 # Quiz Schemas
 class QuizRequest(BaseModel):
     topic: str
@@ -117,7 +139,7 @@ class QuizAttemptCreate(BaseModel):
     answers: Dict[int, str]
 
 class QuizAttemptResponse(BaseModel):
-    id: int
+    id: Optional[int] = None  # assigned when the write-behind queue flushes
     quiz_id: int
     score: float
     completed_at: datetime
@@ -148,6 +170,13 @@ class UserProgressResponse(BaseModel):
     quiz_score_avg: float
     streak_days: int
     last_activity: datetime
+    total_practice_sessions: int = 0
+    total_minutes: float = 0.0
+    longest_streak: int = 0
+    band_avg: Optional[float] = None
+    band_ema: Optional[float] = None
+    latest_band: Optional[float] = None
+    target_band: Optional[float] = None
     
     class Config:
         from_attributes = True
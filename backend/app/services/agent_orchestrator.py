@@ -5,13 +5,25 @@ Coordinates all agents for comprehensive IELTS coaching
 
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+import random
+from concurrent.futures import ThreadPoolExecutor, Future, wait
 from .agents.examiner_agent import ExaminerAgent
 from .agents.scoring_agent import ScoringOrchestratorAgent
+from .agents.exam_flow import ExamState
+from .question_bank import get_question_bank, difficulty_for_band
 from .agents.support_agents import (
     PlannerAgent, CoachAgent, ConfidenceAgent, 
     ContentAgent, ReflectionAgent
 )
 from .nvidia_service import nvidia_llm_service
+from .speculation import QuestionSpeculator, speculation_report
+from .session_store import SessionStore
+from .session_digest import build_digest
+from .audio_analysis import (
+    AudioFeatures, analyze_pcm, analyze_pcm_file, analyze_wav_bytes, analyze_wav_file,
+    summarize_turns
+)
+from app.core.config import settings
 
 class AgentOrchestrator:
     """
@@ -19,7 +31,7 @@ class AgentOrchestrator:
     Manages agent-to-agent communication and workflow
     """
     
-    def __init__(self):
+    def __init__(self, store: Optional[SessionStore] = None):
         self.llm_service = nvidia_llm_service
         
         # Initialize all agents
@@ -31,13 +43,26 @@ class AgentOrchestrator:
         self.content = ContentAgent(self.llm_service)
         self.reflection = ReflectionAgent(self.llm_service)
         
+        # In-process cache of running sessions, backed by the session store
         self.active_sessions = {}
+        self.store = store or SessionStore()
+        
+        # Background per-turn scoring (incremental mode)
+        self.scoring_executor = ThreadPoolExecutor(
+            max_workers=settings.scoring_workers,
+            thread_name_prefix="turn-scoring"
+        )
+        self.pending_turn_scores: Dict[str, List[Future]] = {}
+        
+        # Next-question candidates generated while the learner speaks
+        self.speculator = QuestionSpeculator(self.examiner)
     
     def start_speaking_session(
         self, 
         user_id: int,
         user_profile: Dict[str, Any],
-        session_type: str = "practice"  # practice|mock|exam
+        session_type: str = "practice",  # practice|mock|exam
+        incremental_scoring: bool = True
     ) -> Dict[str, Any]:
         """
         Start a new speaking session
@@ -51,11 +76,18 @@ class AgentOrchestrator:
         # Get motivation from coach
         motivation = self.coach.provide_motivation(
             user_state=user_profile,
-            recent_performance=user_profile.get("recent_performance", {})
+            recent_performance=user_profile.get("recent_performance", {}),
+            band_trends=self.store.band_trends(user_id)
         )
         
-        # Start examiner session
-        examiner_response = self.examiner.start_session(user_profile)
+        # Start examiner session, each session tracks its own part and topic
+        part2_topics = get_question_bank().topics(2)
+        exam_state = ExamState(
+            user_id=user_id,
+            difficulty=difficulty_for_band(user_profile.get("current_band")),
+            part2_topic=random.choice(part2_topics) if part2_topics else None
+        )
+        examiner_response = self.examiner.start_session(user_profile, exam_state)
         
         # Create session record
         session_id = f"{user_id}_{datetime.utcnow().timestamp()}"
@@ -63,9 +95,14 @@ class AgentOrchestrator:
             "user_id": user_id,
             "type": session_type,
             "started_at": datetime.utcnow().isoformat(),
-            "examiner_state": self.examiner.state,
-            "exchanges": []
+            "exam": exam_state.dict(),
+            "incremental_scoring": incremental_scoring,
+            "exchanges": [],
+            "audio_features": {},  # turn index -> AudioFeatures dict
+            "live_stats": {}  # turn index -> LiveFluencyTracker snapshot
         }
+        self.pending_turn_scores[session_id] = []
+        self.store.create_session(session_id, self.active_sessions[session_id])
         
         return {
             "session_id": session_id,
@@ -90,10 +127,12 @@ class AgentOrchestrator:
         3. Examiner Agent generates next question
         """
         
-        if session_id not in self.active_sessions:
-            raise ValueError("Invalid session ID")
+        session = self.get_session(session_id)
         
-        session = self.active_sessions[session_id]
+        # Server-side prosody and live statistics replace client-side guesses
+        transcript_metadata = self._with_turn_signals(
+            session, len(session["exchanges"]), user_response, transcript_metadata
+        )
         
         # Confidence analysis (real-time)
         confidence_analysis = self.confidence.analyze_confidence(
@@ -101,53 +140,80 @@ class AgentOrchestrator:
             user_feedback=None
         )
         
-        # Examiner processes and generates next question
+        # Examiner decides the transition locally and generates next question
+        exam_state = ExamState(**session["exam"])
         examiner_response = self.examiner.process_response(
             user_response,
-            transcript_metadata
+            transcript_metadata,
+            exam_state,
+            prefetched=lambda state, decision, response: self.speculator.take(
+                session_id, session, state, decision, response
+            )
         )
+        session["exam"] = exam_state.dict()
         
         # Record exchange
-        session["exchanges"].append({
+        exchange = {
             "user_response": user_response,
             "metadata": transcript_metadata,
             "confidence_analysis": confidence_analysis,
             "examiner_response": examiner_response,
             "timestamp": datetime.utcnow().isoformat()
-        })
+        }
+        session["exchanges"].append(exchange)
+        turn_index = len(session["exchanges"]) - 1
+        self.store.append_turn(
+            session_id, turn_index, exchange, session["exam"],
+            audio_features=session.get("audio_features", {}).get(turn_index),
+            live_stats=session.get("live_stats", {}).get(turn_index)
+        )
+        
+        # Score this turn in the background while the session continues
+        if session.get("incremental_scoring"):
+            self._schedule_turn_scoring(session_id, exchange)
+        
+        # Topic changes for the next turn can be prepared right away
+        self.speculator.speculate(session_id, session)
         
         return {
             "next_question": examiner_response["question"],
             "part": examiner_response["part"],
             "confidence_tips": confidence_analysis.get("recommendations", []),
             "confidence_level": confidence_analysis.get("confidence_level"),
-            "action": examiner_response.get("action")
+            "action": examiner_response.get("action"),
+            "topic": examiner_response.get("topic"),
+            "finished": examiner_response.get("finished", False)
         }
     
     def end_session_and_score(
         self,
         session_id: str,
         full_transcript: str,
-        metadata: Dict[str, Any]
+        metadata: Dict[str, Any],
+        scoring_mode: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         End session and provide comprehensive scoring
         
         Flow:
         1. Scoring Orchestrator Agent scores all criteria
-        2. QA Agent validates scores
+           (aggregates per-turn analyses in incremental mode)
+        2. QA Agent validates scores (rule-based, LLM only when flagged)
         3. Reflection Agent generates insights
         4. Coach Agent provides encouragement
         5. Planner Agent suggests next steps
         """
         
-        if session_id not in self.active_sessions:
-            raise ValueError("Invalid session ID")
+        session = self.get_session(session_id)
+        self.speculator.cancel(session_id)
         
-        session = self.active_sessions[session_id]
+        if "audio" not in metadata and session.get("audio_features"):
+            metadata = {**metadata, "audio": summarize_turns(session["audio_features"])}
         
         # Comprehensive scoring
-        score = self.scorer.score_response(full_transcript, metadata)
+        score = self._score_session(
+            session_id, session, full_transcript, metadata, scoring_mode
+        )
         
         # QA validation
         validation = self.scorer.validate_score(score)
@@ -156,21 +222,30 @@ class AgentOrchestrator:
         if not validation["valid"] and validation["corrections"]:
             score.update(validation["corrections"])
         
-        # Reflection
+        # Reflection on this session's digest, with the previous sessions' digests for context
+        digest = build_digest(session, score)
         reflection = self.reflection.generate_reflection(
-            session_data=session,
-            previous_sessions=[]  # Would come from database
+            session_digest=digest,
+            previous_sessions=self.store.recent_digests(
+                session["user_id"], limit=settings.reflection_history_sessions
+            ),
+            history_limit=settings.reflection_history_sessions
         )
+        self.store.complete_session(session_id, session, score, validation, digest)
         
-        # Coach feedback
+        # Coach feedback, with the trajectory including this session
         coach_feedback = self.coach.provide_motivation(
             user_state={"current_band": score["overall_band"]},
-            recent_performance=score
+            recent_performance=score,
+            band_trends=self.store.band_trends(session["user_id"])
         )
         
         # Planner suggestions
         # (Would integrate with full study plan)
         
+        # Completed: no further turns on this worker either
+        self._forget(session_id)
+        
         return {
             "session_id": session_id,
             "score": score,
@@ -179,28 +254,240 @@ class AgentOrchestrator:
             "coach_message": coach_feedback,
             "session_summary": {
                 "duration": len(session["exchanges"]),
-                "parts_completed": self.examiner.current_part,
-                "exchanges": len(session["exchanges"])
+                "parts_completed": session["exam"]["part"],
+                "exchanges": len(session["exchanges"]),
+                "speculation": speculation_report(session.get("speculation")),
+                "digest": digest
+            }
+        }
+    
+    def speculate_next_question(
+        self,
+        session_id: str,
+        partial_transcript: str,
+        elapsed_seconds: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Refresh next-question candidates from a partial transcript"""
+        session = self.get_session(session_id)
+        submitted = self.speculator.speculate(
+            session_id, session, partial_transcript, elapsed_seconds
+        )
+        return {"submitted": submitted, **speculation_report(session.get("speculation"))}
+    
+    def process_turn_audio(
+        self,
+        session_id: str,
+        turn_index: int,
+        audio: bytes,
+        sample_rate: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract prosody features from a turn recording (WAV, or raw 16-bit
+        mono PCM when sample_rate is given) and keep them on the session
+        """
+        self.get_session(session_id)
+        
+        if audio[:4] == b"RIFF":
+            features = analyze_wav_bytes(audio)
+        elif sample_rate:
+            features = analyze_pcm(audio, sample_rate)
+        else:
+            raise ValueError("Raw PCM audio needs a sample_rate")
+        
+        return self.record_turn_audio(session_id, turn_index, features)
+    
+    def process_turn_audio_file(
+        self,
+        session_id: str,
+        turn_index: int,
+        path: str,
+        sample_rate: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Same as process_turn_audio for a recording on disk
+        The file is memory-mapped, never read into Python bytes
+        """
+        self.get_session(session_id)
+        
+        with open(path, "rb") as f:
+            is_wav = f.read(4) == b"RIFF"
+        if is_wav:
+            features = analyze_wav_file(path)
+        elif sample_rate:
+            features = analyze_pcm_file(path, sample_rate)
+        else:
+            raise ValueError("Raw PCM audio needs a sample_rate")
+        
+        return self.record_turn_audio(session_id, turn_index, features)
+    
+    def record_turn_audio(
+        self,
+        session_id: str,
+        turn_index: int,
+        features: AudioFeatures
+    ) -> Dict[str, Any]:
+        """Store a turn's audio feature vector on the session"""
+        session = self.active_sessions[session_id]
+        session.setdefault("audio_features", {})[turn_index] = features.dict()
+        return session["audio_features"][turn_index]
+    
+    def record_live_stats(
+        self,
+        session_id: str,
+        turn_index: Optional[int],
+        stats: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Store the running statistics of a live-streamed turn (None: the next turn)"""
+        session = self.get_session(session_id)
+        if turn_index is None:
+            turn_index = len(session["exchanges"])
+        session.setdefault("live_stats", {})[turn_index] = stats
+        return {"turn_index": turn_index, "stats": stats}
+    
+    def get_session(self, session_id: str) -> Dict[str, Any]:
+        """
+        Running session. A cached copy is checked against the store (status and
+        turn count) and reloaded when another worker has taken turns since;
+        after a restart the session is rebuilt from the store.
+        """
+        session = self.active_sessions.get(session_id)
+        if session is not None:
+            state = self.store.session_state(session_id)
+            # Not stored, or the store is down: the cached copy is all there is
+            if state is None:
+                return session
+            status, turns = state
+            if status != "active":
+                self._forget(session_id)
+                raise ValueError("Invalid session ID")
+            if turns <= len(session["exchanges"]):
+                return session
+            # Candidates were prepared for a turn that has already been answered
+            self.speculator.cancel(session_id)
+        
+        session = self.store.load_session(session_id)
+        if session is None:
+            self._forget(session_id)
+            raise ValueError("Invalid session ID")
+        self.active_sessions[session_id] = session
+        self.pending_turn_scores.setdefault(session_id, [])
+        return session
+    
+    def _forget(self, session_id: str):
+        """Drop a session that ended (here or on another worker) from the cache"""
+        self.active_sessions.pop(session_id, None)
+        self.pending_turn_scores.pop(session_id, None)
+        self.speculator.cancel(session_id)
+    
+    def recent_sessions(self, user_id: int, limit: int = 3) -> List[Dict[str, Any]]:
+        """A user's last completed sessions"""
+        return self.store.recent_sessions(user_id, limit)
+    
+    def band_chart(self, user_id: int, limit: Optional[int] = None) -> Dict[str, Any]:
+        """A user's band time series with trends"""
+        return self.store.band_chart(user_id, limit)
+    
+    def _with_turn_signals(
+        self,
+        session: Dict[str, Any],
+        turn_index: int,
+        user_response: str,
+        transcript_metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Merge stored live statistics and audio features for a turn into its metadata"""
+        live = session.get("live_stats", {}).get(turn_index)
+        if live:
+            live = dict(live)
+            if live["duration_seconds"]:
+                words = len(user_response.split())
+                live["words_per_minute"] = round(words / live["duration_seconds"] * 60, 1)
+            transcript_metadata = {
+                **transcript_metadata,
+                "duration_seconds": transcript_metadata.get("duration_seconds", live["duration_seconds"]),
+                "live": live
             }
+        
+        features = session.get("audio_features", {}).get(turn_index)
+        if not features:
+            return transcript_metadata
+        
+        features = dict(features)
+        if features["duration_seconds"]:
+            words = len(user_response.split())
+            features["words_per_minute"] = round(words / features["duration_seconds"] * 60, 1)
+        
+        return {
+            **transcript_metadata,
+            "duration_seconds": transcript_metadata.get("duration_seconds", features["duration_seconds"]),
+            "audio": {**transcript_metadata.get("audio", {}), **features}
         }
     
+    def _schedule_turn_scoring(self, session_id: str, exchange: Dict[str, Any]):
+        """Analyze one turn in the background and keep the result on the exchange"""
+        future = self.scoring_executor.submit(
+            self.scorer.analyze_criteria,
+            exchange["user_response"],
+            exchange["metadata"]
+        )
+        
+        def store(done: Future):
+            if not done.cancelled() and done.exception() is None:
+                exchange["criterion_analysis"] = done.result()
+        
+        future.add_done_callback(store)
+        self.pending_turn_scores.setdefault(session_id, []).append(future)
+    
+    def _score_session(
+        self,
+        session_id: str,
+        session: Dict[str, Any],
+        full_transcript: str,
+        metadata: Dict[str, Any],
+        scoring_mode: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Aggregate the per-turn analyses when every turn was scored,
+        otherwise fall back to a full re-analysis of the transcript.
+        An explicit scoring_mode always re-scores the full transcript.
+        """
+        futures = self.pending_turn_scores.pop(session_id, [])
+        if scoring_mode is None and session.get("incremental_scoring") and futures:
+            wait(futures, timeout=settings.turn_scoring_timeout)
+            exchanges = session["exchanges"]
+            if all("criterion_analysis" in ex for ex in exchanges):
+                return self.scorer.score_turns(
+                    [ex["criterion_analysis"] for ex in exchanges],
+                    [len(ex["user_response"].split()) for ex in exchanges]
+                )
+        
+        return self.scorer.score_response(
+            full_transcript, metadata, mode=scoring_mode or "auto"
+        )
+    
     def generate_study_plan(
         self,
         user_profile: Dict[str, Any],
         target_band: float,
-        available_days: List[str]
+        available_days: List[str],
+        user_id: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Generate autonomous study plan
         """
         
         current_band = user_profile.get("current_band", 5.0)
+        recent_sessions, band_trends = [], {}
+        if user_id is not None:
+            recent_sessions = self.store.recent_digests(user_id, limit=settings.planner_history_sessions)
+            band_trends = self.store.band_trends(user_id)
         
         plan = self.planner.create_study_plan(
             user_profile=user_profile,
             target_band=target_band,
             available_days=available_days,
-            current_band=current_band
+            current_band=current_band,
+            recent_sessions=recent_sessions,
+            band_trends=band_trends
         )
         
         return plan
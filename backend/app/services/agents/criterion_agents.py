@@ -3,10 +3,22 @@ Specialized IELTS Criterion Agents
 Each agent handles one IELTS scoring criterion autonomously
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from .base_agent import BaseAgent, AgentRole
+from app.services.transcript_analysis import TranscriptFeatures
+from app.services.lexicon import get_lexicon
 import json
 
+
+def _facts_section(facts: Optional[Dict[str, Any]]) -> str:
+    """Prompt section with features measured locally from the transcript"""
+    if not facts:
+        return ""
+    return f"""
+Measured facts (computed exactly from the transcript, use them instead of estimating):
+{json.dumps(facts, separators=(",", ":"))}
+"""
+
 class FluencyAgent(BaseAgent):
     """
     Analyzes fluency and coherence
@@ -19,7 +31,12 @@ class FluencyAgent(BaseAgent):
     def __init__(self, llm_service):
         super().__init__(AgentRole.FLUENCY, llm_service)
     
-    def analyze(self, transcript: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze(
+        self,
+        transcript: str,
+        metadata: Dict[str, Any],
+        features: Optional[TranscriptFeatures] = None
+    ) -> Dict[str, Any]:
         """Analyze fluency and coherence"""
         context = {
             "transcript": transcript,
@@ -32,7 +49,7 @@ class FluencyAgent(BaseAgent):
 
 Transcript: "{transcript}"
 Metadata: {json.dumps(metadata, indent=2)}
-
+{_facts_section(features.fluency_facts() if features else None)}
 Analyze:
 1. Pause frequency and duration
 2. Speech rate (words per minute)
@@ -71,6 +88,9 @@ Return JSON:
                 "band_estimate": "6.0"
             }
         
+        if features:
+            analysis["hesitation_count"] = features.filler_count
+        
         decision = self.decide({"analysis": analysis})
         action = self.act(decision)
         
@@ -89,14 +109,18 @@ class GrammarAgent(BaseAgent):
     def __init__(self, llm_service):
         super().__init__(AgentRole.GRAMMAR, llm_service)
     
-    def analyze(self, transcript: str) -> Dict[str, Any]:
+    def analyze(
+        self,
+        transcript: str,
+        features: Optional[TranscriptFeatures] = None
+    ) -> Dict[str, Any]:
         """Analyze grammar"""
         observation = self.observe({"transcript": transcript})
         
         prompt = f"""You are a grammar expert for IELTS speaking.
 
 Transcript: "{transcript}"
-
+{_facts_section(features.grammar_facts() if features else None)}
 Analyze:
 1. Grammatical errors (list each)
 2. Tense usage (correct/incorrect)
@@ -150,14 +174,23 @@ class VocabularyAgent(BaseAgent):
     def __init__(self, llm_service):
         super().__init__(AgentRole.VOCABULARY, llm_service)
     
-    def analyze(self, transcript: str) -> Dict[str, Any]:
+    def analyze(
+        self,
+        transcript: str,
+        features: Optional[TranscriptFeatures] = None
+    ) -> Dict[str, Any]:
         """Analyze vocabulary"""
         observation = self.observe({"transcript": transcript})
         
+        # Lexical sophistication from the frequency/CEFR lexicon
+        profile = get_lexicon().profile(transcript)
+        facts = dict(features.vocabulary_facts()) if features else {}
+        facts["lexical_profile"] = profile
+        
         prompt = f"""You are a vocabulary expert for IELTS speaking.
 
 Transcript: "{transcript}"
-
+{_facts_section(facts)}
 Analyze:
 1. Lexical range (basic/intermediate/advanced)
 2. Repetition of words/phrases
@@ -187,15 +220,16 @@ Return JSON:
             analysis = json.loads(response)
         except:
             analysis = {
-                "lexical_range": "adequate",
+                "lexical_range": profile.get("lexical_range_hint", "adequate"),
                 "repetitions": [],
-                "collocations": {"correct": [], "incorrect": []},
+                "collocations": {"correct": profile.get("collocations", []), "incorrect": []},
                 "topic_vocabulary": "adequate",
                 "strengths": ["Uses appropriate vocabulary"],
                 "weaknesses": ["Some repetition"],
                 "band_estimate": "6.0"
             }
         
+        analysis["lexical_profile"] = profile
         return analysis
 
 
@@ -0,0 +1,144 @@
+"""
+IELTS Speaking Test Flow
+Deterministic part/topic state machine for the examiner:
+- Part 1: 4-5 minutes of short questions over several familiar topics
+- Part 2: one long turn on a cue card
+- Part 3: 4-5 minutes of discussion linked to the Part 2 topic
+"""
+
+from typing import Dict, List, Any, Optional
+from pydantic import BaseModel
+
+PART1_MIN_SECONDS = 240
+PART1_MAX_SECONDS = 300
+PART1_QUESTIONS_PER_TOPIC = 3
+PART1_MAX_TURNS = 12
+
+PART3_MIN_SECONDS = 240
+PART3_MAX_SECONDS = 300
+PART3_QUESTIONS_PER_THEME = 3
+PART3_MAX_TURNS = 8
+
+# Examiner speaking time added to every turn
+QUESTION_SECONDS = 5.0
+
+# Speaking time estimate when the client sends no duration (150 wpm)
+WORDS_PER_SECOND = 2.5
+
+PART1_TOPICS = [
+    "work or studies", "hometown", "home", "hobbies", "daily routine",
+    "food", "music", "weather", "sport", "reading", "friends", "shopping",
+]
+
+PART2_TOPICS = [
+    "a memorable trip", "a person who inspired you", "a skill you learned",
+    "a book you enjoyed", "a place you like to visit", "an important decision",
+    "a celebration you attended", "a piece of technology you use",
+]
+
+# Actions
+FOLLOW_UP = "follow_up"
+NEW_TOPIC = "new_topic"
+TRANSITION = "transition"
+FINISH = "finish"
+
+
+class ExamState(BaseModel):
+    """Where one session is in the test, kept on the session"""
+    user_id: Optional[int] = None
+    difficulty: str = "intermediate"
+    part: int = 1
+    topic: str = PART1_TOPICS[0]
+    topics_covered: List[str] = [PART1_TOPICS[0]]
+    part2_topic: Optional[str] = None
+    elapsed_seconds: float = 0.0
+    part_elapsed_seconds: float = 0.0
+    part_turns: int = 0
+    topic_turns: int = 0
+    last_question: Optional[str] = None
+    finished: bool = False
+
+
+def turn_seconds(user_response: str, metadata: Dict[str, Any]) -> float:
+    """Candidate speaking time plus the examiner's question"""
+    duration = metadata.get("duration_seconds")
+    try:
+        duration = float(duration)
+    except (TypeError, ValueError):
+        duration = len(user_response.split()) / WORDS_PER_SECOND
+    return duration + QUESTION_SECONDS
+
+
+def next_action(state: ExamState) -> Dict[str, str]:
+    """Transition decision after the turn just recorded, with the rule that fired"""
+    elapsed, turns, topic_turns = state.part_elapsed_seconds, state.part_turns, state.topic_turns
+
+    if state.part == 1:
+        if elapsed >= PART1_MAX_SECONDS or turns >= PART1_MAX_TURNS:
+            return {"action": TRANSITION, "reason": "Part 1 time is up"}
+        if topic_turns >= PART1_QUESTIONS_PER_TOPIC:
+            if elapsed >= PART1_MIN_SECONDS:
+                return {"action": TRANSITION, "reason": "Part 1 topic finished after the minimum time"}
+            return {"action": NEW_TOPIC, "reason": f"{topic_turns} questions on this topic"}
+        return {"action": FOLLOW_UP, "reason": "Part 1 topic not finished"}
+
+    if state.part == 2:
+        return {"action": TRANSITION, "reason": "Part 2 long turn completed"}
+
+    if elapsed >= PART3_MAX_SECONDS or turns >= PART3_MAX_TURNS:
+        return {"action": FINISH, "reason": "Part 3 time is up"}
+    if topic_turns >= PART3_QUESTIONS_PER_THEME:
+        if elapsed >= PART3_MIN_SECONDS:
+            return {"action": FINISH, "reason": "Part 3 theme finished after the minimum time"}
+        return {"action": NEW_TOPIC, "reason": f"{topic_turns} questions on this theme"}
+    return {"action": FOLLOW_UP, "reason": "Part 3 discussion continues"}
+
+
+def _next_unused(options: List[str], used: List[str]) -> str:
+    for option in options:
+        if option not in used:
+            return option
+    return options[len(used) % len(options)]
+
+
+def advance(
+    state: ExamState,
+    user_response: str,
+    metadata: Dict[str, Any]
+) -> Dict[str, str]:
+    """
+    Record one candidate turn and apply the next transition in place
+    Returns the action, its reason and the topic of the next question
+    """
+    seconds = turn_seconds(user_response, metadata)
+    state.elapsed_seconds += seconds
+    state.part_elapsed_seconds += seconds
+    state.part_turns += 1
+    state.topic_turns += 1
+
+    decision = next_action(state)
+    action = decision["action"]
+
+    if action == NEW_TOPIC:
+        if state.part == 1:
+            state.topic = _next_unused(PART1_TOPICS, state.topics_covered)
+        else:
+            state.topic = f"{state.part2_topic} (theme {len(state.topics_covered) + 1})"
+        state.topics_covered.append(state.topic)
+        state.topic_turns = 0
+    elif action == TRANSITION:
+        state.part += 1
+        state.part_elapsed_seconds = 0.0
+        state.part_turns = 0
+        state.topic_turns = 0
+        if state.part == 2:
+            # A topic chosen up front (e.g. one the learner has not had yet) wins
+            state.part2_topic = state.part2_topic or _next_unused(PART2_TOPICS, state.topics_covered)
+            state.topic = state.part2_topic
+        else:
+            state.topic = f"{state.part2_topic} (theme 1)"
+        state.topics_covered.append(state.topic)
+    elif action == FINISH:
+        state.finished = True
+
+    return {**decision, "topic": state.topic}
@@ -1,12 +1,57 @@
 """
 IELTS Examiner Agent - Autonomous Speaking Test Conductor
-Fully adaptive, context-aware, no fixed scripts
+Scripted questions come from the question bank, adaptive follow-ups from the LLM
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 from .base_agent import BaseAgent, AgentRole
+from .exam_flow import ExamState, advance, FOLLOW_UP, NEW_TOPIC, TRANSITION, FINISH
+from app.services.question_bank import QuestionBank, get_question_bank, difficulty_for_band
+from app.services.near_duplicates import NearDuplicateIndex, get_near_duplicate_index
+import random
 import json
 
+# What the LLM is asked to write, by (part after the turn, action)
+INSTRUCTIONS = {
+    (1, FOLLOW_UP): "Ask one short follow-up question on the same topic",
+    (1, NEW_TOPIC): "Move to this new topic with one short question",
+    (2, TRANSITION): (
+        "Introduce the Part 2 long turn and give a cue card: one 'Describe ...' "
+        "line and 3-4 'You should say' points, with 1 minute to prepare and 2 minutes to speak"
+    ),
+    (3, TRANSITION): "Start the Part 3 discussion with one abstract question linked to the topic",
+    (3, FOLLOW_UP): "Ask one probing follow-up question that asks the candidate to justify or compare",
+    (3, NEW_TOPIC): "Move to a broader theme of the topic with one discussion question",
+}
+
+FALLBACK_QUESTIONS = {
+    (1, FOLLOW_UP): "That's interesting. Can you tell me more about that?",
+    (1, NEW_TOPIC): "Let's move on to talk about {topic}. What can you tell me about that?",
+    (2, TRANSITION): (
+        "Now I'm going to give you a topic. Describe {topic}. "
+        "You should say when it was, who was involved, what happened, "
+        "and explain why it matters to you. You have one minute to prepare."
+    ),
+    (3, TRANSITION): "Let's discuss some more general questions. Why do you think people value experiences like this?",
+    (3, FOLLOW_UP): "Why do you think that is?",
+    (3, NEW_TOPIC): "How do you think this will change in the future?",
+}
+
+CLOSING_LINE = "Thank you. That is the end of the speaking test."
+
+PART2_INTRO = (
+    "Now I'm going to give you a topic and I'd like you to talk about it "
+    "for one to two minutes. You have one minute to prepare."
+)
+
+# Words of the candidate's answer quoted in the question prompt
+PROMPT_RESPONSE_WORDS = 60
+
+
+def _clip(text: str, words: int = PROMPT_RESPONSE_WORDS) -> str:
+    parts = text.split()
+    return " ".join(parts[:words]) + (" ..." if len(parts) > words else "")
+
 class ExaminerAgent(BaseAgent):
     """
     Autonomous IELTS examiner that:
@@ -16,13 +61,44 @@ class ExaminerAgent(BaseAgent):
     - Evaluates speaking in real-time
     """
     
-    def __init__(self, llm_service):
+    def __init__(
+        self,
+        llm_service,
+        question_bank: Optional[QuestionBank] = None,
+        dedup_index: Optional[NearDuplicateIndex] = None
+    ):
         super().__init__(AgentRole.EXAMINER, llm_service)
         self.current_part = 1  # IELTS has 3 parts
-        self.conversation_history = []
+        self.exam_state = ExamState()
+        self._question_bank = question_bank
+        self._dedup_index = dedup_index
+    
+    @property
+    def question_bank(self) -> QuestionBank:
+        if self._question_bank is None:
+            self._question_bank = get_question_bank()
+        return self._question_bank
+    
+    @property
+    def dedup_index(self) -> NearDuplicateIndex:
+        if self._dedup_index is None:
+            self._dedup_index = get_near_duplicate_index()
+        return self._dedup_index
+    
+    def _remember(self, exam_state: ExamState, question: str, kind: str = "question"):
+        """Add an asked question to the learner's near-duplicate history"""
+        if exam_state.user_id is not None and question != CLOSING_LINE:
+            self.dedup_index.record_seen(exam_state.user_id, question, kind)
+        
+    def start_session(
+        self,
+        user_profile: Dict[str, Any],
+        exam_state: Optional[ExamState] = None
+    ) -> Dict[str, Any]:
+        """Start a new IELTS speaking session, the opening question comes from the bank"""
+        if exam_state is None:
+            exam_state = self.exam_state = ExamState()
         
-    def start_session(self, user_profile: Dict[str, Any]) -> Dict[str, Any]:
-        """Start a new IELTS speaking session"""
         context = {
             "user_profile": user_profile,
             "part": 1,
@@ -31,136 +107,198 @@ class ExaminerAgent(BaseAgent):
         
         observation = self.observe(context)
         
-        # Decide on opening question
-        prompt = f"""You are an IELTS speaking examiner starting Part 1.
+        question = self._from_bank(exam_state, NEW_TOPIC)
+        if question is None:
+            interests = user_profile.get("interests")
+            question = self._generate_question(
+                exam_state,
+                "Open Part 1 with a simple question"
+                + (f" (the candidate likes {interests})" if interests else ""),
+                fallback="Let's begin. Can you tell me about your work or studies?"
+            )
+        exam_state.last_question = question
+        self._remember(exam_state, question)
+        self.current_part = exam_state.part
         
-User Profile: {json.dumps(user_profile, indent=2)}
-
-Generate an appropriate opening question for IELTS Speaking Part 1.
-Topics: work/study, hometown, hobbies, daily routine, etc.
-
-Return JSON:
-{{
-    "question": "your question here",
-    "part": 1,
-    "topic": "topic name",
-    "expected_duration": "30-60 seconds"
-}}"""
-        
-        response = self.llm_service.generate_response(
-            [{"role": "system", "content": prompt}],
-            temperature=0.7
-        )
-        
-        try:
-            decision = json.loads(response)
-        except:
-            decision = {
-                "question": "Let's begin. Can you tell me about your work or studies?",
-                "part": 1,
-                "topic": "work_study",
-                "expected_duration": "30-60 seconds"
-            }
-        
-        action = self.act({"type": "ask_question", "data": decision})
+        action = self.act({"type": "ask_question", "data": {"question": question, "topic": exam_state.topic}})
         
         return {
-            "question": decision["question"],
-            "part": decision["part"],
-            "topic": decision.get("topic"),
+            "question": question,
+            "part": exam_state.part,
+            "topic": exam_state.topic,
             "session_started": True
         }
     
     def process_response(
         self, 
         user_response: str, 
-        transcript_metadata: Dict[str, Any]
+        transcript_metadata: Dict[str, Any],
+        exam_state: Optional[ExamState] = None,
+        prefetched: Optional[Callable[[ExamState, Dict[str, str], str], Optional[str]]] = None
     ) -> Dict[str, Any]:
         """
         Process user's response and decide next question
-        Fully adaptive based on conversation flow
+        
+        The part/topic transition is decided locally from elapsed time and
+        turn counts (see exam_flow); the LLM only writes the question text.
+        prefetched may supply that text from a speculatively generated
+        candidate, returning None when no candidate fits.
         """
+        exam_state = exam_state or self.exam_state
+        
         context = {
             "user_response": user_response,
             "metadata": transcript_metadata,
-            "current_part": self.current_part,
-            "conversation_history": self.conversation_history[-5:]  # Last 5 exchanges
+            "current_part": exam_state.part
         }
         
         observation = self.observe(context)
         
-        # Add to conversation history
-        self.conversation_history.append({
-            "role": "user",
-            "content": user_response,
-            "metadata": transcript_metadata
-        })
+        decision = advance(exam_state, user_response, transcript_metadata)
+        self.current_part = exam_state.part
         
-        # Decide next question using reasoning
-        prompt = f"""You are an IELTS speaking examiner in Part {self.current_part}.
-
-Conversation so far:
-{json.dumps(self.conversation_history[-5:], indent=2)}
-
-User's last response: "{user_response}"
-Metadata: {json.dumps(transcript_metadata, indent=2)}
-
-Based on the conversation flow and IELTS format:
-1. Decide if you should:
-   - Ask a follow-up question (same topic)
-   - Move to a new topic (still Part {self.current_part})
-   - Transition to Part {self.current_part + 1} (if Part {self.current_part} is complete)
-
-2. Generate the next question naturally
-
-Return JSON:
-{{
-    "action": "follow_up|new_topic|transition",
-    "next_question": "your question",
-    "part": {self.current_part},
-    "reasoning": "why you chose this action",
-    "topic": "topic name"
-}}"""
+        question = None
+        if prefetched is not None and decision["action"] != FINISH:
+            question = prefetched(exam_state, decision, user_response)
+        if question is None:
+            question = self.question_for(exam_state, decision["action"], user_response)
+        exam_state.last_question = question
+        self._remember(exam_state, question)
         
-        response = self.llm_service.generate_response(
-            [{"role": "system", "content": prompt}],
-            temperature=0.7
-        )
+        action = self.act({"type": "ask_question", "data": {**decision, "question": question}})
         
-        try:
-            decision = json.loads(response)
-        except:
-            decision = {
-                "action": "follow_up",
-                "next_question": "That's interesting. Can you tell me more about that?",
-                "part": self.current_part,
-                "reasoning": "Continue conversation",
-                "topic": "general"
-            }
+        return {
+            "question": question,
+            "part": exam_state.part,
+            "action": decision["action"],
+            "reasoning": decision["reason"],
+            "topic": decision["topic"],
+            "finished": exam_state.finished
+        }
+    
+    def question_for(
+        self,
+        exam_state: ExamState,
+        action: str,
+        user_response: Optional[str] = None
+    ) -> str:
+        """Question text for a decided action, exam_state is left untouched"""
+        if action == FINISH:
+            return CLOSING_LINE
+        
+        question = self._from_bank(exam_state, action)
+        if question is not None:
+            return question
         
-        # Handle part transitions
-        if decision.get("action") == "transition":
-            self.current_part += 1
-            decision["part"] = self.current_part
+        return self._generate_question(
+            exam_state,
+            INSTRUCTIONS[(exam_state.part, action)],
+            user_response=user_response,
+            fallback=FALLBACK_QUESTIONS[(exam_state.part, action)].format(
+                topic=exam_state.part2_topic if exam_state.part > 1 else exam_state.topic
+            )
+        )
+    
+    def uses_llm(self, exam_state: ExamState, action: str) -> bool:
+        """Whether question_for needs the LLM for this action"""
+        if action == FINISH:
+            return False
+        return self._bank_topic(exam_state, action) is None
+    
+    def _bank_topic(self, exam_state: ExamState, action: str) -> Optional[str]:
+        """Bank topic serving this action, None for adaptive follow-ups"""
+        if exam_state.part == 3 and action == FOLLOW_UP:
+            return None
+        topic = exam_state.topic if exam_state.part == 1 else exam_state.part2_topic
+        if topic and self.question_bank.has(exam_state.part, topic):
+            return topic
+        return None
+    
+    def _from_bank(self, exam_state: ExamState, action: str) -> Optional[str]:
+        """Scripted question from the bank, marked seen for the learner"""
+        topic = self._bank_topic(exam_state, action)
+        if topic is None:
+            return None
+        item = self.question_bank.draw(
+            exam_state.part, topic, exam_state.difficulty, exam_state.user_id
+        )
+        if item is None:
+            return None
+        if exam_state.part == 2:
+            card = item["cue_card"]
+            return f"{PART2_INTRO} {card['topic']} You should say: " + "; ".join(card["points"])
+        return item["question"]
+    
+    def _generate_question(
+        self,
+        exam_state: ExamState,
+        instruction: str,
+        fallback: str,
+        user_response: Optional[str] = None
+    ) -> str:
+        """Question text only: the flow decision is already made"""
+        lines = [
+            f"You are an IELTS speaking examiner in Part {exam_state.part}.",
+            f"Topic: {exam_state.topic}",
+            f"Task: {instruction}."
+        ]
+        if user_response:
+            if exam_state.last_question:
+                lines.append(f'Your last question: "{exam_state.last_question}"')
+            lines.append(f'Candidate: "{_clip(user_response)}"')
+        lines.append('Return JSON: {"question": "..."}')
         
-        action = self.act({"type": "ask_question", "data": decision})
+        question = self._ask_llm(lines, temperature=0.7)
         
-        self.conversation_history.append({
-            "role": "examiner",
-            "content": decision["next_question"],
-            "part": self.current_part
-        })
+        # One retry when the learner has already had a near-identical question
+        if question and exam_state.user_id is not None and \
+                not self.dedup_index.is_novel_for_user(exam_state.user_id, question, "question"):
+            retry = self._ask_llm(
+                lines[:-1] + [f'Do not repeat: "{question}"', lines[-1]], temperature=0.9
+            )
+            question = retry or question
+        return question or fallback
+    
+    def _ask_llm(self, lines: List[str], temperature: float) -> str:
+        response = self.llm_service.generate_response(
+            [{"role": "system", "content": "\n".join(lines)}],
+            temperature=temperature,
+            max_tokens=200
+        )
         
-        return {
-            "question": decision["next_question"],
-            "part": self.current_part,
-            "action": decision.get("action"),
-            "reasoning": decision.get("reasoning"),
-            "topic": decision.get("topic")
-        }
+        try:
+            return json.loads(response)["question"].strip()
+        except:
+            return ""
     
     def generate_cue_card(self, user_profile: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate Part 2 cue card dynamically"""
+        """Part 2 cue card from the bank, generated by the LLM only if the bank is empty"""
+        user_id = user_profile.get("user_id")
+        topics = self.question_bank.topics(2)
+        if topics:
+            item = self.question_bank.draw(
+                2,
+                random.choice(topics),
+                difficulty_for_band(user_profile.get("current_band")),
+                user_id
+            )
+            cue_card = dict(item["cue_card"])
+        else:
+            cue_card = self._generate_cue_card(user_profile)
+            # Regenerate once if the learner already had a near-identical card
+            if user_id is not None and \
+                    not self.dedup_index.is_novel_for_user(user_id, cue_card.get("topic", ""), "cue_card"):
+                cue_card = self._generate_cue_card(user_profile, avoid=cue_card.get("topic"))
+        
+        if user_id is not None and cue_card.get("topic"):
+            self.dedup_index.record_seen(user_id, cue_card["topic"], "cue_card")
+        return cue_card
+    
+    def _generate_cue_card(
+        self,
+        user_profile: Dict[str, Any],
+        avoid: Optional[str] = None
+    ) -> Dict[str, Any]:
         prompt = f"""Generate an IELTS Speaking Part 2 cue card.
 
 User Profile: {json.dumps(user_profile, indent=2)}
@@ -170,7 +308,7 @@ Create a cue card with:
 - 3-4 bullet points to cover
 - Preparation time: 1 minute
 - Speaking time: 2 minutes
-
+{f'- Must be clearly different from: "{avoid}"' if avoid else ''}
 Return JSON:
 {{
     "topic": "Describe a...",
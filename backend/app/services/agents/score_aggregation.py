@@ -0,0 +1,212 @@
+"""
+Deterministic aggregation of criterion agent analyses
+Merges several partial analyses (per turn or per segment) into one
+"""
+
+from typing import Dict, List, Any, Optional
+import json
+import math
+import re
+
+# Fields that hold a band on the 0-9 IELTS scale
+BAND_FIELDS = {"band_estimate", "fluency_score"}
+
+# Numeric fields that accumulate rather than average
+SUM_FIELDS = {"hesitation_count"}
+
+# Upper bound for free-text lists (strengths, weaknesses, ...)
+MAX_LIST_ITEMS = 8
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def parse_band(value: Any, default: float = 6.0) -> float:
+    """Parse an LLM band value such as 6.5, "6.5" or "6.0-7.0" into a float"""
+    if isinstance(value, (int, float)):
+        band = float(value)
+    else:
+        try:
+            parts = [float(p) for p in str(value).split("-") if p.strip()]
+        except ValueError:
+            return default
+        if not parts:
+            return default
+        band = sum(parts) / len(parts)
+    if math.isnan(band):
+        return default
+    return min(max(band, 0.0), 9.0)
+
+
+def round_band(value: float) -> float:
+    """Round to the IELTS half band (x.25 rounds up to x.5, x.75 up to x+1)"""
+    return math.floor(value * 2 + 0.5) / 2
+
+
+def _item_key(item: Any) -> str:
+    if isinstance(item, str):
+        return item.strip().lower()
+    return json.dumps(item, sort_keys=True)
+
+
+def _merge_list(values: List[List[Any]], limit: Optional[int]) -> List[Any]:
+    seen = set()
+    merged = []
+    for items in values:
+        for item in items:
+            key = _item_key(item)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(item)
+    return merged[:limit] if limit else merged
+
+
+def _merge_errors(values: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    seen = set()
+    merged = []
+    for errors in values:
+        for error in errors:
+            if not isinstance(error, dict):
+                continue
+            key = (str(error.get("error", "")).strip().lower(),
+                   str(error.get("correction", "")).strip().lower())
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(error)
+    return merged
+
+
+def _merge_repetitions(values: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    merged: Dict[str, Dict[str, Any]] = {}
+    for repetitions in values:
+        for rep in repetitions:
+            if not isinstance(rep, dict) or not rep.get("word"):
+                continue
+            word = str(rep["word"]).strip().lower()
+            entry = merged.setdefault(word, {"word": word, "count": 0, "alternatives": []})
+            try:
+                entry["count"] += int(rep.get("count", 1))
+            except (TypeError, ValueError):
+                entry["count"] += 1
+            entry["alternatives"] = _merge_list(
+                [entry["alternatives"], rep.get("alternatives", [])], limit=None
+            )
+    # Most repeated first, alphabetical on ties so the order is stable
+    return sorted(merged.values(), key=lambda r: (-r["count"], r["word"]))
+
+
+def _vote(values: List[Any], weights: List[float]) -> Any:
+    """Weighted majority vote; ties go to the earliest value"""
+    totals: Dict[str, float] = {}
+    first: Dict[str, Any] = {}
+    for value, weight in zip(values, weights):
+        key = _item_key(value)
+        totals[key] = totals.get(key, 0.0) + weight
+        first.setdefault(key, value)
+    best = max(totals, key=lambda k: totals[k])
+    return first[best]
+
+
+def _merge_field(key: str, values: List[Any], weights: List[float]) -> Any:
+    if key in BAND_FIELDS:
+        total = sum(weights)
+        mean = sum(parse_band(v) * w for v, w in zip(values, weights)) / total
+        return f"{round_band(mean):.1f}"
+    if key == "errors":
+        return _merge_errors([v for v in values if isinstance(v, list)])
+    if key == "repetitions":
+        return _merge_repetitions([v for v in values if isinstance(v, list)])
+    if all(isinstance(v, dict) for v in values):
+        return merge_analyses(values, weights)
+    if all(isinstance(v, list) for v in values):
+        return _merge_list(values, MAX_LIST_ITEMS)
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        if key in SUM_FIELDS:
+            return sum(values)
+        return sum(v * w for v, w in zip(values, weights)) / sum(weights)
+    return _vote(values, weights)
+
+
+def merge_analyses(
+    analyses: List[Dict[str, Any]],
+    weights: Optional[List[float]] = None
+) -> Dict[str, Any]:
+    """
+    Merge partial analyses of the same criterion into one analysis
+
+    Weights are usually the word counts of the analysed text, so longer
+    turns count for more. The result only depends on the inputs and their
+    order, never on timing.
+    """
+    analyses = [a for a in analyses if isinstance(a, dict)]
+    if not analyses:
+        return {}
+    if weights is None or len(weights) != len(analyses):
+        weights = [1.0] * len(analyses)
+    weights = [max(float(w), 1.0) for w in weights]
+    if len(analyses) == 1:
+        return dict(analyses[0])
+
+    merged: Dict[str, Any] = {}
+    keys: List[str] = []
+    for analysis in analyses:
+        keys.extend(k for k in analysis if k not in keys)
+
+    for key in keys:
+        present = [(a[key], w) for a, w in zip(analyses, weights) if key in a]
+        values = [v for v, _ in present]
+        merged[key] = _merge_field(key, values, [w for _, w in present])
+
+    return merged
+
+
+def merge_criterion_analyses(
+    partials: List[Dict[str, Dict[str, Any]]],
+    weights: Optional[List[float]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Merge a list of {criterion: analysis} dicts criterion by criterion
+    """
+    criteria: List[str] = []
+    for partial in partials:
+        criteria.extend(c for c in partial if c not in criteria)
+
+    merged = {}
+    for criterion in criteria:
+        present = [
+            (p[criterion], weights[i] if weights else 1.0)
+            for i, p in enumerate(partials) if criterion in p
+        ]
+        merged[criterion] = merge_analyses(
+            [a for a, _ in present],
+            [w for _, w in present]
+        )
+    return merged
+
+
+def segment_transcript(transcript: str, max_words: int) -> List[str]:
+    """
+    Split a transcript into segments of at most max_words words
+
+    Segments are cut on turn (newline) and sentence boundaries and packed
+    greedily. Unpunctuated runs longer than max_words (common in
+    speech-to-text output) are cut on word boundaries.
+    """
+    segments: List[str] = []
+    current: List[str] = []
+    for turn in transcript.splitlines():
+        for sentence in _SENTENCE_END.split(turn.strip()):
+            words = sentence.split()
+            if not words:
+                continue
+            if current and len(current) + len(words) > max_words:
+                segments.append(" ".join(current))
+                current = []
+            while len(words) > max_words:
+                segments.append(" ".join(words[:max_words]))
+                words = words[max_words:]
+            current.extend(words)
+    if current:
+        segments.append(" ".join(current))
+    return segments
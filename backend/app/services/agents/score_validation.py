@@ -0,0 +1,106 @@
+"""
+Deterministic QA checks for IELTS scores
+Covers the arithmetic and schema checks the QA agent used to spend an
+LLM call on, plus heuristics that decide when the LLM review is needed
+"""
+
+from typing import Dict, List, Any
+from .score_aggregation import parse_band, round_band
+
+CRITERION_BANDS = ("fluency_band", "grammar_band", "vocabulary_band", "pronunciation_band")
+LIST_FIELDS = ("strengths", "weaknesses", "priority_improvements")
+
+# A criterion band this far from its agent's own estimate needs a second look
+MAX_AGENT_DISAGREEMENT = 1.0
+
+# Criteria this far apart usually mean one analysis went wrong
+MAX_CRITERIA_SPREAD = 2.5
+
+
+def _is_band(value: Any) -> bool:
+    try:
+        band = float(value)
+    except (TypeError, ValueError):
+        return False
+    return 0.0 <= band <= 9.0 and band * 2 == int(band * 2)
+
+
+def validate_score_locally(score: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Rule-based validation of a final score
+
+    Returns the same shape as the QA agent (valid, issues, corrections,
+    confidence) plus needs_review, which is set when the bands and the
+    feedback look inconsistent and an LLM review is worth paying for.
+    """
+    issues: List[str] = []
+    corrections: Dict[str, Any] = {}
+    review_reasons: List[str] = []
+
+    # Schema and range checks
+    bands = []
+    for field in CRITERION_BANDS:
+        if field not in score:
+            issues.append(f"Missing {field}")
+            review_reasons.append(f"missing {field}")
+            continue
+        band = round_band(parse_band(score[field]))
+        if not _is_band(score[field]):
+            issues.append(f"{field} is not a valid half band: {score[field]!r}")
+            corrections[field] = f"{band:.1f}"
+        bands.append(band)
+
+    for field in LIST_FIELDS:
+        if not isinstance(score.get(field, []), list):
+            issues.append(f"{field} should be a list")
+            corrections[field] = [str(score[field])]
+
+    if not str(score.get("detailed_feedback", "")).strip():
+        issues.append("Missing detailed feedback")
+        review_reasons.append("no detailed feedback")
+
+    try:
+        confidence = float(score.get("confidence", 1.0))
+        if not 0.0 <= confidence <= 1.0:
+            raise ValueError
+    except (TypeError, ValueError):
+        issues.append(f"confidence out of range: {score.get('confidence')!r}")
+        corrections["confidence"] = "0.5"
+
+    # Overall band must be the half-band rounded mean of the criteria
+    if len(bands) == len(CRITERION_BANDS):
+        expected = round_band(sum(bands) / len(bands))
+        if parse_band(score.get("overall_band"), default=-1.0) != expected or \
+                not _is_band(score.get("overall_band")):
+            issues.append(
+                f"overall_band {score.get('overall_band')!r} should be {expected:.1f}"
+            )
+            corrections["overall_band"] = f"{expected:.1f}"
+
+        if max(bands) - min(bands) > MAX_CRITERIA_SPREAD:
+            review_reasons.append("criterion bands are far apart")
+
+        # Consistency heuristics between bands and feedback
+        overall = expected
+        if overall >= 7.5 and not score.get("strengths"):
+            review_reasons.append("high band without strengths")
+        if overall <= 5.0 and not score.get("weaknesses"):
+            review_reasons.append("low band without weaknesses")
+
+    analyses = score.get("detailed_analyses", {})
+    for field in CRITERION_BANDS:
+        criterion = field[:-len("_band")]
+        estimate = analyses.get(criterion, {}).get("band_estimate")
+        if field in score and estimate is not None:
+            if abs(parse_band(score[field]) - parse_band(estimate)) > MAX_AGENT_DISAGREEMENT:
+                review_reasons.append(f"{field} disagrees with the {criterion} agent")
+
+    return {
+        "valid": not issues,
+        "issues": issues,
+        "corrections": corrections,
+        "confidence": "1.0" if not review_reasons else "0.6",
+        "needs_review": bool(review_reasons),
+        "review_reasons": review_reasons,
+        "source": "local"
+    }
@@ -3,11 +3,66 @@ Scoring Orchestrator Agent
 Aggregates all criterion agents and produces final IELTS band score
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+import random
+from app.core.config import settings
+from app.services.transcript_analysis import analyze_transcript
+from app.services.lexicon import get_lexicon
 from .base_agent import BaseAgent, AgentRole
 from .criterion_agents import FluencyAgent, GrammarAgent, VocabularyAgent, PronunciationAgent
+from .score_aggregation import (
+    merge_analyses, merge_criterion_analyses, parse_band, round_band, segment_transcript
+)
+from .score_validation import validate_score_locally
 import json
 
+SCORING_MODES = ("auto", "fused", "multi_agent")
+CRITERIA = ("fluency", "grammar", "vocabulary", "pronunciation")
+
+
+def _duration(metadata: Dict[str, Any]) -> Optional[float]:
+    """Speaking time in seconds if the client sent it"""
+    try:
+        return float(metadata.get("duration_seconds") or metadata.get("duration")) or None
+    except (TypeError, ValueError):
+        return None
+
+
+# Totals that split across segments; rates and ratios stay recording-wide
+_ADDITIVE_SECONDS = ("duration_seconds", "duration", "speech_seconds")
+_ADDITIVE_COUNTS = ("pause_count", "long_pause_count")
+# Single extremes of the whole recording that no segment can be credited with
+_RECORDING_ONLY = ("max_pause_seconds",)
+
+
+def _segment_metadata(metadata: Dict[str, Any], share: float) -> Dict[str, Any]:
+    """
+    Metadata for one segment of a long turn: durations and pause counts are
+    scaled by the segment's share of the words, so the fluency prompt judges
+    speech rate for the fragment it is given rather than the whole recording.
+    """
+    def scale(values: Dict[str, Any]) -> Dict[str, Any]:
+        scaled = {}
+        for key, value in values.items():
+            if key in _RECORDING_ONLY:
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if key in _ADDITIVE_SECONDS:
+                    value = round(value * share, 1)
+                elif key in _ADDITIVE_COUNTS:
+                    value = round(value * share)
+            scaled[key] = value
+        return scaled
+
+    segment = scale(metadata)
+    for key in ("audio", "live"):
+        if isinstance(metadata.get(key), dict):
+            segment[key] = scale(metadata[key])
+    segment["segment_word_share"] = round(share, 3)
+    return segment
+
+
 class ScoringOrchestratorAgent(BaseAgent):
     """
     Orchestrates all criterion agents
@@ -28,20 +83,238 @@ class ScoringOrchestratorAgent(BaseAgent):
     def score_response(
         self, 
         transcript: str, 
-        metadata: Dict[str, Any]
+        metadata: Dict[str, Any],
+        mode: str = "auto"
     ) -> Dict[str, Any]:
         """
         Comprehensive scoring using all agents
+        
+        mode: fused (one LLM call), multi_agent (criterion agents plus
+        orchestration) or auto (fused for short transcripts)
         """
-        # Collect analyses from all agents
-        fluency_analysis = self.fluency_agent.analyze(transcript, metadata)
-        grammar_analysis = self.grammar_agent.analyze(transcript)
-        vocabulary_analysis = self.vocabulary_agent.analyze(transcript)
-        pronunciation_analysis = self.pronunciation_agent.analyze(
-            transcript, 
-            metadata.get("audio", {})
+        if self.resolve_mode(transcript, mode) == "fused":
+            final_score = self.score_fused(transcript, metadata)
+            if final_score is not None:
+                return final_score
+        
+        analyses = self.analyze_criteria(transcript, metadata)
+        final_score = self.finalize_score(analyses)
+        final_score["scoring_mode"] = "multi_agent"
+        return final_score
+    
+    def resolve_mode(self, transcript: str, mode: str = "auto") -> str:
+        """Pick the concrete scoring mode for a transcript"""
+        if mode not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode: {mode}")
+        if mode != "auto":
+            return mode
+        if len(transcript.split()) <= settings.fused_scoring_max_words:
+            return "fused"
+        return "multi_agent"
+    
+    def score_fused(
+        self,
+        transcript: str,
+        metadata: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Score all four criteria and the overall band in a single completion
+        Returns None when the response cannot be used, so the caller can
+        fall back to the multi-agent path.
+        """
+        observation = self.observe({"transcript": transcript, "metadata": metadata, "mode": "fused"})
+        features = analyze_transcript(transcript, _duration(metadata))
+        facts = {**features.fluency_facts(), **features.grammar_facts(), **features.vocabulary_facts()}
+        facts["lexical_profile"] = get_lexicon().profile(transcript)
+        
+        prompt = f"""You are an IELTS speaking examiner scoring all four criteria at once.
+
+Transcript: "{transcript}"
+Metadata: {json.dumps(metadata, indent=2)}
+Measured facts (computed exactly from the transcript, use them instead of estimating):
+{json.dumps(facts, separators=(",", ":"))}
+
+Assess each criterion independently, then combine them.
+
+Return JSON:
+{{
+    "fluency": {{
+        "pause_analysis": {{"frequency": "low|medium|high", "impact": "description"}},
+        "speech_rate": "slow|moderate|fast",
+        "hesitation_count": 0,
+        "coherence": "poor|fair|good|excellent",
+        "strengths": ["strength 1"],
+        "weaknesses": ["weakness 1"],
+        "band_estimate": "5.0-9.0"
+    }},
+    "grammar": {{
+        "errors": [{{"error": "text", "correction": "fix", "explanation": "why"}}],
+        "tense_accuracy": "poor|fair|good|excellent",
+        "complexity": "simple|moderate|complex",
+        "error_frequency": "high|medium|low",
+        "strengths": ["strength 1"],
+        "weaknesses": ["weakness 1"],
+        "band_estimate": "5.0-9.0"
+    }},
+    "vocabulary": {{
+        "lexical_range": "limited|adequate|wide|very_wide",
+        "repetitions": [{{"word": "word", "count": 5, "alternatives": ["alt1", "alt2"]}}],
+        "collocations": {{"correct": ["example"], "incorrect": ["example"]}},
+        "topic_vocabulary": "weak|adequate|strong",
+        "strengths": ["strength 1"],
+        "weaknesses": ["weakness 1"],
+        "band_estimate": "5.0-9.0"
+    }},
+    "pronunciation": {{
+        "clarity": "poor|fair|good|excellent",
+        "stress_accuracy": "weak|moderate|strong",
+        "intonation": "flat|varied|natural",
+        "problem_sounds": ["sound 1"],
+        "intelligibility": "difficult|mostly_clear|clear|very_clear",
+        "strengths": ["strength 1"],
+        "weaknesses": ["weakness 1"],
+        "band_estimate": "5.0-9.0"
+    }},
+    "overall": {{
+        "overall_band": "5.0-9.0",
+        "strengths": ["overall strength 1", "overall strength 2"],
+        "weaknesses": ["overall weakness 1", "overall weakness 2"],
+        "priority_improvements": ["improvement 1", "improvement 2"],
+        "detailed_feedback": "comprehensive explanation",
+        "confidence": "0.0-1.0"
+    }}
+}}"""
+        
+        response = self.llm_service.generate_response(
+            [{"role": "system", "content": prompt}],
+            temperature=0.2
         )
         
+        try:
+            fused = json.loads(response)
+            analyses = {criterion: dict(fused[criterion]) for criterion in CRITERIA}
+            overall = dict(fused.get("overall", {}))
+        except (ValueError, KeyError, TypeError):
+            return None
+        
+        analyses["fluency"]["hesitation_count"] = features.filler_count
+        analyses["vocabulary"]["lexical_profile"] = facts["lexical_profile"]
+        final_score = {
+            f"{criterion}_band": str(parse_band(analyses[criterion].get("band_estimate", "6.0")))
+            for criterion in CRITERIA
+        }
+        if "overall_band" not in overall:
+            bands = [float(final_score[f"{criterion}_band"]) for criterion in CRITERIA]
+            overall["overall_band"] = f"{round_band(sum(bands) / len(bands)):.1f}"
+        final_score.update(overall)
+        
+        decision = self.decide({"final_score": final_score})
+        action = self.act(decision)
+        
+        final_score["detailed_analyses"] = analyses
+        final_score["scoring_mode"] = "fused"
+        return final_score
+    
+    def analyze_criteria(
+        self,
+        transcript: str,
+        metadata: Dict[str, Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Run the four criterion agents on a transcript
+        Long transcripts go through the map-reduce path
+        """
+        segments = segment_transcript(transcript, settings.scoring_segment_words)
+        if len(segments) > 1:
+            return self._analyze_segmented(segments, metadata)
+        
+        features = analyze_transcript(transcript, _duration(metadata))
+        return {
+            "fluency": self.fluency_agent.analyze(transcript, metadata, features),
+            "grammar": self.grammar_agent.analyze(transcript, features),
+            "vocabulary": self.vocabulary_agent.analyze(transcript, features),
+            "pronunciation": self.pronunciation_agent.analyze(
+                transcript,
+                metadata.get("audio", {})
+            )
+        }
+    
+    def _analyze_segmented(
+        self,
+        segments: List[str],
+        metadata: Dict[str, Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Map-reduce analysis for long transcripts
+        
+        Map: fluency, grammar and vocabulary run per segment in parallel
+        (bounded by scoring_map_concurrency).
+        Reduce: per-segment analyses are merged in segment order, weighted
+        by segment word count. Each segment gets the recording's durations and
+        pause counts scaled by its share of the words (_segment_metadata).
+        Pronunciation is judged from the recording-wide audio features plus a
+        text sample, so it runs once, on the first segment with the full
+        metadata; scoring every segment would repeat the same audio evidence.
+        """
+        weights = [len(segment.split()) for segment in segments]
+        total = sum(weights) or 1
+        segment_metadata = [_segment_metadata(metadata, weight / total) for weight in weights]
+        features = [
+            analyze_transcript(segment, _duration(meta))
+            for segment, meta in zip(segments, segment_metadata)
+        ]
+        
+        with ThreadPoolExecutor(max_workers=settings.scoring_map_concurrency) as pool:
+            fluency = [
+                pool.submit(self.fluency_agent.analyze, seg, meta, feat)
+                for seg, meta, feat in zip(segments, segment_metadata, features)
+            ]
+            grammar = [
+                pool.submit(self.grammar_agent.analyze, seg, feat)
+                for seg, feat in zip(segments, features)
+            ]
+            vocabulary = [
+                pool.submit(self.vocabulary_agent.analyze, seg, feat)
+                for seg, feat in zip(segments, features)
+            ]
+            # Audio evidence covers the whole recording; one call on a text sample
+            pronunciation = pool.submit(
+                self.pronunciation_agent.analyze,
+                segments[0],
+                metadata.get("audio", {})
+            )
+            
+            return {
+                "fluency": merge_analyses([f.result() for f in fluency], weights),
+                "grammar": merge_analyses([f.result() for f in grammar], weights),
+                "vocabulary": merge_analyses([f.result() for f in vocabulary], weights),
+                "pronunciation": pronunciation.result()
+            }
+    
+    def score_turns(
+        self,
+        turn_analyses: List[Dict[str, Dict[str, Any]]],
+        turn_word_counts: List[int]
+    ) -> Dict[str, Any]:
+        """
+        Incremental scoring: aggregate per-turn criterion analyses
+        Only the final orchestration call touches the LLM
+        """
+        analyses = merge_criterion_analyses(turn_analyses, turn_word_counts)
+        final_score = self.finalize_score(analyses)
+        final_score["turns_scored"] = len(turn_analyses)
+        final_score["scoring_mode"] = "incremental"
+        return final_score
+    
+    def finalize_score(self, analyses: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Resolve criterion analyses into the final band score
+        """
+        fluency_analysis = analyses["fluency"]
+        grammar_analysis = analyses["grammar"]
+        vocabulary_analysis = analyses["vocabulary"]
+        pronunciation_analysis = analyses["pronunciation"]
+        
         # Aggregate scores
         context = {
             "fluency": fluency_analysis,
@@ -99,12 +372,12 @@ Return JSON:
         except:
             # Fallback: simple average
             bands = [
-                float(fluency_analysis.get("band_estimate", "6.0")),
-                float(grammar_analysis.get("band_estimate", "6.0")),
-                float(vocabulary_analysis.get("band_estimate", "6.0")),
-                float(pronunciation_analysis.get("band_estimate", "6.0"))
+                parse_band(fluency_analysis.get("band_estimate", "6.0")),
+                parse_band(grammar_analysis.get("band_estimate", "6.0")),
+                parse_band(vocabulary_analysis.get("band_estimate", "6.0")),
+                parse_band(pronunciation_analysis.get("band_estimate", "6.0"))
             ]
-            overall = sum(bands) / len(bands)
+            overall = round_band(sum(bands) / len(bands))
             
             final_score = {
                 "fluency_band": str(bands[0]),
@@ -136,7 +409,29 @@ Return JSON:
         """
         QA validation of the score
         Ensures fairness and accuracy
+        
+        Band arithmetic, ranges and schema are checked locally. The LLM
+        review only runs when the local heuristics flag an inconsistency
+        or the request is sampled (qa_llm_sample_rate).
         """
+        local = validate_score_locally(score)
+        if not local["needs_review"] and random.random() >= settings.qa_llm_sample_rate:
+            return local
+        
+        validation = self._validate_with_llm(score)
+        
+        # Deterministic corrections win over the LLM's arithmetic
+        corrections = dict(validation.get("corrections") or {})
+        corrections.update(local["corrections"])
+        validation["corrections"] = corrections
+        validation["issues"] = local["issues"] + list(validation.get("issues") or [])
+        validation["valid"] = bool(validation.get("valid", True)) and local["valid"]
+        validation["review_reasons"] = local["review_reasons"]
+        validation["source"] = "llm"
+        return validation
+    
+    def _validate_with_llm(self, score: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM QA pass for fairness and feedback quality"""
         prompt = f"""You are a QA agent validating IELTS scores.
 
 Score to validate:
@@ -9,8 +9,14 @@ Supporting Agents for Holistic IELTS Preparation
 
 from typing import Dict, List, Any, Optional
 from .base_agent import BaseAgent, AgentRole
+from app.services.confidence_model import (
+    get_confidence_model, log_example, nervousness_indicators
+)
+from app.services.semantic_cache import get_semantic_cache
+from app.core.config import settings
 from datetime import datetime, timedelta
 import json
+import random
 
 class PlannerAgent(BaseAgent):
     """
@@ -29,7 +35,9 @@ class PlannerAgent(BaseAgent):
         user_profile: Dict[str, Any],
         target_band: float,
         available_days: List[str],
-        current_band: float
+        current_band: float,
+        recent_sessions: Optional[List[Dict[str, Any]]] = None,
+        band_trends: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Generate personalized study plan"""
         
@@ -49,6 +57,8 @@ User Profile: {json.dumps(user_profile, indent=2)}
 Current Band: {current_band}
 Target Band: {target_band}
 Available Days: {available_days}
+Recent Sessions (digests, newest first): {json.dumps(recent_sessions or [], separators=(",", ":"))}
+Band Trends (per 30 days, projected over horizon_days): {json.dumps(band_trends or {}, separators=(",", ":"))}
 
 Create a personalized study plan:
 1. Daily practice schedule
@@ -147,7 +157,8 @@ class CoachAgent(BaseAgent):
     def provide_motivation(
         self, 
         user_state: Dict[str, Any],
-        recent_performance: Dict[str, Any]
+        recent_performance: Dict[str, Any],
+        band_trends: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Provide personalized motivation"""
         
@@ -162,6 +173,7 @@ class CoachAgent(BaseAgent):
 
 User State: {json.dumps(user_state, indent=2)}
 Recent Performance: {json.dumps(recent_performance, indent=2)}
+Band Trends (per 30 days, projected over horizon_days): {json.dumps(band_trends or {}, separators=(",", ":"))}
 
 Provide:
 1. Personalized encouragement
@@ -203,6 +215,31 @@ class ConfidenceAgent(BaseAgent):
     - Builds exam confidence
     """
     
+    # Canned coaching served with local predictions
+    TIPS = {
+        "low": {
+            "recommendations": [
+                "Pause and breathe instead of rushing to fill silence",
+                "Start with a simple answer, then add one reason and one example"
+            ],
+            "breathing_exercise": "Breathe in for 4, hold for 4, out for 6",
+            "mindset_shift": "The examiner wants to hear you communicate, not to catch mistakes"
+        },
+        "medium": {
+            "recommendations": ["Take deep breaths", "Speak slowly"],
+            "breathing_exercise": "Breathe in for 4, hold for 4, out for 4",
+            "mindset_shift": "Focus on communication, not perfection"
+        },
+        "high": {
+            "recommendations": [
+                "Keep this steady pace",
+                "Stretch yourself with more precise vocabulary"
+            ],
+            "breathing_exercise": "One slow breath before each answer keeps the rhythm",
+            "mindset_shift": "Trust your preparation and enjoy the conversation"
+        }
+    }
+    
     def __init__(self, llm_service):
         super().__init__(AgentRole.CONFIDENCE, llm_service)
     
@@ -211,8 +248,49 @@ class ConfidenceAgent(BaseAgent):
         speech_patterns: Dict[str, Any],
         user_feedback: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Analyze confidence level from speech"""
+        """
+        Analyze confidence level from speech
+        
+        Served by the distilled local model when one is trained and sure of
+        its prediction. The LLM handles uncertain turns and a sampled share
+        (confidence_llm_sample_rate) for drift monitoring; those outputs are
+        logged as training data for the next model.
+        """
+        model = None if user_feedback else get_confidence_model()
+        prediction = None
+        if model is not None:
+            level, probability = model.predict(speech_patterns)
+            prediction = {"confidence_level": level, "probability": round(probability, 3)}
+            if probability >= settings.confidence_model_threshold and \
+                    random.random() >= settings.confidence_llm_sample_rate:
+                return {
+                    "confidence_level": level,
+                    "nervousness_indicators": nervousness_indicators(speech_patterns),
+                    **self.TIPS[level],
+                    "source": "model",
+                    "probability": prediction["probability"]
+                }
         
+        analysis = self._analyze_with_llm(speech_patterns, user_feedback)
+        if analysis is None:
+            return {
+                "confidence_level": "medium",
+                "nervousness_indicators": [],
+                **self.TIPS["medium"],
+                "source": "fallback"
+            }
+        
+        if user_feedback is None:
+            log_example(speech_patterns, analysis, prediction)
+        analysis["source"] = "llm"
+        return analysis
+    
+    def _analyze_with_llm(
+        self,
+        speech_patterns: Dict[str, Any],
+        user_feedback: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """LLM confidence analysis, the distilled model's teacher"""
         context = {
             "speech_patterns": speech_patterns,
             "user_feedback": user_feedback
@@ -250,17 +328,9 @@ Return JSON:
         )
         
         try:
-            analysis = json.loads(response)
+            return json.loads(response)
         except:
-            analysis = {
-                "confidence_level": "medium",
-                "nervousness_indicators": [],
-                "recommendations": ["Take deep breaths", "Speak slowly"],
-                "breathing_exercise": "Breathe in for 4, hold for 4, out for 4",
-                "mindset_shift": "Focus on communication, not perfection"
-            }
-        
-        return analysis
+            return None
 
 
 class ContentAgent(BaseAgent):
@@ -269,10 +339,18 @@ class ContentAgent(BaseAgent):
     - Helps with thinking, not just speaking
     - Generates ideas for topics
     - Provides examples and contrasts
+    - Reuses ideas for near-identical topics from a local semantic cache
     """
     
-    def __init__(self, llm_service):
+    def __init__(self, llm_service, cache=None):
         super().__init__(AgentRole.CONTENT, llm_service)
+        self._cache = cache
+    
+    @property
+    def cache(self):
+        if self._cache is None:
+            self._cache = get_semantic_cache()
+        return self._cache
     
     def generate_ideas(
         self, 
@@ -281,6 +359,11 @@ class ContentAgent(BaseAgent):
     ) -> Dict[str, Any]:
         """Generate ideas for a topic"""
         
+        namespace = f"ideas:{question_type}"
+        cached = self.cache.get(topic, namespace)
+        if cached is not None:
+            return cached
+        
         prompt = f"""Help generate ideas for IELTS speaking.
 
 Topic: {topic}
@@ -308,13 +391,15 @@ Return JSON:
         try:
             ideas = json.loads(response)
         except:
-            ideas = {
+            return {
                 "main_ideas": ["Consider different perspectives"],
                 "examples": ["Use personal experience"],
                 "contrasts": ["Compare pros and cons"],
                 "structure": "Introduction → Main points → Conclusion"
             }
         
+        # Only real LLM output is worth serving again
+        self.cache.put(topic, ideas, namespace)
         return ideas
 
 
@@ -331,15 +416,21 @@ class ReflectionAgent(BaseAgent):
     
     def generate_reflection(
         self, 
-        session_data: Dict[str, Any],
-        previous_sessions: List[Dict[str, Any]]
+        session_digest: Dict[str, Any],
+        previous_sessions: List[Dict[str, Any]],
+        history_limit: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Generate post-session reflection"""
+        """
+        Generate post-session reflection
+        The current session is passed as its digest (app/services/session_digest.py),
+        so the prompt stays the same size however long the session was.
+        """
+        history_limit = history_limit or settings.reflection_history_sessions
         
         prompt = f"""You are a reflection coach for IELTS.
 
-Current Session: {json.dumps(session_data, indent=2)}
-Previous Sessions: {json.dumps(previous_sessions[-3:], indent=2)}
+Current Session (digest): {json.dumps(session_digest, separators=(",", ":"))}
+Previous Sessions (digests, newest first): {json.dumps(previous_sessions[:history_limit], separators=(",", ":"))}
 
 Generate reflection questions and insights:
 1. What went well?
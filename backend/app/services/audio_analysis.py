@@ -0,0 +1,313 @@
+"""
+Audio Prosody & Pause Analysis
+Energy-based voice activity, pauses, articulation rate and pitch
+variation computed with vectorized NumPy framing (CPU only).
+
+Accepts WAV bytes, WAV files (memory-mapped, never fully read into
+Python bytes) or raw little-endian PCM.
+"""
+
+from typing import Dict, Any, Optional, Tuple, BinaryIO
+from pydantic import BaseModel
+import io
+import struct
+import numpy as np
+
+FRAME_MS = 25
+HOP_MS = 10
+
+# Voice activity: frames this far above the noise floor count as speech
+VAD_MARGIN_DB = 12.0
+# Silences shorter than this are part of normal articulation
+MIN_PAUSE_S = 0.25
+LONG_PAUSE_S = 1.0
+# Speech bursts shorter than this are treated as noise
+MIN_SPEECH_S = 0.08
+
+PITCH_MIN_HZ = 75.0
+PITCH_MAX_HZ = 400.0
+VOICING_THRESHOLD = 0.35
+
+# Frames processed per block, bounds memory for long recordings
+BLOCK_FRAMES = 2000
+
+_PCM_DTYPES = {1: np.uint8, 2: np.dtype("<i2"), 4: np.dtype("<i4")}
+
+
+class AudioFeatures(BaseModel):
+    """Compact prosody feature vector for one turn"""
+    duration_seconds: float = 0.0
+    speech_seconds: float = 0.0
+    speech_ratio: float = 0.0
+    pause_count: int = 0
+    long_pause_count: int = 0
+    mean_pause_seconds: float = 0.0
+    max_pause_seconds: float = 0.0
+    pauses_per_minute: float = 0.0
+    articulation_rate: float = 0.0  # syllable nuclei per second of speech
+    words_per_minute: Optional[float] = None
+    pitch_mean_hz: Optional[float] = None
+    pitch_std_semitones: Optional[float] = None
+    pitch_range_semitones: Optional[float] = None
+
+
+class WavFormat(BaseModel):
+    sample_rate: int
+    channels: int
+    sample_width: int  # bytes per sample
+    data_offset: int
+    data_size: int
+
+
+def read_wav_header(f: BinaryIO) -> WavFormat:
+    """Parse RIFF chunks up to the start of the PCM data"""
+    riff = f.read(12)
+    if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE file")
+
+    fmt = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise ValueError("WAV file has no data chunk")
+        chunk_id, size = header[:4], struct.unpack("<I", header[4:])[0]
+        if chunk_id == b"fmt ":
+            body = f.read(size)
+            if len(body) < 16:
+                raise ValueError("WAV fmt chunk is too short")
+            audio_format, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+            if audio_format not in (1, 0xFFFE):  # PCM, extensible PCM
+                raise ValueError("Only uncompressed PCM WAV is supported")
+            if not sample_rate or not channels or not bits or bits % 8:
+                raise ValueError("Invalid WAV fmt chunk")
+            fmt = (sample_rate, channels, bits // 8)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            return WavFormat(
+                sample_rate=fmt[0], channels=fmt[1], sample_width=fmt[2],
+                data_offset=f.tell(), data_size=size
+            )
+        else:
+            f.seek(size + (size & 1), io.SEEK_CUR)
+
+
+def _pcm_view(raw: np.ndarray, sample_width: int, channels: int) -> np.ndarray:
+    """Reinterpret raw bytes (array or memmap) as (frames, channels) samples"""
+    if sample_width not in _PCM_DTYPES:
+        raise ValueError(f"Unsupported sample width: {sample_width * 8} bits")
+    usable = len(raw) - len(raw) % (sample_width * channels)
+    return raw[:usable].view(_PCM_DTYPES[sample_width]).reshape(-1, channels)
+
+
+def _to_float(block: np.ndarray, sample_width: int) -> np.ndarray:
+    """Mono float32 in [-1, 1] for a block of (frames, channels) samples"""
+    samples = block.astype(np.float32).mean(axis=1)
+    if sample_width == 1:
+        return (samples - 128.0) / 128.0
+    return samples / float(2 ** (8 * sample_width - 1))
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Run-length encoding: (starts, lengths, values)"""
+    if not len(mask):
+        return np.array([], int), np.array([], int), np.array([], bool)
+    change = np.nonzero(np.diff(mask.astype(np.int8)))[0] + 1
+    starts = np.concatenate(([0], change))
+    lengths = np.diff(np.concatenate((starts, [len(mask)])))
+    return starts, lengths, mask[starts]
+
+
+def _fill_short_runs(mask: np.ndarray, value: bool, max_len: int) -> np.ndarray:
+    """Flip interior runs of `value` shorter than max_len frames"""
+    mask = mask.copy()
+    starts, lengths, values = _runs(mask)
+    for start, length, v in zip(starts, lengths, values):
+        interior = start > 0 and start + length < len(mask)
+        if v == value and length < max_len and interior:
+            mask[start:start + length] = not value
+    return mask
+
+
+def _frame_block(samples: np.ndarray, frame_len: int, hop: int) -> np.ndarray:
+    return np.lib.stride_tricks.sliding_window_view(samples, frame_len)[::hop]
+
+
+def _pitch(frames: np.ndarray, sample_rate: int) -> np.ndarray:
+    """
+    F0 per frame from the normalised autocorrelation (FFT based)
+    Returns NaN for unvoiced frames
+    """
+    n = frames.shape[1]
+    centered = frames - frames.mean(axis=1, keepdims=True)
+    spectrum = np.fft.rfft(centered * np.hanning(n), n=2 * n, axis=1)
+    acf = np.fft.irfft(np.abs(spectrum) ** 2, axis=1)[:, :n]
+    energy = acf[:, :1]
+    energy[energy == 0] = 1.0
+    acf = acf / energy
+
+    min_lag = int(sample_rate / PITCH_MAX_HZ)
+    max_lag = min(int(sample_rate / PITCH_MIN_HZ), n - 1)
+    if max_lag <= min_lag:
+        return np.full(len(frames), np.nan)
+    window = acf[:, min_lag:max_lag]
+    best = window.argmax(axis=1)
+    strength = window[np.arange(len(window)), best]
+    f0 = sample_rate / (best + min_lag)
+    f0[strength < VOICING_THRESHOLD] = np.nan
+    return f0
+
+
+def analyze_pcm_samples(
+    pcm: np.ndarray,
+    sample_rate: int,
+    sample_width: int = 2,
+    word_count: Optional[int] = None
+) -> AudioFeatures:
+    """
+    Analyze (frames, channels) integer PCM samples
+    Works block by block so memory-mapped input stays on disk
+    """
+    if sample_rate <= 0:
+        raise ValueError("sample_rate must be positive")
+    frame_len = int(sample_rate * FRAME_MS / 1000)
+    hop = int(sample_rate * HOP_MS / 1000)
+    total = len(pcm)
+    duration = total / sample_rate
+    if total < frame_len:
+        return AudioFeatures(duration_seconds=round(duration, 2))
+
+    energies, pitches = [], []
+    block_samples = BLOCK_FRAMES * hop
+    for start in range(0, total - frame_len + 1, block_samples):
+        stop = min(start + block_samples + frame_len - hop, total)
+        samples = _to_float(np.asarray(pcm[start:stop]), sample_width)
+        frames = _frame_block(samples, frame_len, hop)
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        energies.append(20 * np.log10(rms + 1e-10))
+        pitches.append(_pitch(frames, sample_rate))
+    energy_db = np.concatenate(energies)
+    f0 = np.concatenate(pitches)
+
+    # Voice activity relative to the recording's own noise floor
+    noise_floor = np.percentile(energy_db, 10)
+    speech = energy_db > max(noise_floor + VAD_MARGIN_DB, energy_db.max() - 50)
+    frames_per_s = 1000 / HOP_MS
+    speech = _fill_short_runs(speech, True, int(MIN_SPEECH_S * frames_per_s))
+    speech = _fill_short_runs(speech, False, int(MIN_PAUSE_S * frames_per_s))
+
+    # Pauses: silent runs between the first and last speech frames
+    starts, lengths, values = _runs(speech)
+    interior = (starts > 0) & (starts + lengths < len(speech))
+    pauses = lengths[~values & interior] / frames_per_s
+    speech_seconds = float(speech.sum() / frames_per_s)
+
+    # Syllable nuclei: local energy peaks inside speech, >= 100 ms apart
+    smoothed = np.convolve(energy_db, np.ones(5) / 5, mode="same")
+    peak = np.zeros(len(smoothed), dtype=bool)
+    peak[1:-1] = (smoothed[1:-1] > smoothed[:-2]) & (smoothed[1:-1] >= smoothed[2:])
+    peak &= speech & (smoothed > noise_floor + VAD_MARGIN_DB + 3)
+    peak_idx = np.nonzero(peak)[0]
+    if len(peak_idx) > 1:
+        keep = np.concatenate(([True], np.diff(peak_idx) >= 0.1 * frames_per_s))
+        peak_idx = peak_idx[keep]
+    syllables = len(peak_idx)
+
+    voiced = f0[speech & ~np.isnan(f0)]
+    pitch_stats = {}
+    if len(voiced) >= 10:
+        semitones = 12 * np.log2(voiced / np.median(voiced))
+        p10, p90 = np.percentile(semitones, [10, 90])
+        pitch_stats = {
+            "pitch_mean_hz": round(float(voiced.mean()), 1),
+            "pitch_std_semitones": round(float(semitones.std()), 2),
+            "pitch_range_semitones": round(float(p90 - p10), 2),
+        }
+
+    return AudioFeatures(
+        duration_seconds=round(duration, 2),
+        speech_seconds=round(speech_seconds, 2),
+        speech_ratio=round(speech_seconds / duration, 3) if duration else 0.0,
+        pause_count=int(len(pauses)),
+        long_pause_count=int((pauses >= LONG_PAUSE_S).sum()),
+        mean_pause_seconds=round(float(pauses.mean()), 2) if len(pauses) else 0.0,
+        max_pause_seconds=round(float(pauses.max()), 2) if len(pauses) else 0.0,
+        pauses_per_minute=round(len(pauses) / duration * 60, 1) if duration else 0.0,
+        articulation_rate=round(syllables / speech_seconds, 2) if speech_seconds else 0.0,
+        words_per_minute=round(word_count / duration * 60, 1) if word_count and duration else None,
+        **pitch_stats
+    )
+
+
+def analyze_pcm(
+    data: bytes,
+    sample_rate: int,
+    sample_width: int = 2,
+    channels: int = 1,
+    word_count: Optional[int] = None
+) -> AudioFeatures:
+    """Analyze raw little-endian PCM bytes"""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    return analyze_pcm_samples(
+        _pcm_view(raw, sample_width, channels), sample_rate, sample_width, word_count
+    )
+
+
+def analyze_wav_bytes(data: bytes, word_count: Optional[int] = None) -> AudioFeatures:
+    """Analyze an in-memory WAV file"""
+    fmt = read_wav_header(io.BytesIO(data))
+    raw = np.frombuffer(data, dtype=np.uint8, offset=fmt.data_offset)[:fmt.data_size]
+    return analyze_pcm_samples(
+        _pcm_view(raw, fmt.sample_width, fmt.channels),
+        fmt.sample_rate, fmt.sample_width, word_count
+    )
+
+
+def analyze_wav_file(path: str, word_count: Optional[int] = None) -> AudioFeatures:
+    """Analyze a WAV file on disk through a read-only memory map"""
+    with open(path, "rb") as f:
+        fmt = read_wav_header(f)
+    raw = np.memmap(path, dtype=np.uint8, mode="r", offset=fmt.data_offset)
+    raw = raw[:fmt.data_size]
+    return analyze_pcm_samples(
+        _pcm_view(raw, fmt.sample_width, fmt.channels),
+        fmt.sample_rate, fmt.sample_width, word_count
+    )
+
+
+def analyze_pcm_file(
+    path: str,
+    sample_rate: int,
+    sample_width: int = 2,
+    channels: int = 1,
+    word_count: Optional[int] = None
+) -> AudioFeatures:
+    """Analyze a raw PCM file on disk through a read-only memory map"""
+    raw = np.memmap(path, dtype=np.uint8, mode="r")
+    return analyze_pcm_samples(
+        _pcm_view(raw, sample_width, channels), sample_rate, sample_width, word_count
+    )
+
+
+def summarize_turns(turn_features: Dict[Any, Dict[str, Any]]) -> Dict[str, Any]:
+    """Session-level audio summary from per-turn feature dicts"""
+    turns = list(turn_features.values())
+    if not turns:
+        return {}
+    duration = sum(t["duration_seconds"] for t in turns)
+    speech = sum(t["speech_seconds"] for t in turns)
+    pauses = sum(t["pause_count"] for t in turns)
+    pitch = [t["pitch_std_semitones"] for t in turns if t.get("pitch_std_semitones") is not None]
+    return {
+        "turns": len(turns),
+        "duration_seconds": round(duration, 2),
+        "speech_ratio": round(speech / duration, 3) if duration else 0.0,
+        "pause_count": pauses,
+        "long_pause_count": sum(t["long_pause_count"] for t in turns),
+        "max_pause_seconds": max(t["max_pause_seconds"] for t in turns),
+        "pauses_per_minute": round(pauses / duration * 60, 1) if duration else 0.0,
+        "articulation_rate": round(
+            sum(t["articulation_rate"] * t["speech_seconds"] for t in turns) / speech, 2
+        ) if speech else 0.0,
+        "pitch_std_semitones": round(float(np.mean(pitch)), 2) if pitch else None,
+    }
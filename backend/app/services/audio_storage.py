@@ -0,0 +1,106 @@
+"""
+Turn Audio Storage
+Streams uploaded recordings to disk chunk by chunk so a full recording
+is never held in memory; file writes run off the event loop. Recordings are
+kept for audio_retention_hours after upload, then swept by purge_expired.
+"""
+
+from typing import AsyncIterator, Optional
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+import anyio
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+class UploadTooLarge(Exception):
+    """Upload exceeded the configured size limit"""
+
+
+def turn_audio_path(session_id: str, turn_index: int, extension: str) -> str:
+    """Storage path for one turn's recording"""
+    if not _SAFE_ID.match(session_id) or session_id.startswith("."):
+        raise ValueError("Invalid session ID")
+    return os.path.join(settings.audio_upload_dir, session_id, f"turn_{turn_index}.{extension}")
+
+
+async def save_stream(chunks: AsyncIterator[bytes], path: str, max_bytes: int) -> int:
+    """
+    Write an async byte stream to path and return the number of bytes
+    
+    Data goes to a temporary file that is renamed into place only when the
+    upload completes, so readers never see partial recordings.
+    """
+    await anyio.to_thread.run_sync(lambda: os.makedirs(os.path.dirname(path), exist_ok=True))
+    tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+    written = 0
+    
+    f = await anyio.to_thread.run_sync(open, tmp_path, "wb")
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            written += len(chunk)
+            if written > max_bytes:
+                raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+            await anyio.to_thread.run_sync(f.write, chunk)
+        await anyio.to_thread.run_sync(f.close)
+        await anyio.to_thread.run_sync(os.replace, tmp_path, path)
+    except BaseException:
+        await anyio.to_thread.run_sync(f.close)
+        await anyio.to_thread.run_sync(lambda: os.path.exists(tmp_path) and os.remove(tmp_path))
+        raise
+    
+    return written
+
+
+def discard(path: str):
+    """Remove a recording that failed analysis; missing files are fine"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def purge_expired(max_age_seconds: Optional[float] = None, now: Optional[float] = None) -> int:
+    """Delete recordings older than the retention window and empty session dirs"""
+    max_age_seconds = settings.audio_retention_hours * 3600 if max_age_seconds is None else max_age_seconds
+    cutoff = (now or time.time()) - max_age_seconds
+    removed = 0
+    root = settings.audio_upload_dir
+    if not os.path.isdir(root):
+        return 0
+    for directory, _, files in os.walk(root, topdown=False):
+        for name in files:
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        if directory != root:
+            try:
+                os.rmdir(directory)  # only succeeds once the session dir is empty
+            except OSError:
+                pass
+    if removed:
+        logger.info("purged %d expired audio uploads", removed)
+    return removed
+
+
+async def purge_periodically():
+    """Run purge_expired at startup and then every audio_cleanup_interval_minutes"""
+    while True:
+        try:
+            await anyio.to_thread.run_sync(purge_expired)
+        except OSError:
+            logger.exception("audio upload cleanup failed")
+        await asyncio.sleep(settings.audio_cleanup_interval_minutes * 60)
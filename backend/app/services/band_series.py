@@ -0,0 +1,279 @@
+"""
+Band Score Time Series
+Per-user trajectory of overall and per-criterion bands, stored packed
+(float64 timestamps, float32 bands) in fixed-size chunk rows instead of being
+recomputed from session rows:
+- Amortized O(1) append into a growable array
+- O(1) stored append: only the user's last chunk (at most
+  band_series_chunk_points points) is rewritten; full chunks never are, and
+  chunks beyond the newest max points are deleted by primary key
+- Vectorized least-squares trend, volatility and projection for all series at once
+- Missing criterion bands are NaN and ignored per series
+- Each point keeps the IELTS part it was scored on (0 for a full test)
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime, timezone
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models import models
+
+SERIES = ("overall", "fluency", "grammar", "vocabulary", "pronunciation")
+TIME_DTYPE = np.dtype("<f8")  # epoch seconds
+BAND_DTYPE = np.dtype("<f4")
+PART_DTYPE = np.dtype("u1")  # 1-3, 0 for a full test or unknown
+DAY = 86400.0
+
+
+def _epoch(timestamp: datetime) -> float:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+class BandSeries:
+    """Growable arrays of (timestamp, bands, part); capacity doubles when full"""
+
+    def __init__(
+        self,
+        timestamps: Optional[np.ndarray] = None,
+        bands: Optional[np.ndarray] = None,
+        parts: Optional[np.ndarray] = None
+    ):
+        n = 0 if timestamps is None else len(timestamps)
+        capacity = max(16, n)
+        self._times = np.empty(capacity, dtype=TIME_DTYPE)
+        self._bands = np.full((capacity, len(SERIES)), np.nan, dtype=BAND_DTYPE)
+        self._parts = np.zeros(capacity, dtype=PART_DTYPE)
+        if n:
+            self._times[:n] = timestamps
+            self._bands[:n] = bands
+            if parts is not None:
+                self._parts[:n] = parts
+        self.size = n
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._times[:self.size]
+
+    @property
+    def bands(self) -> np.ndarray:
+        return self._bands[:self.size]
+
+    @property
+    def parts(self) -> np.ndarray:
+        return self._parts[:self.size]
+
+    def append(self, timestamp: datetime, bands: Dict[str, Optional[float]], part: Optional[int] = None):
+        if self.size == len(self._times):
+            self._grow()
+        self._times[self.size] = _epoch(timestamp)
+        self._bands[self.size] = [
+            np.nan if bands.get(name) is None else bands[name] for name in SERIES
+        ]
+        self._parts[self.size] = part or 0
+        self.size += 1
+
+    def _grow(self):
+        capacity = 2 * len(self._times)
+        times = np.empty(capacity, dtype=TIME_DTYPE)
+        bands = np.full((capacity, len(SERIES)), np.nan, dtype=BAND_DTYPE)
+        parts = np.zeros(capacity, dtype=PART_DTYPE)
+        times[:self.size] = self.timestamps
+        bands[:self.size] = self.bands
+        parts[:self.size] = self.parts
+        self._times, self._bands, self._parts = times, bands, parts
+
+    # Packing
+
+    def pack(self) -> Dict[str, bytes]:
+        return {
+            "timestamps": self.timestamps.tobytes(),
+            "bands": self.bands.tobytes(),
+            "parts": self.parts.tobytes()
+        }
+
+    @classmethod
+    def unpack(cls, timestamps: Optional[bytes], bands: Optional[bytes], parts: Optional[bytes] = None) -> "BandSeries":
+        if not timestamps:
+            return cls()
+        return cls(
+            np.frombuffer(timestamps, dtype=TIME_DTYPE),
+            np.frombuffer(bands, dtype=BAND_DTYPE).reshape(-1, len(SERIES)),
+            np.frombuffer(parts, dtype=PART_DTYPE) if parts else None
+        )
+
+    # Analysis
+
+    def analyze(self, window: Optional[int] = None, horizon_days: Optional[float] = None) -> Dict[str, Any]:
+        """Per series: latest, mean, trend per 30 days, volatility and projected band"""
+        window = window or settings.band_series_window
+        horizon_days = settings.band_projection_days if horizon_days is None else horizon_days
+        times = self.timestamps[-window:]
+        bands = self.bands[-window:].astype(np.float64)
+
+        summary: Dict[str, Any] = {"points": int(len(times)), "horizon_days": horizon_days}
+        if not len(times):
+            return {**summary, "series": {}}
+
+        days = (times - times[-1]) / DAY  # 0 at the latest point
+        mask = ~np.isnan(bands)
+        counts = mask.sum(axis=0)
+        values = np.where(mask, bands, 0.0)
+        x = np.where(mask, days[:, None], 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x_mean = x.sum(axis=0) / counts
+            y_mean = values.sum(axis=0) / counts
+            dx = np.where(mask, days[:, None] - x_mean, 0.0)
+            dy = np.where(mask, bands - y_mean, 0.0)
+            sxx = (dx * dx).sum(axis=0)
+            slope = np.where(sxx > 0, (dx * dy).sum(axis=0) / sxx, 0.0)
+            residuals = np.where(mask, dy - slope * dx, 0.0)
+            volatility = np.sqrt((residuals * residuals).sum(axis=0) / np.maximum(counts - 2, 1))
+            # Fitted value at the latest point, carried forward along the trend
+            projected = np.clip(y_mean + slope * (horizon_days - x_mean), 0.0, 9.0)
+
+        # Latest non-missing value per series
+        last_index = np.where(mask.any(axis=0), len(days) - 1 - np.argmax(mask[::-1], axis=0), -1)
+
+        series = {}
+        for i, name in enumerate(SERIES):
+            if not counts[i]:
+                continue
+            series[name] = {
+                "latest": round(float(bands[last_index[i], i]), 1),
+                "mean": round(float(y_mean[i]), 2),
+                "trend_per_30_days": round(float(slope[i] * 30), 2),
+                "volatility": round(float(volatility[i]), 2) if counts[i] > 2 else None,
+                "projected": round(float(projected[i]), 1) if counts[i] > 1 else None
+            }
+        return {**summary, "series": series}
+
+    def chart(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Points for plotting, oldest first (None where a band or the part is missing)"""
+        times = self.timestamps[-limit:] if limit else self.timestamps
+        bands = self.bands[-len(times):] if len(times) else self.bands
+        parts = self.parts[-len(times):] if len(times) else self.parts
+        return {
+            "timestamps": [
+                datetime.fromtimestamp(t, tz=timezone.utc).replace(tzinfo=None).isoformat()
+                for t in times
+            ],
+            "series": {
+                name: [None if np.isnan(v) else round(float(v), 1) for v in bands[:, i]]
+                for i, name in enumerate(SERIES)
+            },
+            "parts": [int(part) or None for part in parts]
+        }
+
+
+def _chunks_query(user_id: int):
+    return (
+        select(models.BandSeriesChunk)
+        .where(models.BandSeriesChunk.user_id == user_id)
+        .order_by(models.BandSeriesChunk.chunk)
+    )
+
+
+def _last_chunk_query(user_id: int):
+    return (
+        select(models.BandSeriesChunk)
+        .where(models.BandSeriesChunk.user_id == user_id)
+        .order_by(models.BandSeriesChunk.chunk.desc())
+        .limit(1)
+        .with_for_update()
+    )
+
+
+def _chunk_for_append(last: Optional[models.BandSeriesChunk], user_id: int) -> Tuple[models.BandSeriesChunk, Any]:
+    """
+    The chunk that takes the next point: the last one, or a new one once it
+    is full. A new chunk comes with a DELETE of the chunks no longer needed
+    to hold the newest max points (None if there are none).
+    """
+    size = settings.band_series_chunk_points
+    if last is not None and (last.points or 0) < size:
+        return last, None
+    index = 0 if last is None else last.chunk + 1
+    # Full chunks kept before the new one so that at least max points remain
+    keep = -(-settings.band_series_max_points // size)
+    stale = None
+    if index > keep:
+        stale = (
+            delete(models.BandSeriesChunk)
+            .where(models.BandSeriesChunk.user_id == user_id)
+            .where(models.BandSeriesChunk.chunk < index - keep)
+        )
+    return models.BandSeriesChunk(user_id=user_id, chunk=index, points=0), stale
+
+
+def _parts_blob(row: models.BandSeriesChunk) -> bytes:
+    # Chunks written before parts were stored: every point is "unknown"
+    return row.parts or bytes(row.points or 0)
+
+
+def _append(row: models.BandSeriesChunk, timestamp: datetime, bands: Dict[str, Optional[float]], part: Optional[int]):
+    """Append one packed point to a chunk's blobs (bounded by the chunk size)"""
+    point = BandSeries()
+    point.append(timestamp, bands, part)
+    packed = point.pack()
+    row.timestamps = (row.timestamps or b"") + packed["timestamps"]
+    row.bands = (row.bands or b"") + packed["bands"]
+    row.parts = _parts_blob(row) + packed["parts"]
+    row.points = (row.points or 0) + 1
+    row.updated_at = datetime.utcnow()
+
+
+def _join(chunks: List[models.BandSeriesChunk]) -> BandSeries:
+    """Concatenate chunks oldest first, keeping the newest max points"""
+    series = BandSeries.unpack(
+        b"".join(chunk.timestamps or b"" for chunk in chunks),
+        b"".join(chunk.bands or b"" for chunk in chunks),
+        b"".join(_parts_blob(chunk) for chunk in chunks)
+    )
+    keep = settings.band_series_max_points
+    if len(series) <= keep:
+        return series
+    return BandSeries(series.timestamps[-keep:], series.bands[-keep:], series.parts[-keep:])
+
+
+def append_point_sync(
+    db: Session,
+    user_id: int,
+    timestamp: datetime,
+    bands: Dict[str, Optional[float]],
+    part: Optional[int] = None
+):
+    row, stale = _chunk_for_append(db.scalar(_last_chunk_query(user_id)), user_id)
+    if stale is not None:
+        db.execute(stale)
+    db.add(row)
+    _append(row, timestamp, bands, part)
+
+
+async def append_point(
+    db: AsyncSession,
+    user_id: int,
+    timestamp: datetime,
+    bands: Dict[str, Optional[float]],
+    part: Optional[int] = None
+):
+    row, stale = _chunk_for_append(await db.scalar(_last_chunk_query(user_id)), user_id)
+    if stale is not None:
+        await db.execute(stale)
+    db.add(row)
+    _append(row, timestamp, bands, part)
+
+
+def load_series_sync(db: Session, user_id: int) -> BandSeries:
+    return _join(db.scalars(_chunks_query(user_id)).all())
+
+
+async def load_series(db: AsyncSession, user_id: int) -> BandSeries:
+    return _join((await db.scalars(_chunks_query(user_id))).all())
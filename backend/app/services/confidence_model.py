@@ -0,0 +1,252 @@
+"""
+Distilled Confidence Classifier
+A small ordinal logistic model trained offline on logged ConfidenceAgent
+LLM outputs, served in-process instead of the per-turn LLM call:
+- Feature extraction from speech_patterns
+- Training log (JSON lines of inputs and LLM outputs)
+- NumPy-only proportional-odds training and prediction
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+import threading
+import json
+import os
+from app.core.config import settings
+
+LEVELS = ["low", "medium", "high"]
+
+FEATURES = [
+    "words_per_minute",
+    "speech_ratio",
+    "pauses_per_minute",
+    "long_pause_count",
+    "mean_pause_seconds",
+    "max_pause_seconds",
+    "articulation_rate",
+    "pitch_std_semitones",
+    "hesitation_count",
+    "duration_seconds",
+]
+
+_log_lock = threading.Lock()
+
+
+def _lookup(speech_patterns: Dict[str, Any], name: str) -> Optional[float]:
+    """Server audio features first, then live statistics, then client metadata"""
+    for source in (speech_patterns.get("audio"), speech_patterns.get("live"), speech_patterns):
+        if isinstance(source, dict) and source.get(name) is not None:
+            try:
+                return float(source[name])
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def confidence_features(speech_patterns: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """Numeric features of one turn, None where unknown"""
+    features = {name: _lookup(speech_patterns, name) for name in FEATURES}
+    if features["hesitation_count"] is None:
+        features["hesitation_count"] = _lookup(speech_patterns, "filler_count")
+
+    duration = features["duration_seconds"]
+    if features["pauses_per_minute"] is None and duration:
+        pauses = _lookup(speech_patterns, "pause_count")
+        if pauses is not None:
+            features["pauses_per_minute"] = round(pauses / duration * 60, 2)
+    return features
+
+
+def feature_vector(speech_patterns: Dict[str, Any]) -> np.ndarray:
+    """Features in FEATURES order, NaN where unknown"""
+    features = confidence_features(speech_patterns)
+    return np.array(
+        [np.nan if features[name] is None else features[name] for name in FEATURES],
+        dtype=np.float64
+    )
+
+
+def log_example(
+    speech_patterns: Dict[str, Any],
+    analysis: Dict[str, Any],
+    prediction: Optional[Dict[str, Any]] = None,
+    path: Optional[str] = None
+):
+    """Append one LLM-labelled turn to the training log"""
+    path = path or settings.confidence_log_path
+    if not path:
+        return
+    record = {
+        "features": confidence_features(speech_patterns),
+        "label": analysis.get("confidence_level"),
+        "output": analysis,
+        "prediction": prediction
+    }
+    line = json.dumps(record, default=str)
+    with _log_lock:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a") as f:
+            f.write(line + "\n")
+
+
+def load_log(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Feature matrix and level indices from a training log"""
+    rows, labels = [], []
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("label") not in LEVELS:
+                continue
+            features = record.get("features", {})
+            rows.append([
+                np.nan if features.get(name) is None else float(features[name])
+                for name in FEATURES
+            ])
+            labels.append(LEVELS.index(record["label"]))
+    return np.array(rows, dtype=np.float64).reshape(-1, len(FEATURES)), np.array(labels, dtype=np.int64)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -30, 30)))
+
+
+class ConfidenceModel:
+    """
+    Proportional-odds (ordinal logistic) model over standardized features:
+    P(level <= k) = sigmoid(thresholds[k] - x . weights)
+    """
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        thresholds: np.ndarray,
+        mean: np.ndarray,
+        scale: np.ndarray
+    ):
+        self.weights = weights
+        self.thresholds = thresholds
+        self.mean = mean
+        self.scale = scale
+
+    def _standardize(self, X: np.ndarray) -> np.ndarray:
+        X = np.atleast_2d(X)
+        # Unknown features sit at the training mean
+        X = np.where(np.isnan(X), self.mean, X)
+        return (X - self.mean) / self.scale
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities in LEVELS order, one row per sample"""
+        scores = self._standardize(X) @ self.weights
+        cumulative = _sigmoid(self.thresholds[None, :] - scores[:, None])
+        cumulative = np.hstack([np.zeros((len(scores), 1)), cumulative, np.ones((len(scores), 1))])
+        return np.diff(cumulative, axis=1)
+
+    def predict(self, speech_patterns: Dict[str, Any]) -> Tuple[str, float]:
+        """Most likely level and its probability for one turn"""
+        proba = self.predict_proba(feature_vector(speech_patterns))[0]
+        best = int(proba.argmax())
+        return LEVELS[best], float(proba[best])
+
+    @classmethod
+    def fit(
+        cls,
+        X: np.ndarray,
+        y: np.ndarray,
+        l2: float = 0.01,
+        learning_rate: float = 0.1,
+        iterations: int = 2000
+    ) -> "ConfidenceModel":
+        """Full-batch gradient descent on the ordinal negative log-likelihood"""
+        mean = np.nanmean(X, axis=0)
+        mean = np.where(np.isnan(mean), 0.0, mean)
+        filled = np.where(np.isnan(X), mean, X)
+        scale = filled.std(axis=0)
+        scale = np.where(scale > 1e-9, scale, 1.0)
+        Z = (filled - mean) / scale
+
+        n, k = len(y), len(LEVELS)
+        weights = np.zeros(Z.shape[1])
+        # Start the cut points at the empirical class boundaries
+        cumulative = np.clip(np.cumsum(np.bincount(y, minlength=k))[:-1] / n, 0.01, 0.99)
+        thresholds = np.log(cumulative / (1 - cumulative))
+
+        rows = np.arange(n)
+        for _ in range(iterations):
+            scores = Z @ weights
+            cuts = np.hstack([np.full((n, 1), -np.inf), thresholds - scores[:, None], np.full((n, 1), np.inf)])
+            upper, lower = _sigmoid(cuts[rows, y + 1]), _sigmoid(cuts[rows, y])
+            prob = np.maximum(upper - lower, 1e-12)
+            d_upper, d_lower = upper * (1 - upper), lower * (1 - lower)
+
+            # d(-log p)/d score and d(-log p)/d thresholds
+            grad_scores = (d_upper - d_lower) / prob
+            grad_weights = Z.T @ grad_scores / n + l2 * weights
+            grad_thresholds = np.zeros(k - 1)
+            np.add.at(grad_thresholds, y[y < k - 1], -(d_upper / prob)[y < k - 1])
+            np.add.at(grad_thresholds, y[y > 0] - 1, (d_lower / prob)[y > 0])
+            grad_thresholds /= n
+
+            weights -= learning_rate * grad_weights
+            thresholds = np.sort(thresholds - learning_rate * grad_thresholds)
+
+        return cls(weights, thresholds, mean, scale)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(
+            path,
+            weights=self.weights,
+            thresholds=self.thresholds,
+            mean=self.mean,
+            scale=self.scale,
+            features=np.array(FEATURES)
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ConfidenceModel":
+        data = np.load(path)
+        if list(data["features"]) != FEATURES:
+            raise ValueError("Confidence model was trained on a different feature set")
+        return cls(data["weights"], data["thresholds"], data["mean"], data["scale"])
+
+
+_model: Optional[ConfidenceModel] = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def get_confidence_model() -> Optional[ConfidenceModel]:
+    """Shared model, loaded on first use; None until one has been trained"""
+    global _model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                path = settings.confidence_model_path
+                if path and os.path.exists(path):
+                    try:
+                        _model = ConfidenceModel.load(path)
+                    except (OSError, KeyError, ValueError):
+                        _model = None
+                _model_loaded = True
+    return _model
+
+
+def nervousness_indicators(speech_patterns: Dict[str, Any]) -> List[str]:
+    """Rule-based indicators that accompany a local prediction"""
+    features = confidence_features(speech_patterns)
+    indicators = []
+    wpm = features["words_per_minute"]
+    if wpm is not None and wpm > 180:
+        indicators.append("Rushed speech")
+    if wpm is not None and wpm < 90:
+        indicators.append("Very slow pace")
+    if (features["long_pause_count"] or 0) >= 2 or (features["max_pause_seconds"] or 0) >= 3:
+        indicators.append("Long pauses")
+    if (features["hesitation_count"] or 0) >= 5:
+        indicators.append("Frequent hesitations")
+    if features["pitch_std_semitones"] is not None and features["pitch_std_semitones"] < 1.5:
+        indicators.append("Flat intonation")
+    return indicators
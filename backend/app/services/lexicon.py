@@ -0,0 +1,338 @@
+"""
+Word Frequency / CEFR Lexicon
+Compact hash index over word-frequency ranks, CEFR levels and common
+collocations, memory-mapped from disk and loaded lazily on first use.
+
+Sources live in app/data/lexicon/*.tsv. The index is compiled into
+.npy files next to them (rebuilt automatically when a source changes):
+- words.npy: open-addressing hash table (key, rank, cefr)
+- collocations.npy: open-addressing hash set of word-pair keys
+
+A bigger frequency list can be dropped into words.tsv (word, rank, cefr)
+without code changes. Rebuild manually with:
+    python -m app.services.lexicon
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+import hashlib
+import os
+import threading
+import numpy as np
+from app.services.transcript_analysis import tokenize, STOPWORDS
+
+LEXICON_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "lexicon")
+
+CEFR_LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+OFF_LIST = 0  # cefr code for words missing from the lexicon
+
+WORD_DTYPE = np.dtype([("key", "<u8"), ("rank", "<u4"), ("cefr", "u1")])
+
+# Determiners skipped when matching collocations ("make a decision")
+_SKIP_IN_COLLOCATION = {"a", "an", "the", "some", "my", "your", "his", "her", "our", "their", "its"}
+
+_IRREGULAR = {
+    "went": "go", "gone": "go", "made": "make", "took": "take", "taken": "take",
+    "did": "do", "done": "do", "had": "have", "has": "have", "kept": "keep",
+    "caught": "catch", "spent": "spend", "met": "meet", "paid": "pay",
+    "gave": "give", "given": "give", "got": "get", "saw": "see", "seen": "see",
+    "came": "come", "thought": "think", "felt": "feel", "found": "find",
+    "told": "tell", "said": "say", "was": "be", "were": "be", "is": "be",
+    "are": "be", "am": "be", "been": "be", "children": "child", "people": "people",
+    "better": "good", "best": "good", "worse": "bad", "worst": "bad",
+}
+
+
+def word_key(text: str) -> int:
+    """Stable non-zero 64-bit key (0 marks an empty slot)"""
+    key = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+    return key or 1
+
+
+def lemma_candidates(word: str) -> List[str]:
+    """Cheap inflection stripping, tried in order after the exact form"""
+    if word in _IRREGULAR:
+        return [_IRREGULAR[word]]
+    candidates = []
+    if word.endswith("ies") and len(word) > 4:
+        candidates.append(word[:-3] + "y")
+    if word.endswith("es") and len(word) > 3:
+        candidates.append(word[:-2])
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        candidates.append(word[:-1])
+    if word.endswith("ied") and len(word) > 4:
+        candidates.append(word[:-3] + "y")
+    if word.endswith("ed") and len(word) > 4:
+        candidates.extend([word[:-2], word[:-1]])
+        if len(word) > 5 and word[-3] == word[-4]:
+            candidates.append(word[:-3])
+    if word.endswith("ing") and len(word) > 5:
+        candidates.extend([word[:-3], word[:-3] + "e"])
+        if word[-4] == word[-5]:
+            candidates.append(word[:-4])
+    if word.endswith("ly") and len(word) > 4:
+        candidates.append(word[:-2])
+    return candidates
+
+
+def _table_size(n: int) -> int:
+    size = 8
+    while size < n * 2:
+        size *= 2
+    return size
+
+
+def _insert(table: np.ndarray, key: int) -> int:
+    mask = len(table) - 1
+    slot = key & mask
+    keys = table["key"] if table.dtype.names else table
+    while keys[slot] != 0 and keys[slot] != key:
+        slot = (slot + 1) & mask
+    return slot
+
+
+def _read_tsv(path: str) -> List[List[str]]:
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            rows.append(line.rstrip("\n").split("\t"))
+    return rows
+
+
+def build_index(source_dir: str = LEXICON_DIR, out_dir: Optional[str] = None):
+    """Compile the TSV sources into memory-mappable hash tables"""
+    out_dir = out_dir or source_dir
+
+    words = _read_tsv(os.path.join(source_dir, "words.tsv"))
+    table = np.zeros(_table_size(len(words)), dtype=WORD_DTYPE)
+    for word, rank, cefr in words:
+        key = word_key(word.lower())
+        slot = _insert(table, key)
+        if table["key"][slot] == key:
+            continue  # first (most frequent) entry wins
+        table[slot] = (key, int(rank), CEFR_LEVELS.index(cefr.upper()) + 1)
+
+    pairs = _read_tsv(os.path.join(source_dir, "collocations.tsv"))
+    collocations = np.zeros(_table_size(len(pairs)), dtype="<u8")
+    for first, second in pairs:
+        key = word_key(f"{first.lower()} {second.lower()}")
+        collocations[_insert(collocations, key)] = key
+
+    # Write to temp files and rename so readers never see partial files
+    for name, array in (("words.npy", table), ("collocations.npy", collocations)):
+        tmp = os.path.join(out_dir, f".{name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp, os.path.join(out_dir, name))
+
+
+def _probe(table: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """
+    Vectorized linear probing
+    Returns the slot of each key, or -1 when absent
+    """
+    stored = table["key"] if table.dtype.names else table
+    mask = np.uint64(len(stored) - 1)
+    slots = (keys & mask).astype(np.int64)
+    result = np.full(len(keys), -1, dtype=np.int64)
+    active = np.arange(len(keys))
+    for _ in range(len(stored)):
+        if not len(active):
+            break
+        found = stored[slots[active]]
+        hit = found == keys[active]
+        result[active[hit]] = slots[active[hit]]
+        active = active[~hit & (found != 0)]
+        slots[active] = (slots[active] + 1) & int(mask)
+    return result
+
+
+class Lexicon:
+    """Memory-mapped lexicon with O(1) expected lookups"""
+
+    def __init__(self, directory: str = LEXICON_DIR):
+        self.directory = directory
+        self.words = np.load(os.path.join(directory, "words.npy"), mmap_mode="r")
+        self.collocations = np.load(os.path.join(directory, "collocations.npy"), mmap_mode="r")
+
+    def lookup_many(self, words: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Frequency ranks and CEFR codes (0 = off-list) for many words"""
+        ranks = np.zeros(len(words), dtype=np.int64)
+        cefr = np.zeros(len(words), dtype=np.int64)
+        if not words:
+            return ranks, cefr
+        keys = np.array([word_key(w) for w in words], dtype=np.uint64)
+        slots = _probe(self.words, keys)
+        found = slots >= 0
+        ranks[found] = self.words["rank"][slots[found]]
+        cefr[found] = self.words["cefr"][slots[found]]
+
+        # Retry misses with their lemma candidates
+        for i in np.nonzero(~found)[0]:
+            for candidate in lemma_candidates(words[i]):
+                slot = _probe(self.words, np.array([word_key(candidate)], dtype=np.uint64))[0]
+                if slot >= 0:
+                    ranks[i] = self.words["rank"][slot]
+                    cefr[i] = self.words["cefr"][slot]
+                    break
+        return ranks, cefr
+
+    def lookup(self, word: str) -> Dict[str, Any]:
+        """Rank and CEFR level of a single word"""
+        ranks, cefr = self.lookup_many([word.lower()])
+        return {
+            "word": word,
+            "rank": int(ranks[0]) or None,
+            "cefr": CEFR_LEVELS[cefr[0] - 1] if cefr[0] else None
+        }
+
+    def is_collocation(self, first: str, second: str) -> bool:
+        keys = np.array([word_key(f"{first} {second}")], dtype=np.uint64)
+        return bool(_probe(self.collocations, keys)[0] >= 0)
+
+    def find_collocations(self, words: List[str]) -> List[str]:
+        """Known collocations among adjacent words, determiners skipped"""
+        tokens = [w for w in words if w not in _SKIP_IN_COLLOCATION]
+        variants, owners = [], []
+        for i, (a, b) in enumerate(zip(tokens, tokens[1:])):
+            for first in [a] + lemma_candidates(a):
+                for second in [b] + lemma_candidates(b):
+                    variants.append(f"{first} {second}")
+                    owners.append(i)
+        if not variants:
+            return []
+
+        keys = np.array([word_key(v) for v in variants], dtype=np.uint64)
+        hits = _probe(self.collocations, keys) >= 0
+        found, matched_pairs = [], set()
+        for variant, owner, hit in zip(variants, owners, hits):
+            if hit and owner not in matched_pairs:
+                matched_pairs.add(owner)
+                if variant not in found:
+                    found.append(variant)
+        return found
+
+    def profile(self, transcript: str) -> Dict[str, Any]:
+        """
+        Lexical sophistication profile of a transcript
+        Shares of content words per CEFR level, mean log frequency rank,
+        the most sophisticated words used and known collocations
+        """
+        tokens = tokenize(transcript)
+        words = [t for t in tokens if t[0].isalpha()]
+        content = [w for w in words if w not in STOPWORDS]
+        if not content:
+            return {"content_words": 0}
+
+        ranks, cefr = self.lookup_many(content)
+        levels = np.bincount(cefr, minlength=len(CEFR_LEVELS) + 1)
+        total = len(content)
+        known = ranks > 0
+        advanced = cefr >= CEFR_LEVELS.index("B2") + 1
+
+        # Off-list words are either rare vocabulary or names/typos,
+        # so only long ones count towards sophistication
+        off_list = [w for w, c in zip(content, cefr) if c == OFF_LIST]
+        rare = sorted({w for w in off_list if len(w) >= 7})
+
+        order = np.argsort(-cefr, kind="stable")
+        sophisticated = []
+        for i in order:
+            if cefr[i] < CEFR_LEVELS.index("B2") + 1 or len(sophisticated) >= 10:
+                break
+            if content[i] not in sophisticated:
+                sophisticated.append(content[i])
+
+        advanced_share = (advanced.sum() + len(rare)) / total
+        return {
+            "content_words": total,
+            "cefr_distribution": {
+                level: round(float(levels[i + 1]) / total, 3) for i, level in enumerate(CEFR_LEVELS)
+            },
+            "off_list_share": round(float(levels[OFF_LIST]) / total, 3),
+            "advanced_share": round(float(advanced_share), 3),
+            "mean_log_rank": round(float(np.log10(ranks[known]).mean()), 2) if known.any() else None,
+            "sophisticated_words": sophisticated,
+            "rare_words": rare[:10],
+            "collocations": self.find_collocations(words),
+            "lexical_range_hint": lexical_range_hint(float(advanced_share))
+        }
+
+
+def lexical_range_hint(advanced_share: float) -> str:
+    """Rough IELTS lexical range from the share of B2+ content words"""
+    if advanced_share < 0.05:
+        return "limited"
+    if advanced_share < 0.12:
+        return "adequate"
+    if advanced_share < 0.22:
+        return "wide"
+    return "very_wide"
+
+
+def tag_vocabulary(
+    entries: List[Dict[str, Any]],
+    min_level: Optional[str] = None,
+    max_level: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Tag vocabulary entries with CEFR level and frequency rank, then keep
+    those inside [min_level, max_level]. Multi-word entries take the level
+    of their hardest word; off-list words are treated as C2 when filtering.
+    """
+    lexicon = get_lexicon()
+    low = CEFR_LEVELS.index(min_level.upper()) + 1 if min_level else 1
+    high = CEFR_LEVELS.index(max_level.upper()) + 1 if max_level else len(CEFR_LEVELS)
+
+    tagged = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        words = [t for t in tokenize(str(entry.get("word", ""))) if t[0].isalpha()]
+        ranks, cefr = lexicon.lookup_many(words)
+        if len(words) and (cefr > 0).all():
+            hardest = int(np.argmax(cefr))
+            level, rank = int(cefr[hardest]), int(ranks.max())
+        else:
+            level, rank = OFF_LIST, None
+        effective = level or len(CEFR_LEVELS)
+        if not low <= effective <= high:
+            continue
+        tagged.append({
+            **entry,
+            "cefr_level": CEFR_LEVELS[level - 1] if level else None,
+            "frequency_rank": rank
+        })
+    return tagged
+
+
+def _index_is_stale(directory: str) -> bool:
+    for source, index in (("words.tsv", "words.npy"), ("collocations.tsv", "collocations.npy")):
+        index_path = os.path.join(directory, index)
+        if not os.path.exists(index_path):
+            return True
+        if os.path.getmtime(index_path) < os.path.getmtime(os.path.join(directory, source)):
+            return True
+    return False
+
+
+_lexicon: Optional[Lexicon] = None
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon() -> Lexicon:
+    """Shared lexicon, built and memory-mapped on first use"""
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                if _index_is_stale(LEXICON_DIR):
+                    build_index(LEXICON_DIR)
+                _lexicon = Lexicon(LEXICON_DIR)
+    return _lexicon
+
+
+if __name__ == "__main__":
+    build_index(LEXICON_DIR)
+    print(f"Lexicon index written to {LEXICON_DIR}")
@@ -0,0 +1,208 @@
+"""
+Near-Duplicate Index
+MinHash signatures with LSH banding over generated content (questions,
+cue cards, topics, vocabulary):
+- Near-duplicate lookup in sublinear time (only LSH bucket mates are checked)
+- Per-user history: "has this learner already seen something like it?"
+- Append-only files on disk, updated incrementally and reloaded on start
+"""
+
+from typing import Dict, List, Any, Optional, Set, Tuple
+import numpy as np
+import threading
+import hashlib
+import json
+import os
+import re
+from app.core.config import settings
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows: candidate pairs from ~0.5 Jaccard upwards
+SHINGLE_SIZE = 4  # character n-grams, robust for short questions
+
+# Universal hashing modulo a prime just below 2^32
+_PRIME = np.uint64(4294967291)
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, 2 ** 31, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2 ** 31, NUM_PERM, dtype=np.uint64)
+
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+
+
+def normalize(text: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def shingles(text: str) -> Set[str]:
+    text = normalize(text)
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(text: str) -> np.ndarray:
+    """MinHash signature, NUM_PERM uint32 values"""
+    grams = shingles(text)
+    if not grams:
+        return np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint32)
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(g.encode(), digest_size=4).digest(), "little") for g in grams],
+        dtype=np.uint64
+    )
+    # (a * x + b) mod p for every permutation and shingle at once
+    permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Jaccard estimate from two signatures"""
+    return float((a == b).mean())
+
+
+class NearDuplicateIndex:
+    """
+    LSH index over MinHash signatures, optionally persisted to a directory:
+    signatures.u32 (raw rows), documents.jsonl and history.jsonl are
+    append-only, so every add is a small incremental write.
+    """
+
+    def __init__(self, directory: Optional[str] = None, threshold: Optional[float] = None):
+        self.directory = directory
+        self.threshold = threshold if threshold is not None else settings.dedup_threshold
+        self.rows = NUM_PERM // BANDS
+
+        self.signatures = np.empty((0, NUM_PERM), dtype=np.uint32)
+        self.documents: List[Dict[str, Any]] = []
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(BANDS)]
+        self.history: Dict[Any, Set[int]] = {}
+        self.lock = threading.Lock()
+
+        if directory:
+            self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self._path("documents.jsonl")):
+            with open(self._path("documents.jsonl")) as f:
+                self.documents = [json.loads(line) for line in f if line.strip()]
+        if os.path.exists(self._path("signatures.u32")):
+            raw = np.fromfile(self._path("signatures.u32"), dtype=np.uint32)
+            # A torn last write leaves a partial row, drop it
+            n = min(len(raw) // NUM_PERM, len(self.documents))
+            self.signatures = raw[:n * NUM_PERM].reshape(n, NUM_PERM).copy()
+        self.documents = self.documents[:len(self.signatures)]
+        for doc_id in range(len(self.documents)):
+            self._index(doc_id, self.signatures[doc_id])
+        if os.path.exists(self._path("history.jsonl")):
+            with open(self._path("history.jsonl")) as f:
+                for line in f:
+                    entry = json.loads(line)
+                    if entry["doc"] < len(self.documents):
+                        self.history.setdefault(entry["user"], set()).add(entry["doc"])
+
+    def _band_keys(self, sig: np.ndarray) -> List[bytes]:
+        return [sig[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(BANDS)]
+
+    def _index(self, doc_id: int, sig: np.ndarray):
+        for band, key in enumerate(self._band_keys(sig)):
+            self.buckets[band].setdefault(key, []).append(doc_id)
+
+    def _candidates(self, sig: np.ndarray) -> Set[int]:
+        found: Set[int] = set()
+        for band, key in enumerate(self._band_keys(sig)):
+            found.update(self.buckets[band].get(key, ()))
+        return found
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def query(
+        self,
+        text: str,
+        kind: Optional[str] = None,
+        sig: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """Near-duplicates of text as (doc_id, similarity), most similar first"""
+        sig = signature(text) if sig is None else sig
+        with self.lock:
+            candidates = self._candidates(sig)
+            matches = []
+            for doc_id in candidates:
+                if kind is not None and self.documents[doc_id]["kind"] != kind:
+                    continue
+                score = similarity(sig, self.signatures[doc_id])
+                if score >= self.threshold:
+                    matches.append((doc_id, score))
+        return sorted(matches, key=lambda m: -m[1])
+
+    def is_duplicate(self, text: str, kind: Optional[str] = None) -> bool:
+        return bool(self.query(text, kind))
+
+    def add(self, text: str, kind: str) -> int:
+        """Index text unconditionally, returns its doc id"""
+        return self._add(text, kind, signature(text))
+
+    def _add(self, text: str, kind: str, sig: np.ndarray) -> int:
+        with self.lock:
+            doc_id = len(self.documents)
+            document = {"kind": kind, "text": text}
+            self.documents.append(document)
+            if doc_id == len(self.signatures):
+                # Grow by doubling so appends stay amortized O(1)
+                grown = np.empty((max(64, 2 * doc_id), NUM_PERM), dtype=np.uint32)
+                grown[:doc_id] = self.signatures[:doc_id]
+                self.signatures = grown
+            self.signatures[doc_id] = sig
+            self._index(doc_id, sig)
+            if self.directory:
+                with open(self._path("signatures.u32"), "ab") as f:
+                    f.write(sig.tobytes())
+                with open(self._path("documents.jsonl"), "a") as f:
+                    f.write(json.dumps(document) + "\n")
+        return doc_id
+
+    def add_if_novel(self, text: str, kind: str) -> bool:
+        """Index text unless a near-duplicate of the same kind exists"""
+        sig = signature(text)
+        if self.query(text, kind, sig):
+            return False
+        self._add(text, kind, sig)
+        return True
+
+    def is_novel_for_user(self, user_id: Any, text: str, kind: Optional[str] = None) -> bool:
+        """True unless the user has already seen a near-duplicate"""
+        seen = self.history.get(user_id)
+        if not seen:
+            return True
+        return not any(doc_id in seen for doc_id, _ in self.query(text, kind))
+
+    def record_seen(self, user_id: Any, text: str, kind: str) -> int:
+        """Add text to the user's history, reusing an existing near-duplicate doc"""
+        sig = signature(text)
+        matches = self.query(text, kind, sig)
+        doc_id = matches[0][0] if matches else self._add(text, kind, sig)
+        with self.lock:
+            seen = self.history.setdefault(user_id, set())
+            if doc_id not in seen:
+                seen.add(doc_id)
+                if self.directory:
+                    with open(self._path("history.jsonl"), "a") as f:
+                        f.write(json.dumps({"user": user_id, "doc": doc_id}) + "\n")
+        return doc_id
+
+
+_index: Optional[NearDuplicateIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index() -> NearDuplicateIndex:
+    """Shared index, loaded from settings.dedup_index_dir on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = NearDuplicateIndex(settings.dedup_index_dir or None)
+    return _index
@@ -1,6 +1,6 @@
 from openai import OpenAI
 from app.core.config import settings
-from typing import List, Dict, Generator
+from typing import List, Dict, Generator, Optional
 import json
 
 class NvidiaLLMService:
@@ -130,11 +130,21 @@ class NvidiaLLMService:
         except:
             return {"original": text, "corrected": response, "mistakes": []}
     
-    def vocabulary_builder(self, topic: str, language: str = "English", count: int = 10) -> List[Dict[str, str]]:
+    def vocabulary_builder(
+        self,
+        topic: str,
+        language: str = "English",
+        count: int = 10,
+        level_band: Optional[str] = None,
+        exclude: Optional[List[str]] = None
+    ) -> List[Dict[str, str]]:
         """
-        Generate vocabulary words for a specific topic
+        Generate vocabulary words for a specific topic, optionally within a
+        CEFR band (e.g. "B2-C1") and avoiding words already chosen
         """
-        system_prompt = f"""Generate {count} useful {language} vocabulary words related to '{topic}'.
+        level = f" at CEFR level {level_band}" if level_band else ""
+        avoid = f"\n        Do not include: {', '.join(exclude)}." if exclude else ""
+        system_prompt = f"""Generate {count} useful {language} vocabulary words{level} related to '{topic}'.{avoid}
         For each word, provide:
         1. The word
         2. Definition
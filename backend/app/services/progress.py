@@ -0,0 +1,283 @@
+"""
+Progress Aggregates
+Activity events update a single UserProgress row per user and language in
+O(1): counters, day streaks, running and exponential band averages. Reading
+progress is then one indexed row lookup, never a scan of the user's history.
+Band-scored practice also appends a point to the user's band time series
+(record_band_point*). The band series has no users FK, so callers may write
+it in its own transaction for learners without a users row.
+"""
+
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+from pydantic import BaseModel
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models import models
+from .band_series import BandSeries, append_point, append_point_sync
+
+# Activity types counted as a speaking practice session
+PRACTICE_ACTIVITIES = {"practice", "mock_test", "part1", "part2", "part3"}
+
+# Band points listed as recent scores on the dashboard
+RECENT_SCORES = 5
+
+CRITERION_LABELS = {
+    "fluency": "fluency and coherence",
+    "grammar": "grammatical range and accuracy",
+    "vocabulary": "lexical resource",
+    "pronunciation": "pronunciation"
+}
+
+
+class ProgressEvent(BaseModel):
+    user_id: int
+    activity_type: str  # practice, mock_test, quiz, vocabulary, conversation, ...
+    score: Optional[float] = None  # IELTS band for practice/mock_test, percentage for quiz
+    criteria: Optional[Dict[str, float]] = None  # per-criterion bands, e.g. {"fluency": 6.5}
+    duration_minutes: float = 0
+    language: str = "English"
+    target_band: Optional[float] = None
+    occurred_at: Optional[datetime] = None
+
+
+def _initial_values(user_id: int, language: str) -> Dict[str, Any]:
+    return dict(
+        user_id=user_id,
+        language=language,
+        level="",
+        total_conversations=0,
+        total_vocabulary=0,
+        total_quizzes=0,
+        quiz_score_avg=0.0,
+        total_practice_sessions=0,
+        total_minutes=0.0,
+        activity_counts={},
+        streak_days=0,
+        longest_streak=0,
+        band_count=0,
+        last_activity=None
+    )
+
+
+def new_progress(user_id: int, language: str) -> models.UserProgress:
+    return models.UserProgress(**_initial_values(user_id, language))
+
+
+def apply_event(progress: models.UserProgress, event: ProgressEvent):
+    """Fold one event into the aggregates, O(1)"""
+    occurred_at = event.occurred_at or datetime.utcnow()
+    activity = event.activity_type
+
+    # Reassign so the JSON column is flagged as changed
+    counts = dict(progress.activity_counts or {})
+    counts[activity] = counts.get(activity, 0) + 1
+    progress.activity_counts = counts
+    progress.total_minutes = (progress.total_minutes or 0) + max(event.duration_minutes, 0)
+
+    if activity == "conversation":
+        progress.total_conversations = (progress.total_conversations or 0) + 1
+    elif activity == "vocabulary":
+        progress.total_vocabulary = (progress.total_vocabulary or 0) + 1
+    elif activity == "quiz":
+        progress.total_quizzes = (progress.total_quizzes or 0) + 1
+        if event.score is not None:
+            # Running mean over all quizzes
+            progress.quiz_score_avg = (progress.quiz_score_avg or 0.0) + (
+                event.score - (progress.quiz_score_avg or 0.0)
+            ) / progress.total_quizzes
+    elif activity in PRACTICE_ACTIVITIES:
+        progress.total_practice_sessions = (progress.total_practice_sessions or 0) + 1
+        if event.score is not None:
+            _add_band(progress, event.score)
+
+    if event.target_band is not None:
+        progress.target_band = event.target_band
+
+    _update_streak(progress, occurred_at)
+
+
+def _add_band(progress: models.UserProgress, band: float):
+    progress.band_count = (progress.band_count or 0) + 1
+    if progress.band_avg is None:
+        progress.band_avg = progress.band_ema = band
+    else:
+        progress.band_avg += (band - progress.band_avg) / progress.band_count
+        alpha = settings.progress_band_ema_alpha
+        progress.band_ema = alpha * band + (1 - alpha) * progress.band_ema
+    progress.latest_band = band
+
+
+def _update_streak(progress: models.UserProgress, occurred_at: datetime):
+    last = progress.last_activity
+    if last is not None and occurred_at.date() < last.date():
+        return  # late event for an earlier day, streak already accounted for
+    if last is None or occurred_at.date() - last.date() > timedelta(days=1):
+        progress.streak_days = 1
+    elif occurred_at.date() - last.date() == timedelta(days=1):
+        progress.streak_days = (progress.streak_days or 0) + 1
+    progress.longest_streak = max(progress.longest_streak or 0, progress.streak_days)
+    progress.last_activity = occurred_at
+
+
+def _band_point(event: ProgressEvent) -> Optional[Dict[str, float]]:
+    if event.activity_type not in PRACTICE_ACTIVITIES or event.score is None:
+        return None
+    return {**(event.criteria or {}), "overall": event.score}
+
+
+def _event_part(event: ProgressEvent) -> Optional[int]:
+    """IELTS part of a single-part practice ("part2" -> 2); None for full sessions"""
+    if event.activity_type.startswith("part"):
+        return int(event.activity_type[4:])
+    return None
+
+
+def _row_query(user_id: int, language: str):
+    # Row lock so concurrent events for one user do not lose updates
+    return (
+        select(models.UserProgress)
+        .where(models.UserProgress.user_id == user_id)
+        .where(models.UserProgress.language == language)
+        .with_for_update()
+    )
+
+
+def _insert_row(dialect: str, user_id: int, language: str):
+    """
+    INSERT of a fresh row that is a no-op if a concurrent first event already
+    created it (a FOR UPDATE on a missing row locks nothing). Foreign key
+    violations still raise IntegrityError.
+    """
+    values = _initial_values(user_id, language)
+    if dialect == "postgresql":
+        return postgresql.insert(models.UserProgress).values(**values).on_conflict_do_nothing(
+            index_elements=["user_id", "language"]
+        )
+    if dialect == "sqlite":
+        return sqlite.insert(models.UserProgress).values(**values).on_conflict_do_nothing(
+            index_elements=["user_id", "language"]
+        )
+    return insert(models.UserProgress).values(**values)
+
+
+def record_event_sync(db: Session, event: ProgressEvent) -> models.UserProgress:
+    """Apply an event inside the caller's transaction"""
+    progress = db.scalar(_row_query(event.user_id, event.language))
+    if progress is None:
+        db.execute(_insert_row(db.get_bind().dialect.name, event.user_id, event.language))
+        progress = db.scalar(_row_query(event.user_id, event.language))
+    apply_event(progress, event)
+    return progress
+
+
+async def record_event(db: AsyncSession, event: ProgressEvent) -> models.UserProgress:
+    """Apply an event inside the caller's (async) transaction"""
+    progress = await db.scalar(_row_query(event.user_id, event.language))
+    if progress is None:
+        await db.execute(_insert_row(db.get_bind().dialect.name, event.user_id, event.language))
+        progress = await db.scalar(_row_query(event.user_id, event.language))
+    apply_event(progress, event)
+    return progress
+
+
+def record_band_point_sync(db: Session, event: ProgressEvent):
+    """Append a band-scored event to the user's band time series"""
+    point = _band_point(event)
+    if point:
+        append_point_sync(db, event.user_id, event.occurred_at or datetime.utcnow(), point, _event_part(event))
+
+
+async def record_band_point(db: AsyncSession, event: ProgressEvent):
+    """Append a band-scored event to the user's band time series"""
+    point = _band_point(event)
+    if point:
+        await append_point(db, event.user_id, event.occurred_at or datetime.utcnow(), point, _event_part(event))
+
+
+def recommendations(progress: models.UserProgress, trends: Dict[str, Any], current_streak: int) -> List[str]:
+    """A few next steps from the aggregates and band trends, no LLM call"""
+    tips = []
+    criteria = {
+        name: trend for name, trend in trends.get("series", {}).items() if name in CRITERION_LABELS
+    }
+    if criteria:
+        weakest = min(criteria, key=lambda name: criteria[name]["latest"])
+        tips.append(
+            f"Focus on {CRITERION_LABELS[weakest]} (latest band {criteria[weakest]['latest']})"
+        )
+        slipping = [name for name, trend in criteria.items() if trend["trend_per_30_days"] <= -0.25]
+        for name in slipping:
+            if name != weakest:
+                tips.append(f"Your {CRITERION_LABELS[name]} band has slipped recently; revisit it")
+                break
+
+    counts = progress.activity_counts or {}
+    if not progress.total_practice_sessions:
+        tips.append("Complete a speaking practice session to get your first band score")
+    else:
+        part = min((1, 2, 3), key=lambda part: counts.get(f"part{part}", 0))
+        tips.append(f"Practice more Part {part} questions")
+    if not current_streak:
+        tips.append("Practice today to start a new streak")
+    return tips[:3]
+
+
+def progress_summary(
+    user_id: int,
+    progress: Optional[models.UserProgress],
+    today: Optional[datetime] = None,
+    series: Optional[BandSeries] = None
+) -> Dict[str, Any]:
+    """Dashboard view of one progress row and the band series (zeros for a new learner)"""
+    if progress is None:
+        progress = new_progress(user_id, "English")
+    series = series if series is not None else BandSeries()
+    today = (today or datetime.utcnow()).date()
+
+    # A streak is only current if the learner was active today or yesterday
+    streak = progress.streak_days or 0
+    if progress.last_activity is None or today - progress.last_activity.date() > timedelta(days=1):
+        streak = 0
+
+    current_band = progress.band_ema
+    percentage = 0
+    if current_band is not None and progress.target_band:
+        percentage = int(min(100, max(0, round(current_band / progress.target_band * 100))))
+
+    sessions = progress.total_practice_sessions or 0
+    counts = progress.activity_counts or {}
+    chart = series.chart(RECENT_SCORES)
+    return {
+        "user_id": user_id,
+        "current_band": round(current_band, 1) if current_band is not None else None,
+        "target_band": progress.target_band,
+        "progress_percentage": percentage,
+        "stats": {
+            "total_practice_sessions": sessions,
+            "total_hours": round((progress.total_minutes or 0) / 60, 1),
+            "current_streak": streak,
+            "longest_streak": progress.longest_streak or 0,
+            "completed_activities": {**counts, "mock_tests": counts.get("mock_test", 0)},
+            "total_conversations": progress.total_conversations or 0,
+            "total_vocabulary": progress.total_vocabulary or 0,
+            "total_quizzes": progress.total_quizzes or 0
+        },
+        "averages": {
+            "band": round(progress.band_avg, 2) if progress.band_avg is not None else None,
+            "band_rolling": round(progress.band_ema, 2) if progress.band_ema is not None else None,
+            "latest_band": progress.latest_band,
+            "quiz_score": round(progress.quiz_score_avg or 0.0, 1)
+        },
+        "last_activity": progress.last_activity.isoformat() if progress.last_activity else None,
+        "recent_scores": [
+            {"date": timestamp[:10], "part": part, "band": band}
+            for timestamp, part, band in zip(chart["timestamps"], chart["parts"], chart["series"]["overall"])
+            if band is not None
+        ],
+        "next_milestone": f"Complete {(sessions // 10 + 1) * 10} practice sessions",
+        "recommendations": recommendations(progress, series.analyze(), streak)
+    }
@@ -0,0 +1,240 @@
+"""
+IELTS Question Bank
+Pre-generated, validated Part 1 questions, Part 2 cue cards and Part 3
+prompts, indexed by (part, topic, difficulty):
+- O(1) draws with per-user "already seen" tracking, persisted to an
+  append-only seen.jsonl shared by restarts and workers
+- Difficulty adapted to the learner's current band
+- Validation shared with the offline builder (scripts/build_question_bank.py)
+"""
+
+from typing import Dict, List, Any, Optional, Set, Tuple
+import threading
+import random
+import json
+import os
+from app.core.config import settings
+
+QUESTION_BANK_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "question_bank", "questions.jsonl"
+)
+
+DIFFICULTIES = ["foundation", "intermediate", "advanced"]
+
+# Question length limits (words) used by validation
+MIN_QUESTION_WORDS = 3
+MAX_QUESTION_WORDS = 30
+
+
+def difficulty_for_band(band: Any) -> str:
+    """Question difficulty suited to a learner's current band"""
+    try:
+        band = float(band)
+    except (TypeError, ValueError):
+        return "intermediate"
+    if band < 5.5:
+        return "foundation"
+    if band < 7.0:
+        return "intermediate"
+    return "advanced"
+
+
+def validate_item(item: Dict[str, Any]) -> List[str]:
+    """Problems with a bank item, empty when it is usable"""
+    problems = []
+    if item.get("part") not in (1, 2, 3):
+        problems.append("part must be 1, 2 or 3")
+    if not str(item.get("topic", "")).strip():
+        problems.append("missing topic")
+    if item.get("difficulty") not in DIFFICULTIES:
+        problems.append(f"difficulty must be one of {DIFFICULTIES}")
+
+    question = str(item.get("question", "")).strip()
+    words = len(question.split())
+    if not MIN_QUESTION_WORDS <= words <= MAX_QUESTION_WORDS:
+        problems.append(f"question has {words} words")
+
+    if item.get("part") == 2:
+        card = item.get("cue_card") or {}
+        if not str(card.get("topic", "")).startswith("Describe"):
+            problems.append("cue card topic should start with 'Describe'")
+        if not 3 <= len(card.get("points", [])) <= 5:
+            problems.append("cue card needs 3-5 points")
+    elif not question.endswith("?"):
+        problems.append("question should end with '?'")
+    return problems
+
+
+def load_items(path: str = QUESTION_BANK_PATH) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class QuestionBank:
+    """
+    In-memory index over the bank file
+
+    Each (part, topic, difficulty) bucket is shuffled once; every user has
+    a cursor per bucket, so the next unseen item is found in O(1) and the
+    same learner only sees an item again once the whole topic is used up.
+    With seen_path, seen items are appended there and entries written by
+    other workers are picked up before each draw; cursors are rebuilt by
+    skipping seen items.
+    """
+
+    def __init__(self, items: List[Dict[str, Any]], seed: int = 0, seen_path: Optional[str] = None):
+        rng = random.Random(seed)
+        self.items = {item["id"]: item for item in items}
+        self.buckets: Dict[Tuple[int, str, str], List[Dict[str, Any]]] = {}
+        for item in items:
+            self.buckets.setdefault((item["part"], item["topic"], item["difficulty"]), []).append(item)
+        for bucket in self.buckets.values():
+            rng.shuffle(bucket)
+
+        self.topics_by_part: Dict[int, List[str]] = {}
+        for part, topic, _ in self.buckets:
+            if topic not in self.topics_by_part.setdefault(part, []):
+                self.topics_by_part[part].append(topic)
+
+        self.cursors: Dict[Tuple[Any, Tuple[int, str, str]], int] = {}
+        self.seen: Dict[Any, Set[str]] = {}
+        self.lock = threading.Lock()
+
+        self.seen_path = seen_path
+        self._seen_offset = 0
+        if seen_path:
+            if os.path.dirname(seen_path):
+                os.makedirs(os.path.dirname(seen_path), exist_ok=True)
+            self._sync_seen()
+
+    @classmethod
+    def from_file(cls, path: str = QUESTION_BANK_PATH, seen_path: Optional[str] = None) -> "QuestionBank":
+        return cls(load_items(path), seen_path=seen_path)
+
+    def _sync_seen(self):
+        """Replay seen entries appended since the last read (earlier runs, other workers)"""
+        if not self.seen_path or not os.path.exists(self.seen_path):
+            return
+        if os.path.getsize(self.seen_path) == self._seen_offset:
+            return
+        with open(self.seen_path, "rb") as f:
+            f.seek(self._seen_offset)
+            data = f.read()
+        # A torn last write is read again once it is complete
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            seen = self.seen.setdefault(entry["user"], set())
+            if entry.get("reset"):
+                seen.difference_update(entry["items"])
+            else:
+                seen.update(entry["items"])
+        self._seen_offset += end
+
+    def _log_seen(self, user_id: Any, item_ids: List[str], reset: bool = False):
+        if not self.seen_path or user_id is None:
+            return
+        entry: Dict[str, Any] = {"user": user_id, "items": item_ids}
+        if reset:
+            entry["reset"] = True
+        with open(self.seen_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def topics(self, part: int) -> List[str]:
+        return self.topics_by_part.get(part, [])
+
+    def has(self, part: int, topic: str) -> bool:
+        return any((part, topic, d) in self.buckets for d in DIFFICULTIES)
+
+    def _bucket_keys(self, part: int, topic: str, difficulty: str) -> List[Tuple[int, str, str]]:
+        """Buckets for a topic, nearest difficulty first"""
+        start = DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else 1
+        order = sorted(DIFFICULTIES, key=lambda d: abs(DIFFICULTIES.index(d) - start))
+        return [(part, topic, d) for d in order if (part, topic, d) in self.buckets]
+
+    def draw(
+        self,
+        part: int,
+        topic: str,
+        difficulty: str = "intermediate",
+        user_id: Any = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Next unseen item for this user, from the nearest difficulty that
+        still has one. When the whole topic has been seen it starts over.
+        None when the bank has no such topic.
+        """
+        keys = self._bucket_keys(part, topic, difficulty)
+        if not keys:
+            return None
+
+        with self.lock:
+            self._sync_seen()
+            seen = self.seen.setdefault(user_id, set())
+            for key in keys:
+                bucket = self.buckets[key]
+                cursor = self.cursors.get((user_id, key), 0)
+                # Skip items marked seen elsewhere; the cursor never moves back
+                while cursor < len(bucket) and bucket[cursor]["id"] in seen:
+                    cursor += 1
+                if cursor < len(bucket):
+                    self.cursors[(user_id, key)] = cursor + 1
+                    seen.add(bucket[cursor]["id"])
+                    self._log_seen(user_id, [bucket[cursor]["id"]])
+                    return bucket[cursor]
+                self.cursors[(user_id, key)] = cursor
+
+            # Topic exhausted for this user: start the nearest bucket over
+            bucket = self.buckets[keys[0]]
+            topic_ids = [item["id"] for key in keys for item in self.buckets[key]]
+            for key in keys:
+                self.cursors[(user_id, key)] = 0
+            seen.difference_update(topic_ids)
+            self._log_seen(user_id, topic_ids, reset=True)
+            self.cursors[(user_id, keys[0])] = 1
+            seen.add(bucket[0]["id"])
+            self._log_seen(user_id, [bucket[0]["id"]])
+            return bucket[0]
+
+    def draw_many(
+        self,
+        part: int,
+        topic: str,
+        count: int,
+        difficulty: str = "intermediate",
+        user_id: Any = None
+    ) -> List[Dict[str, Any]]:
+        """Up to count distinct items for this user"""
+        items = []
+        for _ in range(count):
+            item = self.draw(part, topic, difficulty, user_id)
+            if item is None or item in items:
+                break
+            items.append(item)
+        return items
+
+    def mark_seen(self, user_id: Any, item_ids: List[str]):
+        with self.lock:
+            self.seen.setdefault(user_id, set()).update(item_ids)
+            self._log_seen(user_id, list(item_ids))
+
+
+_bank: Optional[QuestionBank] = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> QuestionBank:
+    """Shared bank, loaded on first use with the seen history from settings"""
+    global _bank
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                _bank = QuestionBank.from_file(seen_path=settings.question_seen_path or None)
+    return _bank
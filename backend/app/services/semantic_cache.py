@@ -0,0 +1,182 @@
+"""
+Semantic Cache
+Local similarity cache for LLM content keyed by free-text prompts:
+- Character n-gram TF-IDF vectors (hashing trick, no external embeddings)
+- Compact float32 matrix with top-k cosine lookup in one matrix product
+- Namespaced entries, configurable threshold, optional TTL, eviction of
+  expired entries before least recently used ones, and hit-rate metrics
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+import threading
+import hashlib
+import time
+import re
+from app.core.config import settings
+
+DIMENSIONS = 4096
+NGRAM_SIZES = (3, 4, 5)
+
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+
+
+def _bucket(gram: str) -> int:
+    return int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=4).digest(), "little") % DIMENSIONS
+
+
+def term_vector(text: str) -> np.ndarray:
+    """Sublinear term frequencies of padded character n-grams"""
+    text = " ".join(_NON_WORD.sub(" ", text.lower()).split())
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    # Each word is padded so n-grams respect word boundaries and word
+    # order does not matter ("education technology" ~ "technology in education")
+    for word in text.split():
+        padded = f" {word} "
+        for n in NGRAM_SIZES:
+            for i in range(max(1, len(padded) - n + 1)):
+                vector[_bucket(padded[i:i + n])] += 1
+    nonzero = vector > 0
+    vector[nonzero] = 1 + np.log(vector[nonzero])
+    return vector
+
+
+class SemanticCache:
+    """
+    Near-match cache: a lookup returns the stored value of the most similar
+    previous key in the same namespace when the TF-IDF cosine similarity
+    reaches the threshold. IDF weights come from the cached keys themselves
+    and are kept up to date on every insert and eviction.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        threshold: Optional[float] = None,
+        ttl_seconds: Optional[float] = None
+    ):
+        self.max_entries = max_entries or settings.semantic_cache_max_entries
+        self.threshold = threshold if threshold is not None else settings.semantic_cache_threshold
+        # 0 (or unset) means entries never expire
+        ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.semantic_cache_ttl_seconds
+        self.ttl_seconds = ttl_seconds or None
+        max_entries = self.max_entries
+
+        self.matrix = np.zeros((max_entries, DIMENSIONS), dtype=np.float32)
+        self.doc_freq = np.zeros(DIMENSIONS, dtype=np.float32)
+        self.used = np.zeros(max_entries, dtype=bool)
+        self.namespaces: List[Optional[str]] = [None] * max_entries
+        self.keys: List[Optional[str]] = [None] * max_entries
+        self.values: List[Any] = [None] * max_entries
+        self.created = np.zeros(max_entries)
+        self.last_used = np.zeros(max_entries)
+
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "inserts": 0, "evictions": 0}
+        self.lock = threading.Lock()
+
+    def _idf(self) -> np.ndarray:
+        n = int(self.used.sum())
+        return np.log((1 + n) / (1 + self.doc_freq)) + 1
+
+    def _weighted(self, vectors: np.ndarray, idf: np.ndarray) -> np.ndarray:
+        weighted = vectors * idf
+        norms = np.linalg.norm(weighted, axis=-1, keepdims=True)
+        return weighted / np.maximum(norms, 1e-12)
+
+    def search(
+        self,
+        text: str,
+        namespace: str = "",
+        k: int = 3
+    ) -> List[Tuple[str, float]]:
+        """Top-k cached keys in the namespace with their cosine similarity"""
+        with self.lock:
+            return [(self.keys[i], score) for i, score in self._top_k(term_vector(text), namespace, k)]
+
+    def _top_k(self, query: np.ndarray, namespace: str, k: int) -> List[Tuple[int, float]]:
+        candidates = np.nonzero(self.used)[0]
+        candidates = [i for i in candidates if self.namespaces[i] == namespace]
+        if self.ttl_seconds is not None:
+            cutoff = time.time() - self.ttl_seconds
+            candidates = [i for i in candidates if self.created[i] >= cutoff]
+        if not candidates:
+            return []
+
+        idf = self._idf()
+        rows = self._weighted(self.matrix[candidates], idf)
+        scores = rows @ self._weighted(query, idf)
+        order = np.argsort(-scores)[:k]
+        return [(candidates[j], float(scores[j])) for j in order]
+
+    def get(self, text: str, namespace: str = "", threshold: Optional[float] = None) -> Optional[Any]:
+        """Cached value of the closest key at or above the threshold"""
+        threshold = self.threshold if threshold is None else threshold
+        with self.lock:
+            self.stats["lookups"] += 1
+            top = self._top_k(term_vector(text), namespace, 1)
+            if top and top[0][1] >= threshold:
+                slot = top[0][0]
+                self.last_used[slot] = time.time()
+                self.stats["hits"] += 1
+                return self.values[slot]
+            self.stats["misses"] += 1
+            return None
+
+    def _expired(self) -> np.ndarray:
+        if self.ttl_seconds is None:
+            return np.zeros(0, dtype=int)
+        return np.nonzero(self.used & (self.created < time.time() - self.ttl_seconds))[0]
+
+    def put(self, text: str, value: Any, namespace: str = ""):
+        vector = term_vector(text)
+        with self.lock:
+            free = np.nonzero(~self.used)[0]
+            if len(free):
+                slot = int(free[0])
+            else:
+                # Reuse the oldest expired entry, else evict the least recently used
+                expired = self._expired()
+                if len(expired):
+                    slot = int(expired[np.argmin(self.created[expired])])
+                else:
+                    slot = int(np.argmin(self.last_used))
+                self.doc_freq -= self.matrix[slot] > 0
+                self.stats["evictions"] += 1
+
+            now = time.time()
+            self.matrix[slot] = vector
+            self.doc_freq += vector > 0
+            self.used[slot] = True
+            self.namespaces[slot] = namespace
+            self.keys[slot] = text
+            self.values[slot] = value
+            self.created[slot] = now
+            self.last_used[slot] = now
+            self.stats["inserts"] += 1
+
+    def __len__(self) -> int:
+        return int(self.used.sum())
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.stats["lookups"]
+        return {
+            **self.stats,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None
+        }
+
+
+_cache: Optional[SemanticCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Shared cache sized from settings on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticCache()
+    return _cache
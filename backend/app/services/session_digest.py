@@ -0,0 +1,86 @@
+"""
+Session Digests
+Compact, fixed-size summary of a finished IELTS session, stored on the
+session row so cross-session reflection and planning read a few hundred
+bytes per session instead of raw exchanges:
+- Overall and per-criterion bands
+- Top grammar errors and priority improvements
+- Most repeated content words
+- Turns and speaking time per part
+"""
+
+from typing import Dict, List, Any
+from .agents.score_aggregation import parse_band
+from .agents.scoring_agent import CRITERIA
+from .transcript_analysis import analyze_transcript
+
+TOP_ERRORS = 3
+TOP_PRIORITIES = 2
+TOP_REPEATED_WORDS = 5
+MAX_TEXT = 80  # characters per error / priority
+
+
+def _clip(text: Any) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= MAX_TEXT else text[:MAX_TEXT - 1] + "…"
+
+
+def _errors(score: Dict[str, Any]) -> List[str]:
+    grammar = score.get("detailed_analyses", {}).get("grammar", {})
+    errors = []
+    for error in grammar.get("errors", []) or []:
+        if isinstance(error, dict):
+            text = error.get("error", "")
+            if error.get("correction"):
+                text = f"{text} -> {error['correction']}"
+        else:
+            text = error
+        if text:
+            errors.append(_clip(text))
+        if len(errors) == TOP_ERRORS:
+            break
+    return errors
+
+
+def _parts(exchanges: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Turns and seconds per part; a turn answers the previous turn's question"""
+    parts: Dict[str, Dict[str, Any]] = {}
+    part = 1
+    for exchange in exchanges:
+        entry = parts.setdefault(str(part), {"turns": 0, "seconds": 0.0})
+        entry["turns"] += 1
+        entry["seconds"] += float(exchange.get("metadata", {}).get("duration_seconds") or 0)
+        part = exchange.get("examiner_response", {}).get("part", part)
+    for entry in parts.values():
+        entry["seconds"] = round(entry["seconds"], 1)
+    return parts
+
+
+def build_digest(session: Dict[str, Any], score: Dict[str, Any]) -> Dict[str, Any]:
+    """Fixed-size digest of a session and its final score"""
+    exchanges = session.get("exchanges", [])
+    parts = _parts(exchanges)
+    seconds = sum(entry["seconds"] for entry in parts.values())
+    features = analyze_transcript(
+        " ".join(ex.get("user_response", "") for ex in exchanges),
+        duration_seconds=seconds or None
+    )
+
+    return {
+        "date": session.get("started_at", "")[:10],
+        "type": session.get("type"),
+        "turns": len(exchanges),
+        "bands": {
+            "overall": parse_band(score.get("overall_band")),
+            **{criterion: parse_band(score.get(f"{criterion}_band")) for criterion in CRITERIA}
+        },
+        "top_errors": _errors(score),
+        "priorities": [_clip(p) for p in (score.get("priority_improvements") or [])[:TOP_PRIORITIES]],
+        "repeated_words": [
+            {"word": r["word"], "count": r["count"]}
+            for r in features.repetitions[:TOP_REPEATED_WORDS]
+        ],
+        "words_per_minute": features.words_per_minute,
+        "filler_rate": features.filler_rate,
+        "parts": parts
+    }
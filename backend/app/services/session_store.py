@@ -0,0 +1,304 @@
+"""
+IELTS Session Store
+Persists speaking sessions so they survive restarts and can be served by
+any worker:
+- start: one INSERT of the session row
+- respond: the turn is appended to the write-behind log (no commit on the path)
+  and flushed right away; sessions whose INSERT failed are not logged
+- load: the session's queued turns are flushed before it is read
+- check: a worker's cached copy is compared with the stored status and turn
+  count before each use, and reloaded (or dropped) when it is behind
+- end: score row, session status and digest in one short transaction, then
+  the user's progress aggregates (app/services/progress.py)
+Storage failures are logged and never fail the session itself.
+"""
+
+from typing import Dict, List, Any, Optional, Set, Tuple
+from datetime import datetime
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+import logging
+from app.db.database import SessionLocal
+from app.db.write_behind import WriteBehindQueue, write_behind
+from app.models import models
+from .agents.score_aggregation import parse_band
+from .agents.scoring_agent import CRITERIA
+from .band_series import load_series_sync
+from .progress import ProgressEvent, record_band_point_sync, record_event_sync
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """Sync access for the (threadpool) IELTS routes; turns go through write-behind"""
+
+    def __init__(
+        self,
+        sessions: Optional[sessionmaker] = None,
+        writes: Optional[WriteBehindQueue] = None
+    ):
+        self.sessions = sessions or SessionLocal
+        self.writes = writes or write_behind
+        # Sessions whose row could not be written; their turns would violate the FK
+        self.unpersisted: Set[str] = set()
+
+    def create_session(self, session_id: str, session: Dict[str, Any]) -> bool:
+        try:
+            with self.sessions.begin() as db:
+                db.add(models.IELTSSession(
+                    id=session_id,
+                    user_id=session["user_id"],
+                    session_type=session["type"],
+                    status="active",
+                    incremental_scoring=session.get("incremental_scoring", True),
+                    exam_state=session["exam"],
+                    turn_count=0,
+                    started_at=datetime.fromisoformat(session["started_at"])
+                ))
+            return True
+        except SQLAlchemyError as e:
+            logger.warning("IELTS session %s not persisted: %s", session_id, e)
+            self.unpersisted.add(session_id)
+            return False
+
+    def append_turn(
+        self,
+        session_id: str,
+        turn_index: int,
+        exchange: Dict[str, Any],
+        exam_state: Dict[str, Any],
+        audio_features: Optional[Dict[str, Any]] = None,
+        live_stats: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Queue a turn and wake the flusher so other workers see it quickly.
+        The turn's audio features and live stats ride along in the exchange
+        JSON so a reloaded session keeps them.
+        """
+        if session_id in self.unpersisted:
+            return
+        stored = {
+            key: exchange[key]
+            for key in ("metadata", "confidence_analysis", "examiner_response", "timestamp")
+        }
+        signals = {
+            key: value
+            for key, value in (("audio_features", audio_features), ("live_stats", live_stats))
+            if value
+        }
+        if signals:
+            stored["signals"] = signals
+        self.writes.add(
+            models.IELTSTurn,
+            session_id=session_id,
+            turn_index=turn_index,
+            part=exchange["examiner_response"].get("part"),
+            user_response=exchange["user_response"],
+            exchange=stored,
+            exam_state=exam_state
+        )
+        self.writes.wake()
+
+    def complete_session(
+        self,
+        session_id: str,
+        session: Dict[str, Any],
+        score: Dict[str, Any],
+        validation: Dict[str, Any],
+        digest: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        self.unpersisted.discard(session_id)
+        try:
+            with self.sessions.begin() as db:
+                db.add(models.IELTSScore(
+                    session_id=session_id,
+                    user_id=session["user_id"],
+                    overall_band=parse_band(score.get("overall_band")),
+                    fluency_band=parse_band(score.get("fluency_band")),
+                    grammar_band=parse_band(score.get("grammar_band")),
+                    vocabulary_band=parse_band(score.get("vocabulary_band")),
+                    pronunciation_band=parse_band(score.get("pronunciation_band")),
+                    score=score,
+                    validation=validation
+                ))
+                db.execute(
+                    update(models.IELTSSession)
+                    .where(models.IELTSSession.id == session_id)
+                    .values(
+                        status="completed",
+                        ended_at=datetime.utcnow(),
+                        turn_count=len(session["exchanges"]),
+                        overall_band=parse_band(score.get("overall_band")),
+                        **({"digest": digest} if digest else {})
+                    )
+                )
+        except SQLAlchemyError as e:
+            logger.warning("IELTS score for %s not persisted: %s", session_id, e)
+            return False
+        self.record_progress(session, score, digest)
+        return True
+
+    def record_progress(
+        self,
+        session: Dict[str, Any],
+        score: Dict[str, Any],
+        digest: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Fold a finished session into the user's band series and progress row.
+        Separate transactions: IELTS learners may have no users row, and the
+        progress row's FK must not cost them their band point.
+        """
+        seconds = sum(part["seconds"] for part in (digest or {}).get("parts", {}).values())
+        event = ProgressEvent(
+            user_id=session["user_id"],
+            activity_type="practice" if session["type"] == "practice" else "mock_test",
+            score=parse_band(score.get("overall_band")),
+            criteria={
+                criterion: parse_band(score[f"{criterion}_band"])
+                for criterion in CRITERIA
+                if score.get(f"{criterion}_band") is not None
+            },
+            duration_minutes=seconds / 60
+        )
+        try:
+            with self.sessions.begin() as db:
+                record_band_point_sync(db, event)
+        except SQLAlchemyError as e:
+            logger.warning("Band series for user %s not updated: %s", session["user_id"], e)
+        try:
+            with self.sessions.begin() as db:
+                record_event_sync(db, event)
+            return True
+        except SQLAlchemyError as e:
+            logger.warning("Progress for user %s not updated: %s", session["user_id"], e)
+            return False
+
+    def session_state(self, session_id: str) -> Optional[Tuple[str, int]]:
+        """
+        (status, stored turn count) of a session, to check a cached copy
+        against; None when the session was never stored or the store is down
+        """
+        if session_id in self.unpersisted:
+            return None
+        self.writes.flush_if_pending_sync(models.IELTSTurn, session_id=session_id)
+        try:
+            with self.sessions() as db:
+                status = db.scalar(
+                    select(models.IELTSSession.status).where(models.IELTSSession.id == session_id)
+                )
+                if status is None:
+                    return None
+                turns = db.scalar(
+                    select(func.count())
+                    .select_from(models.IELTSTurn)
+                    .where(models.IELTSTurn.session_id == session_id)
+                )
+        except SQLAlchemyError as e:
+            logger.warning("IELTS session %s not checked: %s", session_id, e)
+            return None
+        return status, turns
+
+    def load_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Rebuild an active session (same shape as AgentOrchestrator.active_sessions)"""
+        self.writes.flush_if_pending_sync(models.IELTSTurn, session_id=session_id)
+        try:
+            with self.sessions() as db:
+                row = db.get(models.IELTSSession, session_id)
+                if row is None or row.status != "active":
+                    return None
+                turns = db.scalars(
+                    select(models.IELTSTurn)
+                    .where(models.IELTSTurn.session_id == session_id)
+                    .order_by(models.IELTSTurn.turn_index)
+                ).all()
+        except SQLAlchemyError as e:
+            logger.warning("IELTS session %s not loaded: %s", session_id, e)
+            return None
+
+        session = {
+            "user_id": row.user_id,
+            "type": row.session_type,
+            "started_at": row.started_at.isoformat(),
+            "exam": turns[-1].exam_state if turns else row.exam_state,
+            "incremental_scoring": row.incremental_scoring,
+            "exchanges": [],
+            "audio_features": {},
+            "live_stats": {}
+        }
+        for t in turns:
+            exchange = dict(t.exchange)
+            # Keyed by the int turn_index column, not the JSON's string keys
+            for key, value in exchange.pop("signals", {}).items():
+                session[key][t.turn_index] = value
+            session["exchanges"].append({"user_response": t.user_response, **exchange})
+        return session
+
+    def recent_sessions(self, user_id: int, limit: int = 3) -> List[Dict[str, Any]]:
+        """A user's last completed sessions with their bands, newest first"""
+        try:
+            with self.sessions() as db:
+                rows = db.execute(
+                    select(models.IELTSSession, models.IELTSScore)
+                    .join(models.IELTSScore, models.IELTSScore.session_id == models.IELTSSession.id)
+                    .where(models.IELTSSession.user_id == user_id)
+                    .where(models.IELTSSession.status == "completed")
+                    .order_by(models.IELTSSession.started_at.desc())
+                    .limit(limit)
+                ).all()
+        except SQLAlchemyError as e:
+            logger.warning("IELTS history for user %s not loaded: %s", user_id, e)
+            return []
+
+        return [
+            {
+                "session_id": session.id,
+                "session_type": session.session_type,
+                "started_at": session.started_at.isoformat(),
+                "turns": session.turn_count,
+                "overall_band": score.overall_band,
+                "fluency_band": score.fluency_band,
+                "grammar_band": score.grammar_band,
+                "vocabulary_band": score.vocabulary_band,
+                "pronunciation_band": score.pronunciation_band,
+            }
+            for session, score in rows
+        ]
+
+    def recent_digests(self, user_id: int, limit: int = 3) -> List[Dict[str, Any]]:
+        """Digests of a user's last completed sessions, newest first (one indexed query)"""
+        try:
+            with self.sessions() as db:
+                digests = db.scalars(
+                    select(models.IELTSSession.digest)
+                    .where(models.IELTSSession.user_id == user_id)
+                    .where(models.IELTSSession.status == "completed")
+                    .where(models.IELTSSession.digest.is_not(None))
+                    .order_by(models.IELTSSession.started_at.desc())
+                    .limit(limit)
+                ).all()
+        except SQLAlchemyError as e:
+            logger.warning("IELTS digests for user %s not loaded: %s", user_id, e)
+            return []
+        return [digest for digest in digests if digest]
+
+    def band_trends(self, user_id: int) -> Dict[str, Any]:
+        """Trend, volatility and projection of a user's bands (one row read)"""
+        try:
+            with self.sessions() as db:
+                series = load_series_sync(db, user_id)
+        except SQLAlchemyError as e:
+            logger.warning("Band series for user %s not loaded: %s", user_id, e)
+            return {}
+        return series.analyze()
+
+    def band_chart(self, user_id: int, limit: Optional[int] = None) -> Dict[str, Any]:
+        """A user's band points for charting, with the trend summary"""
+        try:
+            with self.sessions() as db:
+                series = load_series_sync(db, user_id)
+        except SQLAlchemyError as e:
+            logger.warning("Band series for user %s not loaded: %s", user_id, e)
+            return {"timestamps": [], "series": {}, "trends": {}}
+        return {**series.chart(limit), "trends": series.analyze()}
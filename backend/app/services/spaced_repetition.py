@@ -0,0 +1,50 @@
+"""
+Spaced Repetition
+SM-2 review scheduling for saved vocabulary. Each review grade (0-5) updates
+the item's easiness, repetition count and interval, and moves its next_due_at;
+due items are then an index range scan on (user_id, next_due_at).
+"""
+
+from typing import Optional, Tuple
+from datetime import datetime, timedelta
+from app.models import models
+
+MIN_EASINESS = 1.3
+DEFAULT_EASINESS = 2.5
+PASSING_QUALITY = 3  # grades below this restart the item
+FIRST_INTERVALS = (1, 6)  # days after the first and second successful review
+
+
+def sm2(quality: int, repetitions: int, easiness: float, interval_days: float) -> Tuple[int, float, float]:
+    """Next (repetitions, easiness, interval_days) after a review graded 0-5"""
+    if not 0 <= quality <= 5:
+        raise ValueError(f"Review quality must be between 0 and 5, got {quality}")
+
+    if quality < PASSING_QUALITY:
+        repetitions, interval_days = 0, FIRST_INTERVALS[0]
+    else:
+        if repetitions < len(FIRST_INTERVALS):
+            interval_days = FIRST_INTERVALS[repetitions]
+        else:
+            interval_days = round(interval_days * easiness, 1)
+        repetitions += 1
+
+    easiness += 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    return repetitions, max(MIN_EASINESS, easiness), interval_days
+
+
+def review_item(item: models.VocabularyItem, quality: int, reviewed_at: Optional[datetime] = None):
+    """Apply one review to a vocabulary item in place"""
+    reviewed_at = reviewed_at or datetime.utcnow()
+    repetitions, easiness, interval_days = sm2(
+        quality,
+        item.repetitions or 0,
+        item.easiness or DEFAULT_EASINESS,
+        item.interval_days or 0
+    )
+    item.repetitions = repetitions
+    item.easiness = easiness
+    item.interval_days = interval_days
+    item.mastery_level = min(repetitions, 5)
+    item.last_reviewed = reviewed_at
+    item.next_due_at = reviewed_at + timedelta(days=interval_days)
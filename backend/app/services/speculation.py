@@ -0,0 +1,183 @@
+"""
+Speculative Question Generation
+Generates the examiner's likely next questions in the background while
+the learner is still answering, so the question is ready when the final
+response arrives:
+- Candidates for each action the exam flow could take next
+- Follow-ups refreshed as partial transcripts come in
+- Commit the matching candidate, cancel the rest, regenerate on a miss
+- Per-session call budget, hit rate and latency saved
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import threading
+import time
+from .agents.exam_flow import ExamState, advance, FOLLOW_UP, FINISH
+from app.core.config import settings
+
+# Extra speaking time assumed when enumerating how the turn could end
+HORIZON_SECONDS = 45.0
+
+
+def _key(exam_state: ExamState, action: str) -> Tuple[int, str, str]:
+    return (exam_state.part, action, exam_state.topic)
+
+
+def possible_outcomes(
+    exam_state: ExamState,
+    partial_transcript: str = "",
+    elapsed_seconds: Optional[float] = None
+) -> List[Tuple[ExamState, str]]:
+    """
+    States (and the action leading there) the exam could be in after the current turn: the turn ending
+    now, or after another HORIZON_SECONDS of speaking
+    """
+    if elapsed_seconds is None:
+        elapsed_seconds = len(partial_transcript.split()) / 2.5
+    outcomes = {}
+    for seconds in (elapsed_seconds, elapsed_seconds + HORIZON_SECONDS):
+        state = exam_state.copy(deep=True)
+        decision = advance(state, partial_transcript, {"duration_seconds": seconds})
+        if decision["action"] != FINISH:
+            outcomes.setdefault(_key(state, decision["action"]), (state, decision["action"]))
+    return list(outcomes.values())
+
+
+class QuestionSpeculator:
+    """Background candidates for the next examiner question, per session"""
+
+    def __init__(self, examiner, max_workers: Optional[int] = None):
+        self.examiner = examiner
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.speculation_workers,
+            thread_name_prefix="speculation"
+        )
+        # session_id -> candidate key -> {"future", "basis_words"}
+        self.candidates: Dict[str, Dict[Tuple[int, str, str], Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+
+    def _generate(self, state: ExamState, action: str, partial_transcript: str) -> Tuple[str, float]:
+        started = time.perf_counter()
+        question = self.examiner.question_for(state, action, partial_transcript or None)
+        return question, time.perf_counter() - started
+
+    def speculate(
+        self,
+        session_id: str,
+        session: Dict[str, Any],
+        partial_transcript: str = "",
+        elapsed_seconds: Optional[float] = None
+    ) -> int:
+        """
+        Start candidate generation for the current turn, returns how many
+        were submitted. Topic changes are generated once per turn; follow-ups
+        are regenerated when the partial transcript has grown enough.
+        """
+        stats = session.setdefault("speculation", new_stats())
+        exam_state = ExamState(**session["exam"])
+        if exam_state.finished:
+            return 0
+
+        words = len(partial_transcript.split())
+        submitted = 0
+        with self.lock:
+            pending = self.candidates.setdefault(session_id, {})
+            for state, action in possible_outcomes(exam_state, partial_transcript, elapsed_seconds):
+                # Bank questions are instant, only LLM questions are worth speculating
+                if not self.examiner.uses_llm(state, action):
+                    continue
+                key = _key(state, action)
+                current = pending.get(key)
+                if action == FOLLOW_UP:
+                    # A follow-up needs something to follow up on
+                    if words < settings.speculation_min_new_words:
+                        continue
+                    if current and words - current["basis_words"] < settings.speculation_min_new_words:
+                        continue
+                elif current:
+                    continue
+
+                if stats["generated"] >= settings.speculation_budget:
+                    break
+                if current:
+                    current["future"].cancel()
+                pending[key] = {
+                    "future": self.executor.submit(self._generate, state, action, partial_transcript),
+                    "basis_words": words
+                }
+                stats["generated"] += 1
+                submitted += 1
+        return submitted
+
+    def take(
+        self,
+        session_id: str,
+        session: Dict[str, Any],
+        exam_state: ExamState,
+        decision: Dict[str, str],
+        user_response: str
+    ) -> Optional[str]:
+        """
+        Question for the decided action if a fitting candidate exists
+        All other candidates of the turn are cancelled either way
+        """
+        stats = session.setdefault("speculation", new_stats())
+        with self.lock:
+            pending = self.candidates.pop(session_id, {})
+        candidate = pending.pop(_key(exam_state, decision["action"]), None)
+        for other in pending.values():
+            other["future"].cancel()
+        if not candidate and not pending:
+            return None
+
+        question = None
+        if candidate and self._fits(candidate, decision["action"], user_response):
+            waited = time.perf_counter()
+            try:
+                question, generation_seconds = candidate["future"].result(
+                    timeout=settings.speculation_wait_seconds
+                )
+            except TimeoutError:
+                candidate["future"].cancel()
+            except Exception:
+                question = None
+            else:
+                # Time the learner would otherwise have waited
+                stats["latency_saved_seconds"] = round(
+                    stats["latency_saved_seconds"]
+                    + max(0.0, generation_seconds - (time.perf_counter() - waited)), 3
+                )
+        elif candidate:
+            candidate["future"].cancel()
+
+        stats["hits" if question else "misses"] += 1
+        return question
+
+    def _fits(self, candidate: Dict[str, Any], action: str, user_response: str) -> bool:
+        """Follow-ups must have seen most of the final answer"""
+        if action != FOLLOW_UP:
+            return True
+        words = len(user_response.split())
+        return words == 0 or candidate["basis_words"] / words >= settings.speculation_min_coverage
+
+    def cancel(self, session_id: str):
+        with self.lock:
+            pending = self.candidates.pop(session_id, {})
+        for candidate in pending.values():
+            candidate["future"].cancel()
+
+
+def new_stats() -> Dict[str, Any]:
+    return {"generated": 0, "hits": 0, "misses": 0, "latency_saved_seconds": 0.0}
+
+
+def speculation_report(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Hit rate and latency saved for one session"""
+    stats = stats or new_stats()
+    decided = stats["hits"] + stats["misses"]
+    return {
+        **stats,
+        "hit_rate": round(stats["hits"] / decided, 3) if decided else None,
+        "budget_left": max(0, settings.speculation_budget - stats["generated"])
+    }
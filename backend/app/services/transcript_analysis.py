@@ -0,0 +1,276 @@
+"""
+Local Transcript Analysis
+Exact linguistic features computed in-process, no LLM involved:
+- Filler / hesitation detection
+- Speech rate
+- Lexical diversity (TTR, root TTR, MATTR, hapax ratio)
+- Word repetitions with positions
+- Connector usage and sentence complexity
+"""
+
+from typing import Dict, List, Any, Optional
+from pydantic import BaseModel
+import numpy as np
+import re
+
+_TOKEN = re.compile(r"[a-z]+(?:'[a-z]+)?|[.!?,;]")
+_SENTENCE_MARKS = [".", "!", "?"]
+
+FILLERS = ["um", "umm", "uh", "uhh", "er", "erm", "ah", "eh", "hmm", "mm"]
+FILLER_PHRASES = ["you know", "i mean", "sort of", "kind of", "you see"]
+
+CONNECTORS = [
+    "because", "so", "however", "although", "therefore", "moreover",
+    "furthermore", "firstly", "secondly", "finally", "besides", "whereas",
+    "also", "but", "actually", "meanwhile", "nevertheless", "overall",
+]
+CONNECTOR_PHRASES = [
+    "on the other hand", "for example", "for instance", "in addition",
+    "as a result", "in contrast", "in conclusion", "to be honest", "apart from",
+]
+
+SUBORDINATORS = [
+    "because", "although", "though", "if", "when", "while", "whereas",
+    "unless", "since", "which", "who", "whom", "whose", "where", "after",
+    "before", "until", "whether",
+]
+
+STOPWORDS = set("""
+a an the and or but so of to in on at for with from by as is am are was were be
+been being it its i me my we our you your he him his she her they them their this
+that these those there here do does did have has had not no yes just very really
+um umm uh uhh er erm ah eh hmm mm like can could would will should what
+""".split())
+
+# Window for the moving-average type-token ratio
+MATTR_WINDOW = 50
+
+# A content word used this often is reported as a repetition
+REPETITION_MIN_COUNT = 3
+
+
+class TranscriptFeatures(BaseModel):
+    """Exact features of one transcript"""
+    word_count: int = 0
+    unique_words: int = 0
+    duration_seconds: Optional[float] = None
+    words_per_minute: Optional[float] = None
+
+    filler_count: int = 0
+    filler_rate: float = 0.0  # per 100 words
+    fillers: Dict[str, int] = {}
+
+    type_token_ratio: float = 0.0
+    root_ttr: float = 0.0
+    mattr: float = 0.0
+    hapax_ratio: float = 0.0
+    repetitions: List[Dict[str, Any]] = []
+
+    connector_count: int = 0
+    connectors: Dict[str, int] = {}
+    sentence_count: int = 0
+    mean_sentence_length: float = 0.0
+    complex_sentence_ratio: float = 0.0
+    subordinators_per_sentence: float = 0.0
+
+    def fluency_facts(self) -> Dict[str, Any]:
+        """Compact facts for the fluency prompt"""
+        return {
+            "word_count": self.word_count,
+            "words_per_minute": self.words_per_minute,
+            "filler_count": self.filler_count,
+            "fillers": self.fillers,
+            "connectors": self.connectors,
+            "sentence_count": self.sentence_count,
+        }
+
+    def grammar_facts(self) -> Dict[str, Any]:
+        """Compact facts for the grammar prompt"""
+        return {
+            "sentence_count": self.sentence_count,
+            "mean_sentence_length": self.mean_sentence_length,
+            "complex_sentence_ratio": self.complex_sentence_ratio,
+            "subordinators_per_sentence": self.subordinators_per_sentence,
+        }
+
+    def vocabulary_facts(self) -> Dict[str, Any]:
+        """Compact facts for the vocabulary prompt"""
+        return {
+            "word_count": self.word_count,
+            "unique_words": self.unique_words,
+            "type_token_ratio": self.type_token_ratio,
+            "mattr": self.mattr,
+            "repetitions": [
+                {"word": r["word"], "count": r["count"]} for r in self.repetitions[:5]
+            ],
+        }
+
+
+def tokenize(text: str) -> np.ndarray:
+    """Lowercased word and punctuation tokens"""
+    return np.array(_TOKEN.findall(text.lower()), dtype=object)
+
+
+def _phrase_counts(words: np.ndarray, phrases: List[str]) -> Dict[str, int]:
+    """Count multi-word phrases with vectorized n-gram comparison"""
+    counts = {}
+    for phrase in phrases:
+        parts = phrase.split()
+        n = len(parts)
+        if len(words) < n:
+            continue
+        mask = np.ones(len(words) - n + 1, dtype=bool)
+        for offset, part in enumerate(parts):
+            mask &= words[offset:len(words) - n + 1 + offset] == part
+        hits = int(mask.sum())
+        if hits:
+            counts[phrase] = hits
+    return counts
+
+
+def _mattr(inverse: np.ndarray, window: int) -> float:
+    """Moving-average type-token ratio over fixed windows"""
+    n = len(inverse)
+    if n == 0:
+        return 0.0
+    if n <= window:
+        return len(np.unique(inverse)) / n
+
+    # prev[i]: index of the previous occurrence of token i (-1 if none).
+    # A token is new within the window starting at s when prev[i] < s.
+    order = np.lexsort((np.arange(n), inverse))
+    prev_sorted = np.full(n, -1)
+    same = inverse[order][1:] == inverse[order][:-1]
+    prev_sorted[1:][same] = order[:-1][same]
+    prev = np.empty(n, dtype=np.int64)
+    prev[order] = prev_sorted
+
+    windows = np.lib.stride_tricks.sliding_window_view(prev, window)
+    starts = np.arange(len(windows))[:, None]
+    distinct = (windows < starts).sum(axis=1)
+    return float(distinct.mean() / window)
+
+
+def analyze_transcript(
+    transcript: str,
+    duration_seconds: Optional[float] = None
+) -> TranscriptFeatures:
+    """Tokenize once and compute every feature"""
+    tokens = tokenize(transcript)
+    is_word = np.array([t[0].isalpha() for t in tokens], dtype=bool)
+    words = tokens[is_word]
+    n = len(words)
+    if n == 0:
+        return TranscriptFeatures(duration_seconds=duration_seconds)
+
+    vocab, inverse, counts = np.unique(words, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+
+    # Fillers: single-token hesitations, multi-word phrases and "like"
+    # set off by commas (", like,")
+    fillers = {str(w): int(c) for w, c in zip(vocab, counts) if w in FILLERS}
+    fillers.update(_phrase_counts(words, FILLER_PHRASES))
+    if len(tokens) >= 2:
+        like = tokens == "like"
+        comma_before = np.zeros(len(tokens), dtype=bool)
+        comma_before[1:] = tokens[:-1] == ","
+        comma_after = np.zeros(len(tokens), dtype=bool)
+        comma_after[:-1] = tokens[1:] == ","
+        like_fillers = int((like & (comma_before | comma_after)).sum())
+        if like_fillers:
+            fillers["like"] = like_fillers
+    filler_count = sum(fillers.values())
+
+    # Speech rate on words actually spoken, hesitations excluded
+    words_per_minute = None
+    if duration_seconds:
+        words_per_minute = round((n - filler_count) / duration_seconds * 60, 1)
+
+    # Lexical diversity
+    hapax = int((counts == 1).sum())
+
+    # Repetitions of content words, with word positions
+    content = np.array([w not in STOPWORDS for w in vocab], dtype=bool)
+    repeated = np.nonzero(content & (counts >= REPETITION_MIN_COUNT))[0]
+    repeated = repeated[np.argsort(-counts[repeated], kind="stable")]
+    repetitions = [
+        {
+            "word": str(vocab[i]),
+            "count": int(counts[i]),
+            "positions": np.nonzero(inverse == i)[0].tolist()
+        }
+        for i in repeated
+    ]
+
+    # Connectors
+    connectors = {str(w): int(c) for w, c in zip(vocab, counts) if w in CONNECTORS}
+    connectors.update(_phrase_counts(words, CONNECTOR_PHRASES))
+
+    # Sentence complexity: sentence ids from cumulative end marks
+    ends = np.isin(tokens, _SENTENCE_MARKS)
+    sentence_ids = np.concatenate(([0], np.cumsum(ends)[:-1]))[is_word]
+    _, sentence_lengths = np.unique(sentence_ids, return_counts=True)
+    subordinate = np.isin(words, SUBORDINATORS)
+    subordinators_by_sentence = np.bincount(sentence_ids, weights=subordinate)
+    subordinators_by_sentence = subordinators_by_sentence[np.unique(sentence_ids)]
+    sentence_count = len(sentence_lengths)
+
+    return TranscriptFeatures(
+        word_count=n,
+        unique_words=len(vocab),
+        duration_seconds=duration_seconds,
+        words_per_minute=words_per_minute,
+        filler_count=filler_count,
+        filler_rate=round(filler_count / n * 100, 2),
+        fillers=fillers,
+        type_token_ratio=round(len(vocab) / n, 3),
+        root_ttr=round(len(vocab) / np.sqrt(n), 2),
+        mattr=round(_mattr(inverse, MATTR_WINDOW), 3),
+        hapax_ratio=round(hapax / len(vocab), 3),
+        repetitions=repetitions,
+        connector_count=sum(connectors.values()),
+        connectors=connectors,
+        sentence_count=sentence_count,
+        mean_sentence_length=round(float(sentence_lengths.mean()), 1),
+        complex_sentence_ratio=round(float((subordinators_by_sentence > 0).mean()), 2),
+        subordinators_per_sentence=round(float(subordinators_by_sentence.mean()), 2),
+    )
+
+
+def quick_feedback(features: TranscriptFeatures) -> Dict[str, Any]:
+    """
+    LLM-free feedback from the exact features
+    Thresholds follow common IELTS speaking guidance
+    """
+    tips = []
+
+    if features.words_per_minute is not None:
+        if features.words_per_minute < 100:
+            tips.append("Your pace is slow. Aim for around 120-150 words per minute.")
+        elif features.words_per_minute > 180:
+            tips.append("You are speaking very fast. Slow down slightly to stay clear.")
+
+    if features.filler_rate > 5:
+        top = max(features.fillers, key=features.fillers.get)
+        tips.append(
+            f"You used {features.filler_count} fillers (mostly \"{top}\"). "
+            "Try a short silent pause instead."
+        )
+
+    if features.word_count >= MATTR_WINDOW and features.mattr < 0.6:
+        tips.append("Your vocabulary is repetitive. Paraphrase instead of reusing words.")
+    for rep in features.repetitions[:3]:
+        tips.append(f"\"{rep['word']}\" was used {rep['count']} times. Look for alternatives.")
+
+    if features.sentence_count >= 2 and features.complex_sentence_ratio < 0.3:
+        tips.append("Add complex sentences with because, although, which or when.")
+    if features.word_count >= 40 and features.connector_count < 2:
+        tips.append("Use linking words (however, for example, as a result) to connect ideas.")
+
+    if not tips:
+        tips.append("Good control of pace, fillers and vocabulary. Keep practising!")
+
+    return {
+        "features": features.dict(),
+        "tips": tips
+    }
@@ -1,23 +1,32 @@
+from contextlib import asynccontextmanager, suppress
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.database import engine
-from app.models import models
+from app.db.write_behind import write_behind
+from app.services.audio_storage import purge_periodically
 from app.api.routes import router
 from app.api.ielts_routes import router as ielts_router
 from app.api.dynamic_routes import router as dynamic_router
 
-# Create database tables (optional - will continue if DB not available)
-try:
-    models.Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created successfully")
-except Exception as e:
-    print(f"⚠️  Database not available: {e}")
-    print("   Continuing without database (some features may not work)")
+# The schema is managed by Alembic (`alembic upgrade head`), not at import time
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await write_behind.start()
+    # Expired turn recordings are swept in the background
+    audio_cleanup = asyncio.create_task(purge_periodically())
+    yield
+    audio_cleanup.cancel()
+    with suppress(asyncio.CancelledError):
+        await audio_cleanup
+    # Flush queued append-only rows before the worker exits
+    await write_behind.stop()
 
 app = FastAPI(
     title="Speak-Fluent Backend",
     description="AI-powered language learning platform using NVIDIA API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -27,6 +36,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # keyset pagination cursor
 )
 
 # Include routers
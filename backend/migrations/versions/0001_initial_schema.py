@@ -0,0 +1,133 @@
+"""initial schema
+
+The tables as previously created by Base.metadata.create_all. Databases
+created that way already match this revision: mark them with
+`alembic stamp 0001` and then upgrade.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String()),
+        sa.Column("username", sa.String()),
+        sa.Column("full_name", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "quizzes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String()),
+        sa.Column("topic", sa.String()),
+        sa.Column("language", sa.String()),
+        sa.Column("difficulty", sa.String()),
+        sa.Column("questions", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_quizzes_id", "quizzes", ["id"])
+
+    op.create_table(
+        "conversations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("language", sa.String()),
+        sa.Column("level", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_conversations_id", "conversations", ["id"])
+
+    op.create_table(
+        "messages",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("conversation_id", sa.Integer(), sa.ForeignKey("conversations.id")),
+        sa.Column("role", sa.String()),
+        sa.Column("content", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_messages_id", "messages", ["id"])
+
+    op.create_table(
+        "vocabulary_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("word", sa.String()),
+        sa.Column("definition", sa.Text()),
+        sa.Column("example", sa.Text()),
+        sa.Column("pronunciation", sa.String(), nullable=True),
+        sa.Column("language", sa.String()),
+        sa.Column("topic", sa.String(), nullable=True),
+        sa.Column("mastery_level", sa.Integer()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("last_reviewed", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_vocabulary_items_id", "vocabulary_items", ["id"])
+
+    op.create_table(
+        "user_progress",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("language", sa.String()),
+        sa.Column("level", sa.String()),
+        sa.Column("total_conversations", sa.Integer()),
+        sa.Column("total_vocabulary", sa.Integer()),
+        sa.Column("total_quizzes", sa.Integer()),
+        sa.Column("quiz_score_avg", sa.Float()),
+        sa.Column("streak_days", sa.Integer()),
+        sa.Column("last_activity", sa.DateTime()),
+    )
+    op.create_index("ix_user_progress_id", "user_progress", ["id"])
+
+    op.create_table(
+        "quiz_attempts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("quiz_id", sa.Integer(), sa.ForeignKey("quizzes.id")),
+        sa.Column("score", sa.Float()),
+        sa.Column("answers", sa.JSON()),
+        sa.Column("completed_at", sa.DateTime()),
+    )
+    op.create_index("ix_quiz_attempts_id", "quiz_attempts", ["id"])
+
+    op.create_table(
+        "grammar_corrections",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("original_text", sa.Text()),
+        sa.Column("corrected_text", sa.Text()),
+        sa.Column("mistakes", sa.JSON()),
+        sa.Column("language", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_grammar_corrections_id", "grammar_corrections", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in (
+        "grammar_corrections", "quiz_attempts", "user_progress", "vocabulary_items",
+        "messages", "conversations", "quizzes", "users",
+    ):
+        op.drop_table(table)
@@ -0,0 +1,32 @@
+"""composite indexes for keyset-paginated listings
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_conversations_user_id_created_at", "conversations", ["user_id", "created_at"])
+    op.create_index("ix_messages_conversation_id_created_at", "messages", ["conversation_id", "created_at"])
+    op.create_index("ix_vocabulary_items_user_id_created_at", "vocabulary_items", ["user_id", "created_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_vocabulary_items_user_id_created_at", table_name="vocabulary_items")
+    op.drop_index("ix_messages_conversation_id_created_at", table_name="messages")
+    op.drop_index("ix_conversations_user_id_created_at", table_name="conversations")
@@ -0,0 +1,44 @@
+"""indexes on foreign keys and hot filter columns
+
+Foreign keys that already lead a composite index (conversations.user_id,
+messages.conversation_id, vocabulary_items.user_id, see 0002) are not
+indexed again.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_user_progress_user_id", "user_progress", ["user_id"])
+    op.create_index("ix_quiz_attempts_user_id", "quiz_attempts", ["user_id"])
+    op.create_index("ix_quiz_attempts_quiz_id", "quiz_attempts", ["quiz_id"])
+    op.create_index("ix_grammar_corrections_user_id", "grammar_corrections", ["user_id"])
+    op.create_index(
+        "ix_vocabulary_items_user_id_language_created_at",
+        "vocabulary_items",
+        ["user_id", "language", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_vocabulary_items_user_id_language_created_at", table_name="vocabulary_items")
+    op.drop_index("ix_grammar_corrections_user_id", table_name="grammar_corrections")
+    op.drop_index("ix_quiz_attempts_quiz_id", table_name="quiz_attempts")
+    op.drop_index("ix_quiz_attempts_user_id", table_name="quiz_attempts")
+    op.drop_index("ix_user_progress_user_id", table_name="user_progress")
@@ -0,0 +1,74 @@
+"""persistent IELTS sessions, turn log and scores
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "ielts_sessions",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("session_type", sa.String()),
+        sa.Column("status", sa.String()),
+        sa.Column("incremental_scoring", sa.Boolean()),
+        sa.Column("exam_state", sa.JSON()),
+        sa.Column("turn_count", sa.Integer()),
+        sa.Column("overall_band", sa.Float(), nullable=True),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("ended_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_ielts_sessions_user_id_started_at", "ielts_sessions", ["user_id", "started_at"])
+
+    op.create_table(
+        "ielts_turns",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("session_id", sa.String(), sa.ForeignKey("ielts_sessions.id"), nullable=False),
+        sa.Column("turn_index", sa.Integer(), nullable=False),
+        sa.Column("part", sa.Integer()),
+        sa.Column("user_response", sa.Text()),
+        sa.Column("exchange", sa.JSON()),
+        sa.Column("exam_state", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index(
+        "ix_ielts_turns_session_id_turn_index", "ielts_turns", ["session_id", "turn_index"], unique=True
+    )
+
+    op.create_table(
+        "ielts_scores",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("session_id", sa.String(), sa.ForeignKey("ielts_sessions.id"), nullable=False, unique=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("overall_band", sa.Float()),
+        sa.Column("fluency_band", sa.Float()),
+        sa.Column("grammar_band", sa.Float()),
+        sa.Column("vocabulary_band", sa.Float()),
+        sa.Column("pronunciation_band", sa.Float()),
+        sa.Column("score", sa.JSON()),
+        sa.Column("validation", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_ielts_scores_user_id_created_at", "ielts_scores", ["user_id", "created_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("ielts_scores")
+    op.drop_table("ielts_turns")
+    op.drop_table("ielts_sessions")
@@ -0,0 +1,47 @@
+"""incremental progress aggregates on user_progress
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("user_progress") as batch:
+        batch.add_column(sa.Column("total_practice_sessions", sa.Integer(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("total_minutes", sa.Float(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("activity_counts", sa.JSON(), nullable=True))
+        batch.add_column(sa.Column("longest_streak", sa.Integer(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("band_count", sa.Integer(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("band_avg", sa.Float(), nullable=True))
+        batch.add_column(sa.Column("band_ema", sa.Float(), nullable=True))
+        batch.add_column(sa.Column("latest_band", sa.Float(), nullable=True))
+        batch.add_column(sa.Column("target_band", sa.Float(), nullable=True))
+    # One row per user and language; the composite index also serves user_id lookups
+    op.drop_index("ix_user_progress_user_id", table_name="user_progress")
+    op.create_index("ix_user_progress_user_id_language", "user_progress", ["user_id", "language"], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_user_progress_user_id_language", table_name="user_progress")
+    op.create_index("ix_user_progress_user_id", "user_progress", ["user_id"])
+    with op.batch_alter_table("user_progress") as batch:
+        for column in (
+            "target_band", "latest_band", "band_ema", "band_avg", "band_count",
+            "longest_streak", "activity_counts", "total_minutes", "total_practice_sessions"
+        ):
+            batch.drop_column(column)
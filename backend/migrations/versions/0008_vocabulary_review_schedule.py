@@ -0,0 +1,40 @@
+"""SM-2 review schedule on vocabulary_items
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 16:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("vocabulary_items") as batch:
+        batch.add_column(sa.Column("easiness", sa.Float(), nullable=False, server_default="2.5"))
+        batch.add_column(sa.Column("repetitions", sa.Integer(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("interval_days", sa.Float(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("next_due_at", sa.DateTime(), nullable=True))
+    # Existing items are due from their last review (or when they were saved)
+    op.execute("UPDATE vocabulary_items SET next_due_at = COALESCE(last_reviewed, created_at)")
+    op.create_index(
+        "ix_vocabulary_items_user_id_next_due_at", "vocabulary_items", ["user_id", "next_due_at"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_vocabulary_items_user_id_next_due_at", table_name="vocabulary_items")
+    with op.batch_alter_table("vocabulary_items") as batch:
+        for column in ("next_due_at", "interval_days", "repetitions", "easiness"):
+            batch.drop_column(column)
@@ -0,0 +1,57 @@
+"""band series stored in fixed-size chunks
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-20 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "band_series_chunks",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("chunk", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("points", sa.Integer(), nullable=False),
+        sa.Column("timestamps", sa.LargeBinary(), nullable=True),
+        sa.Column("bands", sa.LargeBinary(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("user_id", "chunk"),
+    )
+    # Each packed series becomes its user's first chunk; appends start the next one
+    op.execute(
+        "INSERT INTO band_series_chunks (user_id, chunk, points, timestamps, bands, updated_at) "
+        "SELECT user_id, 0, points, timestamps, bands, updated_at FROM band_series"
+    )
+    op.drop_table("band_series")
+
+
+def downgrade() -> None:
+    """Downgrade schema (keeps each user's newest chunk)."""
+    op.create_table(
+        "band_series",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("points", sa.Integer(), nullable=False),
+        sa.Column("timestamps", sa.LargeBinary(), nullable=True),
+        sa.Column("bands", sa.LargeBinary(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.execute(
+        "INSERT INTO band_series (user_id, points, timestamps, bands, updated_at) "
+        "SELECT user_id, points, timestamps, bands, updated_at FROM band_series_chunks c "
+        "WHERE chunk = (SELECT MAX(chunk) FROM band_series_chunks WHERE user_id = c.user_id)"
+    )
+    op.drop_table("band_series_chunks")
@@ -0,0 +1,29 @@
+"""IELTS part of each band series point
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-21 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema (existing points read as part unknown)."""
+    op.add_column("band_series_chunks", sa.Column("parts", sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("band_series_chunks") as batch:
+        batch.drop_column("parts")
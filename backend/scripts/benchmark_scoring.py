@@ -0,0 +1,130 @@
+"""
+Benchmark fused vs multi-agent IELTS scoring
+Compares latency, approximate token usage and band agreement.
+
+Run from backend/ with a valid NVIDIA_API_KEY:
+    python -m scripts.benchmark_scoring
+    python -m scripts.benchmark_scoring --repeat 3 --transcripts my_samples.json
+
+A transcripts file is a JSON list of strings.
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Dict, List, Any
+
+from app.services.nvidia_service import nvidia_llm_service
+from app.services.agents.scoring_agent import ScoringOrchestratorAgent, CRITERIA
+from app.services.agents.score_aggregation import parse_band
+
+SAMPLE_TRANSCRIPTS = [
+    # Part 1, short
+    "I'm from a small town near the coast. It's quite peaceful and, um, "
+    "people there are very friendly. I like it because I can walk to the beach.",
+    # Part 1, short
+    "Yes, I work as a software developer. I enjoy it because every day is "
+    "different and I learn new things, although sometimes the deadlines are stressful.",
+    # Part 2, long turn
+    "I'd like to talk about a trip I took to the mountains with my family two years ago. "
+    "We had been planning it for months, so everyone was really excited. We drove for "
+    "about six hours and, er, stayed in a small wooden cabin near a lake. Every morning "
+    "we went hiking, and in the evenings we cooked together and played board games. "
+    "What made it memorable was that it was the first time in years that all of us, my "
+    "parents, my sister and my grandparents, were together without any distractions. "
+    "There was no internet, so we actually talked to each other a lot. I think it taught "
+    "me that spending time with family is more valuable than, you know, buying expensive "
+    "things. I still look at the photos from that trip when I feel stressed.",
+]
+
+
+class CountingLLMService:
+    """Wraps the LLM service and records calls and approximate tokens"""
+
+    def __init__(self, llm_service):
+        self.llm_service = llm_service
+        self.calls = 0
+        self.prompt_chars = 0
+        self.completion_chars = 0
+
+    def generate_response(self, messages, temperature: float = 1.0, max_tokens: int = 4096) -> str:
+        self.calls += 1
+        self.prompt_chars += sum(len(m["content"]) for m in messages)
+        response = self.llm_service.generate_response(messages, temperature, max_tokens)
+        self.completion_chars += len(response)
+        return response
+
+    def reset(self):
+        self.calls = self.prompt_chars = self.completion_chars = 0
+
+    @property
+    def approx_tokens(self) -> int:
+        # ~4 characters per token for English text
+        return (self.prompt_chars + self.completion_chars) // 4
+
+
+def run_mode(mode: str, transcript: str, repeat: int) -> Dict[str, Any]:
+    llm = CountingLLMService(nvidia_llm_service)
+    scorer = ScoringOrchestratorAgent(llm)
+    latencies, tokens, calls, scores = [], [], [], []
+    for _ in range(repeat):
+        llm.reset()
+        start = time.perf_counter()
+        scores.append(scorer.score_response(transcript, {}, mode=mode))
+        latencies.append(time.perf_counter() - start)
+        tokens.append(llm.approx_tokens)
+        calls.append(llm.calls)
+    return {
+        "latency_s": statistics.median(latencies),
+        "approx_tokens": statistics.median(tokens),
+        "llm_calls": statistics.median(calls),
+        "scores": scores,
+    }
+
+
+def band_agreement(fused: List[Dict[str, Any]], multi: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Mean absolute band difference and share of pairs within half a band"""
+    fields = [f"{c}_band" for c in CRITERIA] + ["overall_band"]
+    diffs = {field: [] for field in fields}
+    for a in fused:
+        for b in multi:
+            for field in fields:
+                diffs[field].append(abs(parse_band(a.get(field)) - parse_band(b.get(field))))
+    return {
+        field: {
+            "mean_abs_diff": round(statistics.mean(values), 2),
+            "within_half_band": round(sum(v <= 0.5 for v in values) / len(values), 2),
+        }
+        for field, values in diffs.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--transcripts", help="JSON file with a list of transcripts")
+    args = parser.parse_args()
+
+    transcripts = SAMPLE_TRANSCRIPTS
+    if args.transcripts:
+        with open(args.transcripts) as f:
+            transcripts = json.load(f)
+
+    report = []
+    for transcript in transcripts:
+        fused = run_mode("fused", transcript, args.repeat)
+        multi = run_mode("multi_agent", transcript, args.repeat)
+        report.append({
+            "words": len(transcript.split()),
+            "fused": {k: v for k, v in fused.items() if k != "scores"},
+            "multi_agent": {k: v for k, v in multi.items() if k != "scores"},
+            "speedup": round(multi["latency_s"] / max(fused["latency_s"], 1e-6), 2),
+            "agreement": band_agreement(fused["scores"], multi["scores"]),
+        })
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
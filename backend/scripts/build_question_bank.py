@@ -0,0 +1,131 @@
+"""
+Build the IELTS question bank offline
+Asks the LLM for batches of Part 1 questions, Part 2 cue cards and Part 3
+prompts per topic and difficulty, validates and de-duplicates them, and
+appends them to app/data/question_bank/questions.jsonl. Near-duplicates of
+existing items (MinHash/LSH) are rejected, not only exact repeats.
+
+Run from backend/ with a valid NVIDIA_API_KEY:
+    python -m scripts.build_question_bank
+    python -m scripts.build_question_bank --per-bucket 40 --parts 1 3
+"""
+
+import argparse
+import json
+import re
+from typing import Dict, List, Any
+
+from app.services.nvidia_service import nvidia_llm_service
+from app.services.agents.exam_flow import PART1_TOPICS, PART2_TOPICS
+from app.services.question_bank import (
+    DIFFICULTIES, QUESTION_BANK_PATH, load_items, validate_item
+)
+from app.services.near_duplicates import NearDuplicateIndex
+
+PART_BRIEFS = {
+    1: "short Part 1 questions about the candidate's own life and familiar things",
+    2: "Part 2 cue cards: a 'Describe ...' topic line and 3-4 points, the last one starting with 'Explain'",
+    3: "abstract Part 3 discussion questions that ask for opinions, comparisons and speculation",
+}
+
+DIFFICULTY_BRIEFS = {
+    "foundation": "simple vocabulary, concrete and personal (band 4-5 learners)",
+    "intermediate": "everyday vocabulary with some reasons and examples (band 5.5-6.5)",
+    "advanced": "abstract, nuanced, invites hypotheticals and evaluation (band 7+)",
+}
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def generate_batch(part: int, topic: str, difficulty: str, count: int) -> List[Dict[str, Any]]:
+    """One LLM call for up to count raw items"""
+    shape = (
+        '{"items": [{"topic": "Describe ...", "points": ["...", "...", "...", "Explain ..."]}]}'
+        if part == 2 else '{"items": ["question 1?", "question 2?"]}'
+    )
+    prompt = f"""Write {count} distinct IELTS Speaking {PART_BRIEFS[part]}.
+Topic: {topic}
+Difficulty: {difficulty} - {DIFFICULTY_BRIEFS[difficulty]}
+
+Return JSON: {shape}"""
+
+    response = nvidia_llm_service.generate_response(
+        [{"role": "system", "content": prompt}],
+        temperature=0.9,
+        max_tokens=4096
+    )
+    try:
+        raw = json.loads(response)["items"]
+    except (ValueError, KeyError, TypeError):
+        return []
+
+    items = []
+    for entry in raw:
+        item = {"part": part, "topic": topic, "difficulty": difficulty}
+        if part == 2 and isinstance(entry, dict):
+            item["question"] = str(entry.get("topic", ""))
+            item["cue_card"] = {
+                "topic": item["question"],
+                "points": [str(p) for p in entry.get("points", [])],
+                "preparation_time": 60,
+                "speaking_time": 120,
+            }
+        elif part != 2 and isinstance(entry, str):
+            item["question"] = entry.strip()
+        else:
+            continue
+        items.append(item)
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--parts", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--per-bucket", type=int, default=30, help="target items per part/topic/difficulty")
+    parser.add_argument("--batch", type=int, default=10)
+    parser.add_argument("--max-calls", type=int, default=5, help="LLM calls per bucket")
+    parser.add_argument("--out", default=QUESTION_BANK_PATH)
+    args = parser.parse_args()
+
+    items = load_items(args.out)
+    # In-memory: the bank file itself is the persistent record
+    index = NearDuplicateIndex()
+    for item in items:
+        index.add(item["question"], f"part{item['part']}")
+    counts: Dict[tuple, int] = {}
+    for item in items:
+        key = (item["part"], item["topic"], item["difficulty"])
+        counts[key] = counts.get(key, 0) + 1
+
+    report = {"added": 0, "rejected": 0, "duplicates": 0}
+    with open(args.out, "a") as out:
+        for part in args.parts:
+            # Part 3 discussions hang off the Part 2 topics
+            topics = PART1_TOPICS if part == 1 else PART2_TOPICS
+            for topic in topics:
+                for difficulty in DIFFICULTIES:
+                    key = (part, topic, difficulty)
+                    for _ in range(args.max_calls):
+                        missing = args.per_bucket - counts.get(key, 0)
+                        if missing <= 0:
+                            break
+                        for item in generate_batch(part, topic, difficulty, min(args.batch, missing)):
+                            if validate_item(item):
+                                report["rejected"] += 1
+                                continue
+                            if not index.add_if_novel(item["question"], f"part{part}"):
+                                report["duplicates"] += 1
+                                continue
+                            counts[key] = counts.get(key, 0) + 1
+                            item = {"id": f"p{part}-{_slug(topic)}-{difficulty[0]}{counts[key]}", **item}
+                            out.write(json.dumps(item) + "\n")
+                            report["added"] += 1
+
+    report["total"] = len(load_items(args.out))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Train the distilled confidence classifier from logged LLM outputs
+Fits the ordinal model on the ConfidenceAgent training log and reports
+holdout agreement with the LLM before saving.
+
+Run from backend/:
+    python -m scripts.train_confidence_model
+    python -m scripts.train_confidence_model --log logs/confidence_examples.jsonl --out models/confidence_model.npz
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.confidence_model import ConfidenceModel, LEVELS, load_log
+
+MIN_EXAMPLES = 50
+
+
+def evaluate(model: ConfidenceModel, X: np.ndarray, y: np.ndarray, threshold: float):
+    """Agreement with the LLM overall and on the turns the model would serve"""
+    proba = model.predict_proba(X)
+    predicted = proba.argmax(axis=1)
+    served = proba.max(axis=1) >= threshold
+    return {
+        "examples": int(len(y)),
+        "accuracy": round(float((predicted == y).mean()), 3),
+        "served_share": round(float(served.mean()), 3),
+        "served_accuracy": round(float((predicted[served] == y[served]).mean()), 3) if served.any() else None,
+        "off_by_two": int((np.abs(predicted - y) == 2).sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--log", default=settings.confidence_log_path)
+    parser.add_argument("--out", default=settings.confidence_model_path)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--l2", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    X, y = load_log(args.log)
+    if len(y) < MIN_EXAMPLES:
+        raise SystemExit(f"Only {len(y)} labelled examples in {args.log}, need {MIN_EXAMPLES}")
+
+    order = np.random.default_rng(args.seed).permutation(len(y))
+    cut = int(len(y) * (1 - args.holdout))
+    train, test = order[:cut], order[cut:]
+
+    model = ConfidenceModel.fit(X[train], y[train], l2=args.l2)
+    report = {
+        "class_counts": dict(zip(LEVELS, np.bincount(y, minlength=len(LEVELS)).tolist())),
+        "holdout": evaluate(model, X[test], y[test], settings.confidence_model_threshold),
+    }
+
+    # Final model uses every example
+    ConfidenceModel.fit(X, y, l2=args.l2).save(args.out)
+    report["saved_to"] = args.out
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
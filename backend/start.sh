@@ -26,6 +26,10 @@ if [ ! -f ".env" ]; then
     exit 1
 fi
 
+# Apply database migrations (the app no longer creates tables on startup)
+echo "🗄️  Applying database migrations..."
+alembic upgrade head || echo "⚠️  Migrations failed - is the database running? Continuing without it."
+
 # Run the server
 echo "✅ Starting FastAPI server..."
 echo "📚 API Documentation will be available at: http://localhost:8000/docs"
@@ -0,0 +1,94 @@
+"""
+Tests for chunked turn audio uploads
+"""
+import io
+import os
+import struct
+import time
+import wave
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.ielts_routes import router
+from app.services.agent_orchestrator import agent_orchestrator
+from app.services.audio_storage import purge_expired
+
+SAMPLE_RATE = 16000
+SESSION_ID = "upload-test"
+
+
+def _pcm(seconds=2.0):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    signal = 0.3 * 0.5 * (1 - np.cos(2 * np.pi * 4 * t)) * np.sin(2 * np.pi * 150 * t)
+    return (signal * 32767).astype("<i2").tobytes()
+
+
+def _wav(pcm):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(pcm)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.audio_storage.settings.audio_upload_dir", str(tmp_path))
+    monkeypatch.setattr("app.api.ielts_routes.settings.audio_max_upload_mb", 1)
+    agent_orchestrator.active_sessions[SESSION_ID] = {"exchanges": [], "audio_features": {}}
+    app = FastAPI()
+    app.include_router(router)
+    yield TestClient(app)
+    del agent_orchestrator.active_sessions[SESSION_ID]
+
+
+def _files(tmp_path):
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), tmp_path)
+        for directory, _, files in os.walk(tmp_path) for name in files
+    )
+
+
+def test_wav_and_raw_pcm_uploads_are_analyzed(client, tmp_path):
+    url = f"/ielts/session/{SESSION_ID}/turns/0/audio"
+    response = client.put(url, content=_wav(_pcm()))
+    assert response.status_code == 200
+    assert response.json()["features"]["duration_seconds"] == 2.0
+
+    response = client.put(f"/ielts/session/{SESSION_ID}/turns/1/audio?sample_rate=16000", content=_pcm(1.5))
+    assert response.status_code == 200 and response.json()["bytes"] == 48000
+    assert agent_orchestrator.active_sessions[SESSION_ID]["audio_features"][1]["duration_seconds"] == 1.5
+    assert _files(tmp_path) == [f"{SESSION_ID}/turn_0.wav", f"{SESSION_ID}/turn_1.pcm"]
+
+
+def test_invalid_uploads_are_rejected_and_removed(client, tmp_path):
+    url = f"/ielts/session/{SESSION_ID}/turns/0/audio"
+    assert client.put(f"{url}?sample_rate=0", content=_pcm()).status_code == 422
+    assert client.put(f"{url}?sample_rate=96000", content=_pcm()).status_code == 422
+
+    # A fmt chunk shorter than its 16 fixed bytes
+    header = b"RIFF" + struct.pack("<I", 28) + b"WAVE" + b"fmt " + struct.pack("<I", 8) + bytes(8)
+    response = client.put(url, content=header + b"data" + struct.pack("<I", 0))
+    assert response.status_code == 400 and "too short" in response.json()["detail"]
+
+    # Not a WAV file and no sample_rate for raw PCM
+    assert client.put(url, content=_pcm()).status_code == 400
+
+    response = client.put(url, content=bytes(1024 * 1024 + 1))
+    assert response.status_code == 413
+    assert _files(tmp_path) == []
+
+
+def test_unknown_session_is_404(client):
+    response = client.put("/ielts/session/missing-session/turns/0/audio", content=_wav(_pcm()))
+    assert response.status_code == 404
+
+
+def test_expired_recordings_are_purged(client, tmp_path):
+    client.put(f"/ielts/session/{SESSION_ID}/turns/0/audio", content=_wav(_pcm()))
+    assert purge_expired(max_age_seconds=3600) == 0
+    assert purge_expired(max_age_seconds=3600, now=time.time() + 7200) == 1
+    assert _files(tmp_path) == [] and os.listdir(tmp_path) == []
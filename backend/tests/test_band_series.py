@@ -0,0 +1,89 @@
+"""
+Tests for the packed band time series
+"""
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from app.db.database import Base
+from app.models import models
+from app.services.band_series import BandSeries, append_point_sync, load_series_sync
+from app.services.session_store import SessionStore
+
+START = datetime(2026, 9, 1, 10)
+
+
+def test_append_grows_and_packs_round_trip():
+    series = BandSeries()
+    for i in range(40):
+        series.append(START + timedelta(days=i), {"overall": 5 + i / 40, "fluency": 6.0})
+    assert len(series) == 40
+
+    packed = series.pack()
+    assert len(packed["timestamps"]) == 40 * 8 and len(packed["bands"]) == 40 * 5 * 4
+    restored = BandSeries.unpack(packed["timestamps"], packed["bands"])
+    assert np.array_equal(restored.timestamps, series.timestamps)
+    assert np.isnan(restored.bands[:, 2]).all()  # grammar never scored
+
+
+def test_trend_volatility_and_projection():
+    series = BandSeries()
+    # Overall climbs 0.5 per 30 days; fluency alternates around a flat line
+    for i in range(7):
+        series.append(START + timedelta(days=10 * i), {
+            "overall": 5.0 + i * 10 / 60, "fluency": 6.0 + (0.5 if i % 2 else -0.5)
+        })
+    trends = series.analyze(horizon_days=30)["series"]
+
+    assert trends["overall"]["trend_per_30_days"] == 0.5
+    assert trends["overall"]["volatility"] == 0.0
+    assert trends["overall"]["latest"] == 6.0 and trends["overall"]["projected"] == 6.5
+    assert abs(trends["fluency"]["trend_per_30_days"]) < 0.2
+    assert trends["fluency"]["volatility"] > 0.4
+    assert "grammar" not in trends
+
+
+def test_points_are_appended_to_bounded_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.band_series.settings.band_series_max_points", 3)
+    monkeypatch.setattr("app.services.band_series.settings.band_series_chunk_points", 2)
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    sessions = sessionmaker(bind=engine)
+
+    for i in range(7):
+        with sessions.begin() as db:
+            append_point_sync(db, 9, START + timedelta(days=i - 2), {"overall": 4.0 + i / 2})
+    with sessions() as db:
+        series = load_series_sync(db, 9)
+        chunks = db.scalars(select(models.BandSeriesChunk).order_by(models.BandSeriesChunk.chunk)).all()
+    # Appends never grow a chunk past its size; chunks no longer needed are deleted
+    assert [(c.chunk, c.points) for c in chunks] == [(1, 2), (2, 2), (3, 1)]
+    # Only the newest points are read back
+    assert series.bands[:, 0].tolist() == [6.0, 6.5, 7.0]
+
+    chart = SessionStore(sessions).band_chart(9, limit=2)
+    assert chart["series"]["overall"] == [6.5, 7.0]
+    assert chart["timestamps"][-1] == "2026-09-05T10:00:00"
+    assert chart["trends"]["series"]["overall"]["trend_per_30_days"] == 15.0
+
+
+def test_parts_are_kept_per_point_and_default_to_unknown(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    sessions = sessionmaker(bind=engine)
+
+    # A chunk written before parts were stored
+    legacy = BandSeries()
+    legacy.append(START, {"overall": 5.5})
+    packed = legacy.pack()
+    with sessions.begin() as db:
+        db.add(models.BandSeriesChunk(
+            user_id=9, chunk=0, points=1, timestamps=packed["timestamps"], bands=packed["bands"]
+        ))
+    with sessions.begin() as db:
+        append_point_sync(db, 9, START + timedelta(days=1), {"overall": 6.0}, part=2)
+        append_point_sync(db, 9, START + timedelta(days=2), {"overall": 6.5})
+    with sessions() as db:
+        series = load_series_sync(db, 9)
+    assert series.parts.tolist() == [0, 2, 0]
+    assert series.chart()["parts"] == [None, 2, None]
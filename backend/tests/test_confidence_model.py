@@ -0,0 +1,84 @@
+"""
+Tests for the distilled confidence classifier
+"""
+import json
+import numpy as np
+from app.core.config import settings
+from app.services import confidence_model
+from app.services.confidence_model import ConfidenceModel, FEATURES, load_log, log_example
+from app.services.agents.support_agents import ConfidenceAgent
+
+
+class CountingLLM:
+    def __init__(self, level="low"):
+        self.calls = 0
+        self.level = level
+
+    def generate_response(self, messages, temperature=0.7, max_tokens=2048):
+        self.calls += 1
+        return json.dumps({
+            "confidence_level": self.level,
+            "nervousness_indicators": ["Long pauses"],
+            "recommendations": ["Breathe"],
+            "breathing_exercise": "4-4-4",
+            "mindset_shift": "Relax"
+        })
+
+
+def _synthetic(n=300, seed=0):
+    """Confidence falls with long pauses and rises with speech ratio"""
+    rng = np.random.default_rng(seed)
+    X = np.full((n, len(FEATURES)), np.nan)
+    pauses = rng.uniform(0, 6, n)
+    ratio = rng.uniform(0.3, 0.95, n)
+    X[:, FEATURES.index("long_pause_count")] = pauses
+    X[:, FEATURES.index("speech_ratio")] = ratio
+    latent = 4 * ratio - 0.8 * pauses + rng.normal(0, 0.2, n)
+    y = np.digitize(latent, [-0.5, 1.5])
+    return X, y
+
+
+def test_ordinal_model_learns_and_round_trips(tmp_path):
+    X, y = _synthetic()
+    model = ConfidenceModel.fit(X, y)
+    assert (model.predict_proba(X).argmax(axis=1) == y).mean() > 0.85
+    assert np.allclose(model.predict_proba(X).sum(axis=1), 1.0)
+
+    path = str(tmp_path / "model.npz")
+    model.save(path)
+    loaded = ConfidenceModel.load(path)
+    assert np.allclose(loaded.predict_proba(X), model.predict_proba(X))
+
+    level, probability = model.predict({"audio": {"long_pause_count": 0, "speech_ratio": 0.9}})
+    assert level == "high" and probability > 0.7
+
+
+def test_log_round_trip(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    log_example({"audio": {"speech_ratio": 0.5}, "duration_seconds": 30, "pause_count": 6},
+                {"confidence_level": "low"}, path=path)
+    log_example({}, {"confidence_level": "unsure"}, path=path)
+    X, y = load_log(path)
+    assert X.shape == (1, len(FEATURES)) and y.tolist() == [0]
+    assert X[0, FEATURES.index("pauses_per_minute")] == 12.0
+
+
+def test_agent_uses_model_and_falls_back_to_llm(tmp_path, monkeypatch):
+    X, y = _synthetic()
+    monkeypatch.setattr(confidence_model, "_model", ConfidenceModel.fit(X, y))
+    monkeypatch.setattr(confidence_model, "_model_loaded", True)
+    monkeypatch.setattr(settings, "confidence_log_path", str(tmp_path / "log.jsonl"))
+    monkeypatch.setattr(settings, "confidence_llm_sample_rate", 0.0)
+
+    llm = CountingLLM()
+    agent = ConfidenceAgent(llm)
+
+    confident = agent.analyze_confidence({"audio": {"long_pause_count": 0, "speech_ratio": 0.9}})
+    assert confident["source"] == "model" and confident["confidence_level"] == "high"
+    assert llm.calls == 0
+
+    # Near a class boundary the LLM decides, and the answer is logged
+    uncertain = agent.analyze_confidence({"audio": {"long_pause_count": 3.6, "speech_ratio": 0.6}})
+    assert uncertain["source"] == "llm" and llm.calls == 1
+    X_log, y_log = load_log(settings.confidence_log_path)
+    assert y_log.tolist() == [0]
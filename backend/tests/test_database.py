@@ -0,0 +1,163 @@
+"""
+Tests for the async database layer and the routes running on it
+"""
+import asyncio
+import time
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from app.api.routes import router
+from app.db.database import (
+    Base, async_url, get_async_db, get_async_sessionmaker,
+    make_async_engine, make_async_sessionmaker, pool_status
+)
+from app.db.write_behind import WriteBehindQueue, get_write_behind
+from app.models import models
+from app.services.nvidia_service import nvidia_llm_service
+
+
+def make_app(tmp_path, **pool):
+    """Routes bound to a throwaway SQLite database"""
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    Base.metadata.create_all(bind=create_engine(url))
+    engine = make_async_engine(url, **pool)
+    sessions = make_async_sessionmaker(engine)
+
+    async def override():
+        async with sessions() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_async_db] = override
+    app.dependency_overrides[get_async_sessionmaker] = lambda: sessions
+    writes = WriteBehindQueue(sessions)
+    app.dependency_overrides[get_write_behind] = lambda: writes
+    return app, engine
+
+
+def test_async_url_switches_drivers():
+    assert async_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert async_url("postgres://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert async_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+
+
+def test_conversation_routes_run_on_the_async_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(nvidia_llm_service, "practice_conversation", lambda text, lang, level: "Hola!")
+    app, engine = make_app(tmp_path, pool_size=2, max_overflow=0)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            created = (await client.post(
+                "/conversations/", params={"user_id": 1}, json={"language": "Spanish"}
+            )).json()
+            assert created["messages"] == []
+
+            reply = await client.post(
+                f"/conversations/{created['id']}/messages", json={"content": "Hola"}
+            )
+            assert reply.json()["ai_response"] == "Hola!"
+
+            conversations = (await client.get(
+                "/users/1/conversations", params={"include_messages": True}
+            )).json()
+            assert [m["role"] for m in conversations[0]["messages"]] == ["user", "assistant"]
+            assert (await client.get("/conversations/999")).status_code == 404
+        await engine.dispose()
+
+    asyncio.run(scenario())
+    status = pool_status(engine)
+    assert status["checkouts"] >= 4 and status["timeouts"] == 0
+    assert status["checked_out"] == 0
+
+
+def test_llm_calls_do_not_hold_pooled_connections(tmp_path, monkeypatch):
+    def slow(result):
+        def call(*args):
+            time.sleep(0.3)
+            return result
+        return call
+
+    monkeypatch.setattr(nvidia_llm_service, "practice_conversation", slow("Sure."))
+    monkeypatch.setattr(nvidia_llm_service, "grammar_correction", slow(
+        {"original": "he go", "corrected": "he goes", "mistakes": []}
+    ))
+    monkeypatch.setattr(nvidia_llm_service, "generate_quiz", slow({"title": "Quiz", "questions": []}))
+    # One connection and a checkout timeout far shorter than a single LLM call
+    app, engine = make_app(tmp_path, pool_size=1, max_overflow=0, pool_timeout=0.2)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            conversation = (await client.post(
+                "/conversations/", params={"user_id": 1}, json={"language": "English"}
+            )).json()
+            requests = []
+            for i in range(4):
+                requests.append(client.post(
+                    f"/conversations/{conversation['id']}/messages", json={"content": f"message {i}"}
+                ))
+                requests.append(client.post("/grammar/correct", json={"text": "he go"}))
+                requests.append(client.post("/quiz/generate", json={"topic": "travel"}))
+            responses = await asyncio.gather(*requests)
+            assert [r.status_code for r in responses] == [200] * len(requests)
+
+            messages = (await client.get(f"/conversations/{conversation['id']}")).json()["messages"]
+            assert len(messages) == 8
+        await engine.dispose()
+
+    asyncio.run(scenario())
+    status = pool_status(engine)
+    assert status["timeouts"] == 0
+    assert status["wait_max_ms"] < 200
+
+
+def test_listings_page_with_keyset_cursors(tmp_path):
+    app, engine = make_app(tmp_path)
+
+    async def scenario():
+        async with make_async_sessionmaker(engine).begin() as db:
+            conversations = [models.Conversation(user_id=1, language="English", level="b1") for _ in range(5)]
+            db.add_all(conversations)
+            await db.flush()
+            db.add_all([
+                models.Message(conversation_id=conversations[0].id, role="user", content=f"m{i}")
+                for i in range(3)
+            ])
+            db.add_all([
+                models.VocabularyItem(user_id=1, word=f"w{i}", definition="", example="", language="English")
+                for i in range(3)
+            ])
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            seen, cursor = [], None
+            while True:
+                params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+                page = await client.get("/users/1/conversations", params=params)
+                assert all("messages" not in c for c in page.json())
+                seen += [c["id"] for c in page.json()]
+                cursor = page.headers.get("x-next-cursor")
+                if not cursor:
+                    break
+            assert seen == [5, 4, 3, 2, 1]
+
+            with_messages = (await client.get(
+                "/users/1/conversations", params={"include_messages": True}
+            )).json()
+            assert [len(c["messages"]) for c in with_messages] == [0, 0, 0, 0, 3]
+
+            first = await client.get("/conversations/1/messages", params={"limit": 2})
+            rest = await client.get(
+                "/conversations/1/messages", params={"cursor": first.headers["x-next-cursor"]}
+            )
+            assert [m["content"] for m in first.json() + rest.json()] == ["m0", "m1", "m2"]
+            assert "x-next-cursor" not in rest.headers
+
+            vocabulary = await client.get("/users/1/vocabulary", params={"limit": 2})
+            assert [v["word"] for v in vocabulary.json()] == ["w2", "w1"]
+            assert (await client.get("/users/1/vocabulary", params={"cursor": "bogus"})).status_code == 400
+        await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,67 @@
+"""
+Tests for the deterministic IELTS part/topic state machine
+"""
+import json
+from app.services.agents.exam_flow import ExamState, advance, PART1_TOPICS
+from app.services.agents.examiner_agent import ExaminerAgent, CLOSING_LINE
+from app.services.question_bank import QuestionBank
+
+
+class PromptRecordingLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def generate_response(self, messages, temperature=0.7, max_tokens=2048):
+        self.prompts.append(messages[0]["content"])
+        return json.dumps({"question": f"Question {len(self.prompts)}?"})
+
+
+def _run(durations_by_part):
+    """Drive a state to the end, answering with the given turn length per part"""
+    state = ExamState()
+    actions = []
+    while not state.finished and len(actions) < 50:
+        part = state.part
+        decision = advance(state, "answer", {"duration_seconds": durations_by_part[part]})
+        actions.append((part, decision["action"]))
+    return state, actions
+
+
+def test_full_test_progression_is_deterministic():
+    state, actions = _run({1: 20, 2: 120, 3: 40})
+    assert actions == _run({1: 20, 2: 120, 3: 40})[1]
+
+    part1 = [a for p, a in actions if p == 1]
+    # 25 s per turn: Part 1 ends after the topic that crosses 4 minutes
+    assert part1.count("new_topic") == 3 and part1[-1] == "transition"
+    assert len(part1) == 12
+    assert [a for p, a in actions if p == 2] == ["transition"]
+    assert actions[-1] == (3, "finish")
+    assert 240 <= state.part_elapsed_seconds <= 300 + 45
+    assert state.topics_covered[:4] == PART1_TOPICS[:4]
+
+
+def test_part1_time_limit_and_missing_durations():
+    state = ExamState()
+    decision = advance(state, "word " * 800, {})  # ~320 s estimated from word count
+    assert decision["action"] == "transition" and state.part == 2
+    assert state.part2_topic and state.topic == state.part2_topic
+
+
+def test_examiner_only_asks_llm_for_question_text():
+    llm = PromptRecordingLLM()
+    examiner = ExaminerAgent(llm, question_bank=QuestionBank([]))
+    state = ExamState()
+    examiner.start_session({"name": "A"}, state)
+
+    result = examiner.process_response("I am a student. " * 50, {"duration_seconds": 30}, state)
+    assert result["action"] == "follow_up" and result["part"] == 1
+    assert "Return JSON" in llm.prompts[-1]
+    assert len(llm.prompts[-1]) < 800
+    assert "..." in llm.prompts[-1]  # long answers are clipped
+
+    state.part, state.topic_turns, state.part_elapsed_seconds = 3, 0, 299
+    calls = len(llm.prompts)
+    result = examiner.process_response("Fine.", {"duration_seconds": 5}, state)
+    assert result["finished"] and result["question"] == CLOSING_LINE
+    assert len(llm.prompts) == calls
@@ -0,0 +1,58 @@
+"""
+Tests for the memory-mapped frequency/CEFR lexicon
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.routes import router
+from app.services.lexicon import Lexicon, build_index, get_lexicon, tag_vocabulary, LEXICON_DIR
+
+
+def test_build_and_lookup(tmp_path):
+    build_index(LEXICON_DIR, out_dir=str(tmp_path))
+    lexicon = Lexicon(str(tmp_path))
+    assert lexicon.lookup("the") == {"word": "the", "rank": 1, "cefr": "A1"}
+    assert lexicon.lookup("ubiquitous")["cefr"] == "C1"
+    assert lexicon.lookup("cities")["cefr"] == "A1"  # via lemma "city"
+    assert lexicon.lookup("qwertyuiop")["rank"] is None
+    assert lexicon.is_collocation("heavy", "traffic")
+
+
+def test_profile_finds_sophistication_and_collocations():
+    profile = get_lexicon().profile(
+        "I made a decision to visit the bustling city, although the heavy traffic was ubiquitous."
+    )
+    assert "make decision" in profile["collocations"]
+    assert "heavy traffic" in profile["collocations"]
+    assert profile["sophisticated_words"][0] == "ubiquitous"
+    assert abs(sum(profile["cefr_distribution"].values()) + profile["off_list_share"] - 1) < 0.01
+
+
+def test_tag_vocabulary_filters_by_level():
+    words = [{"word": "house"}, {"word": "ubiquitous"}, {"word": "substantial"}]
+    tagged = tag_vocabulary(words, min_level="B2", max_level="B2")
+    assert [w["word"] for w in tagged] == ["substantial"]
+    assert tagged[0]["cefr_level"] == "B2"
+
+
+def test_generated_vocabulary_is_topped_up_to_count(monkeypatch):
+    rounds = [["house", "substantial", "ubiquitous", "considerable"], ["crucial", "house", "vital"]]
+    calls = []
+
+    def builder(topic, language, count, band, exclude):
+        calls.append((count, band, exclude))
+        return [{"word": w, "definition": "d", "example": "e"} for w in rounds[min(len(calls), 2) - 1]]
+
+    monkeypatch.setattr("app.api.routes.nvidia_llm_service.vocabulary_builder", builder)
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    request = {"topic": "cities", "count": 3, "min_level": "B2", "max_level": "B2"}
+    words = client.post("/vocabulary/generate", json=request).json()
+    assert [w["word"] for w in words] == ["substantial", "considerable", "crucial"]
+    # The band is in the prompt, each round over-generates and skips chosen words
+    assert calls == [(6, "B2", []), (2, "B2", ["substantial", "considerable"])]
+
+    calls.clear()
+    words = client.post("/vocabulary/generate", json={**request, "count": 1}).json()
+    assert len(words) == 1 and len(calls) == 1
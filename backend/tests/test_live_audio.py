@@ -0,0 +1,106 @@
+"""
+Tests for live fluency tracking over streamed PCM
+"""
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from app.api.ielts_routes import router
+from app.services.agent_orchestrator import agent_orchestrator
+from app.services.live_audio import LiveFluencyTracker
+
+SAMPLE_RATE = 16000
+
+
+def _syllables(seconds, f0=150):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    envelope = 0.5 * (1 - np.cos(2 * np.pi * 4 * t))
+    return 0.3 * envelope * np.sin(2 * np.pi * f0 * t)
+
+
+def _silence(seconds, rng):
+    return 0.001 * rng.standard_normal(int(SAMPLE_RATE * seconds))
+
+
+def _pcm(signal):
+    return (signal * 32767).astype("<i2").tobytes()
+
+
+def _speech():
+    rng = np.random.default_rng(0)
+    return np.concatenate([
+        _silence(0.5, rng), _syllables(2), _silence(0.6, rng),
+        _syllables(1.5), _silence(1.5, rng), _syllables(2), _silence(0.3, rng),
+    ])
+
+
+def test_tracker_matches_offline_statistics():
+    tracker = LiveFluencyTracker(SAMPLE_RATE)
+    pcm = _pcm(_speech())
+    # Uneven chunk sizes: frames straddle chunk boundaries
+    for start in range(0, len(pcm), 1234):
+        tracker.feed(pcm[start:start + 1234])
+
+    stats = tracker.snapshot()
+    assert stats["duration_seconds"] == 8.4
+    assert stats["pause_count"] == 2
+    assert stats["long_pause_count"] == 1
+    assert abs(stats["speech_seconds"] - 5.5) < 0.2
+    assert 3.5 < stats["articulation_rate"] < 4.5
+
+
+def test_long_silence_indicator_depends_on_part():
+    rng = np.random.default_rng(1)
+    signal = np.concatenate([_silence(0.5, rng), _syllables(1), _silence(5, rng)])
+    part2 = LiveFluencyTracker(SAMPLE_RATE, part=2)
+    part1 = LiveFluencyTracker(SAMPLE_RATE, part=1)
+    for tracker in (part2, part1):
+        tracker.feed(_pcm(signal))
+    assert part2.indicators()["long_silence"] is True
+    assert part1.indicators()["long_silence"] is False
+    assert part2.indicators()["recent_speech_ratio"] < 0.2
+
+    part2.set_transcript("I would like to talk about my grandmother")
+    assert part2.words_per_minute() == round(8 / 6.5 * 60, 1)
+
+
+def test_websocket_hands_stats_to_the_next_turn():
+    session_id = "live-test"
+    agent_orchestrator.active_sessions[session_id] = {"exchanges": [], "live_stats": {}}
+    app = FastAPI()
+    app.include_router(router)
+
+    try:
+        with TestClient(app).websocket_connect(f"/ielts/session/{session_id}/live?part=2") as ws:
+            pcm = _pcm(_speech())
+            for start in range(0, len(pcm), 3200):
+                ws.send_bytes(pcm[start:start + 3200])
+            assert ws.receive_json()["type"] == "indicators"
+
+            ws.send_json({"type": "end_turn"})
+            message = ws.receive_json()
+            while message["type"] == "indicators":
+                message = ws.receive_json()
+            assert message["type"] == "turn_stats"
+            assert message["turn_index"] == 0
+
+        session = agent_orchestrator.active_sessions[session_id]
+        metadata = agent_orchestrator._with_turn_signals(session, 0, "one two three", {})
+        assert metadata["live"]["pause_count"] == 2
+        assert metadata["duration_seconds"] == 8.4
+    finally:
+        del agent_orchestrator.active_sessions[session_id]
+
+
+def test_out_of_range_sample_rates_are_rejected():
+    with pytest.raises(ValueError):
+        LiveFluencyTracker(sample_rate=0)
+
+    app = FastAPI()
+    app.include_router(router)
+    for rate in (0, 96000):
+        with TestClient(app).websocket_connect(f"/ielts/session/any/live?sample_rate={rate}") as ws:
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+        assert closed.value.code == 4400
@@ -0,0 +1,85 @@
+"""
+Tests for the MinHash/LSH near-duplicate index
+"""
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.routes import router
+from app.services.agents.exam_flow import ExamState
+from app.services.agents.examiner_agent import ExaminerAgent
+from app.services.near_duplicates import NearDuplicateIndex, signature, similarity
+from app.services.question_bank import QuestionBank
+
+
+class RepeatingLLM:
+    """Returns the same question until told what not to repeat"""
+    def __init__(self):
+        self.prompts = []
+
+    def generate_response(self, messages, temperature=0.7, max_tokens=2048):
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        if "Do not repeat" in prompt:
+            return json.dumps({"question": "Which technology could you not live without?"})
+        return json.dumps({"question": "Why do you think people like to travel?"})
+
+
+def test_signatures_estimate_similarity():
+    a = signature("Describe a memorable event in your life.")
+    b = signature("Describe a memorable event from your life")
+    c = signature("What kind of music do you listen to?")
+    assert similarity(a, b) > 0.5
+    assert similarity(a, c) < 0.2
+
+
+def test_index_dedupes_and_persists_incrementally(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path))
+    assert index.add_if_novel("Describe a memorable event in your life.", "cue_card")
+    assert not index.add_if_novel("Describe a memorable event from your life", "cue_card")
+    assert index.add_if_novel("Describe a memorable event in your life.", "question")  # other kind
+    assert index.add_if_novel("What do you like about your hometown?", "question")
+    index.record_seen(1, "Where is your hometown?", "question")
+
+    reloaded = NearDuplicateIndex(str(tmp_path))
+    assert len(reloaded) == 4
+    assert reloaded.is_duplicate("Describe a memorable event in my life", "cue_card")
+    assert not reloaded.is_novel_for_user(1, "Where's your hometown?", "question")
+    assert reloaded.is_novel_for_user(1, "What do you like about your hometown?", "question")
+    assert reloaded.is_novel_for_user(2, "Where is your hometown?", "question")
+
+    # A torn append is ignored on the next load
+    with open(tmp_path / "signatures.u32", "ab") as f:
+        f.write(b"\x00" * 10)
+    assert len(NearDuplicateIndex(str(tmp_path))) == 4
+
+
+def test_examiner_regenerates_questions_the_learner_has_seen():
+    index = NearDuplicateIndex()
+    index.record_seen(5, "Why do you think people like to travel so much?", "question")
+    llm = RepeatingLLM()
+    examiner = ExaminerAgent(llm, question_bank=QuestionBank([]), dedup_index=index)
+
+    state = ExamState(user_id=5, part=3, topic="a memorable trip (theme 1)", part2_topic="a memorable trip")
+    question = examiner.question_for(state, "follow_up", "I like travelling because it is fun.")
+    assert question == "Which technology could you not live without?"
+    assert len(llm.prompts) == 2
+
+
+def test_generated_vocabulary_skips_near_repeats_within_a_batch(monkeypatch):
+    def entry(word):
+        return {"word": word, "definition": "d", "example": "e"}
+
+    batch = [entry("environment"), entry("environmental"), entry(""), entry("  "), entry("pollution")]
+    index = NearDuplicateIndex()
+    monkeypatch.setattr("app.api.routes.get_near_duplicate_index", lambda: index)
+    monkeypatch.setattr("app.api.routes.nvidia_llm_service.vocabulary_builder", lambda *args: list(batch))
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    request = {"topic": "nature", "language": "French", "user_id": 4}
+    words = client.post("/vocabulary/generate", json=request).json()
+    assert [w["word"] for w in words] == ["environment", "pollution"]
+    # Blank words never reach the index
+    assert len(index) == 2
+    assert client.post("/vocabulary/generate", json=request).json() == []
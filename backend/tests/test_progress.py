@@ -0,0 +1,153 @@
+"""
+Tests for incremental progress aggregates
+"""
+import asyncio
+from datetime import datetime
+import httpx
+from fastapi import FastAPI
+import pytest
+from sqlalchemy import create_engine, event as sa_event, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from app.api.dynamic_routes import router
+from app.db.database import Base, get_async_db, make_async_engine, make_async_sessionmaker
+from app.models import models
+from app.services.progress import (
+    ProgressEvent, _insert_row, apply_event, new_progress, progress_summary, record_event_sync
+)
+from app.services.session_store import SessionStore
+
+
+def event(activity_type, day, **fields):
+    return ProgressEvent(user_id=1, activity_type=activity_type, occurred_at=datetime(2026, 10, day, 9), **fields)
+
+
+def test_events_update_counters_streaks_and_averages():
+    progress = new_progress(1, "English")
+    apply_event(progress, event("part1", 1, score=6.0, duration_minutes=15))
+    apply_event(progress, event("part2", 2, score=7.0, duration_minutes=15))
+    apply_event(progress, event("quiz", 2, score=80))
+    apply_event(progress, event("quiz", 3, score=60))
+    apply_event(progress, event("mock_test", 6, score=6.5, duration_minutes=30, target_band=7.5))
+
+    assert progress.activity_counts == {"part1": 1, "part2": 1, "quiz": 2, "mock_test": 1}
+    assert progress.total_practice_sessions == 3
+    assert progress.total_minutes == 60
+    assert progress.total_quizzes == 2 and progress.quiz_score_avg == 70
+    assert progress.band_avg == 6.5 and progress.latest_band == 6.5
+    # Rolling average weighs recent bands more: 6.0 -> 6.3 -> 6.36
+    assert round(progress.band_ema, 2) == 6.36
+    # Days 1-3 in a row, then a gap
+    assert progress.longest_streak == 3 and progress.streak_days == 1
+
+    summary = progress_summary(1, progress, today=datetime(2026, 10, 7))
+    assert summary["stats"]["current_streak"] == 1
+    assert summary["stats"]["total_hours"] == 1.0
+    assert summary["stats"]["completed_activities"]["mock_tests"] == 1
+    assert summary["target_band"] == 7.5 and summary["progress_percentage"] == 85
+    # The streak lapses once a day is missed
+    assert progress_summary(1, progress, today=datetime(2026, 10, 9))["stats"]["current_streak"] == 0
+
+
+def test_late_events_do_not_reset_the_streak():
+    progress = new_progress(1, "English")
+    for day in (1, 2, 3):
+        apply_event(progress, event("vocabulary", day))
+    apply_event(progress, event("vocabulary", 1))
+    assert progress.streak_days == 3 and progress.total_vocabulary == 4
+    assert progress.last_activity.day == 3
+
+
+def test_progress_endpoints_read_one_row(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    Base.metadata.create_all(bind=create_engine(url))
+    sessions = make_async_sessionmaker(make_async_engine(url, pool_size=1, max_overflow=0))
+
+    async def override():
+        async with sessions() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_async_db] = override
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            empty = (await client.get("/progress/5")).json()
+            assert empty["stats"]["total_practice_sessions"] == 0 and empty["current_band"] is None
+
+            for part, band in ((1, 6.0), (3, 6.0)):
+                response = await client.post("/progress/update", json={
+                    "user_id": 5, "activity_type": "practice", "part": part,
+                    "score": band, "duration": 30, "target_band": 7.5
+                })
+                assert response.json()["activity_type"] == f"part{part}"
+
+            progress = (await client.get("/progress/5")).json()
+            assert progress["current_band"] == 6.0 and progress["progress_percentage"] == 80
+            assert progress["stats"]["total_practice_sessions"] == 2
+            assert progress["stats"]["total_hours"] == 1.0
+            assert progress["stats"]["current_streak"] == 1
+            assert progress["stats"]["completed_activities"]["part3"] == 1
+            # Dashboard keys come from the band series and the aggregates
+            assert [(score["part"], score["band"]) for score in progress["recent_scores"]] == [(1, 6.0), (3, 6.0)]
+            assert progress["recommendations"] == ["Practice more Part 2 questions"]
+
+            async with sessions() as db:
+                assert await db.scalar(select(func.count()).select_from(models.UserProgress)) == 1
+
+    asyncio.run(scenario())
+
+
+def test_finished_sessions_update_progress(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    store = SessionStore(sessionmaker(bind=engine))
+    session = {"user_id": 3, "type": "mock", "exchanges": []}
+    digest = {"parts": {"1": {"turns": 4, "seconds": 240.0}, "2": {"turns": 1, "seconds": 120.0}}}
+
+    assert store.record_progress(session, {"overall_band": "6.5", "fluency_band": "6.0"}, digest)
+    with store.sessions() as db:
+        progress = db.scalar(select(models.UserProgress).where(models.UserProgress.user_id == 3))
+        assert progress.activity_counts == {"mock_test": 1}
+        assert progress.total_minutes == 6 and progress.latest_band == 6.5
+    # The band time series gets the session's point
+    assert store.band_chart(3)["series"]["fluency"] == [6.0]
+
+
+def test_racing_first_events_share_one_row(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    sa_event.listen(engine, "connect", lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(bind=engine)
+    sessions = sessionmaker(bind=engine)
+    with sessions.begin() as db:
+        db.add(models.User(id=1, email="a@example.com", username="a"))
+
+    # The loser of the race finds the row already inserted: its INSERT is a no-op
+    with sessions.begin() as db:
+        db.execute(_insert_row("sqlite", 1, "English"))
+    with sessions.begin() as db:
+        db.execute(_insert_row("sqlite", 1, "English"))
+        record_event_sync(db, event("vocabulary", 1))
+    with sessions() as db:
+        progress = db.scalars(select(models.UserProgress)).all()
+        assert len(progress) == 1 and progress[0].total_vocabulary == 1
+
+    # Unknown users still fail on the foreign key
+    with pytest.raises(IntegrityError):
+        with sessions.begin() as db:
+            record_event_sync(db, ProgressEvent(user_id=2, activity_type="quiz", score=50))
+
+
+def test_band_point_survives_a_missing_users_row(tmp_path):
+    # IELTS learners may have no users row; Postgres enforces the progress FK
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    sa_event.listen(engine, "connect", lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(bind=engine)
+    store = SessionStore(sessionmaker(bind=engine))
+    session = {"user_id": 42, "type": "practice", "exchanges": []}
+
+    assert not store.record_progress(session, {"overall_band": "6.0", "grammar_band": "5.5"})
+    chart = store.band_chart(42)
+    assert chart["series"]["overall"] == [6.0] and chart["series"]["grammar"] == [5.5]
@@ -0,0 +1,87 @@
+"""
+Tests for the pre-generated question bank
+"""
+import json
+from app.services.agents.exam_flow import ExamState, PART1_TOPICS, PART2_TOPICS
+from app.services.agents.examiner_agent import ExaminerAgent
+from app.services.near_duplicates import NearDuplicateIndex
+from app.services.question_bank import (
+    QuestionBank, difficulty_for_band, load_items, validate_item
+)
+
+
+class FailingLLM:
+    def generate_response(self, messages, temperature=0.7, max_tokens=2048):
+        raise AssertionError("the bank should have served this question")
+
+
+def test_seed_bank_is_valid_and_covers_the_exam_topics():
+    items = load_items()
+    assert all(not validate_item(item) for item in items)
+    assert len({item["id"] for item in items}) == len(items)
+
+    bank = QuestionBank(items)
+    assert set(PART1_TOPICS) <= set(bank.topics(1))
+    assert set(PART2_TOPICS) <= set(bank.topics(2))
+    assert set(PART2_TOPICS) <= set(bank.topics(3))
+
+
+def test_draws_skip_seen_items_per_user():
+    bank = QuestionBank(load_items())
+    drawn = [bank.draw(1, "food", "foundation", user_id=1)["id"] for _ in range(6)]
+    # Foundation items first, then the nearest difficulties, no repeats
+    assert len(set(drawn)) == 6
+    assert all("-f" in item_id for item_id in drawn[:2])
+    # The whole topic has been seen: start over instead of failing
+    assert bank.draw(1, "food", "foundation", user_id=1) is not None
+
+    # Another learner has their own history
+    assert bank.draw(1, "food", "foundation", user_id=2)["id"] == drawn[0]
+
+    bank.mark_seen(3, [drawn[0]])
+    assert bank.draw(1, "food", "foundation", user_id=3)["id"] == drawn[1]
+
+    assert bank.draw(1, "unknown topic") is None
+    assert difficulty_for_band("7.5") == "advanced" and difficulty_for_band(None) == "intermediate"
+
+
+def test_seen_items_survive_restarts_and_are_shared_by_workers(tmp_path):
+    path = str(tmp_path / "seen.jsonl")
+    worker_a = QuestionBank(load_items(), seen_path=path)
+    worker_b = QuestionBank(load_items(), seen_path=path)
+    first = worker_a.draw(1, "food", "foundation", user_id=1)["id"]
+    # The other worker skips what this learner saw on the first one
+    second = worker_b.draw(1, "food", "foundation", user_id=1)["id"]
+    assert second != first
+
+    restarted = QuestionBank(load_items(), seen_path=path)
+    assert restarted.seen[1] == {first, second}
+    drawn = [restarted.draw(1, "food", "foundation", user_id=1)["id"] for _ in range(4)]
+    assert not {first, second} & set(drawn)
+
+    # Starting a topic over is persisted too
+    restarted.draw(1, "food", "foundation", user_id=1)
+    assert len(QuestionBank(load_items(), seen_path=path).seen[1]) == 1
+
+
+def test_examiner_serves_scripted_questions_without_llm():
+    examiner = ExaminerAgent(
+        FailingLLM(), question_bank=QuestionBank(load_items()), dedup_index=NearDuplicateIndex()
+    )
+    state = ExamState(user_id=7, difficulty="advanced", part2_topic="a book you enjoyed")
+    opening = examiner.start_session({}, state)
+    assert opening["question"].endswith("?")
+
+    # Part 1 follow-ups and the cue card come from the bank
+    assert examiner.process_response("answer", {"duration_seconds": 20}, state)["question"].endswith("?")
+    state.part_elapsed_seconds = 300
+    cue = examiner.process_response("answer", {"duration_seconds": 20}, state)
+    assert cue["part"] == 2 and "Describe" in cue["question"]
+    assert examiner.process_response("answer", {"duration_seconds": 110}, state)["part"] == 3
+
+    # Part 3 follow-ups are adaptive and still go to the LLM
+    assert examiner.uses_llm(state, "follow_up")
+    assert not examiner.uses_llm(state, "new_topic")
+
+    card = examiner.generate_cue_card({"user_id": 7, "current_band": 5})
+    assert card["topic"].startswith("Describe") and len(card["points"]) >= 3
@@ -0,0 +1,165 @@
+"""
+Tests for IELTS score aggregation and scoring modes
+No API key needed: the LLM service is replaced by a stub
+"""
+import json
+from app.core.config import settings
+from app.services.agents.score_aggregation import (
+    parse_band, round_band, merge_analyses, merge_criterion_analyses, segment_transcript
+)
+from app.services.agents.scoring_agent import ScoringOrchestratorAgent
+
+
+class StubLLMService:
+    """Returns canned JSON and records every prompt it receives"""
+
+    def __init__(self, response="not json"):
+        self.response = response
+        self.prompts = []
+
+    def generate_response(self, messages, temperature=1.0, max_tokens=4096):
+        self.prompts.append(messages[-1]["content"])
+        return self.response
+
+
+def test_round_band_follows_ielts_rules():
+    """x.25 rounds up to x.5 and x.75 rounds up to the next band"""
+    assert round_band(6.125) == 6.0
+    assert round_band(6.25) == 6.5
+    assert round_band(6.6) == 6.5
+    assert round_band(6.75) == 7.0
+
+
+def test_parse_band_handles_llm_formats():
+    assert parse_band("6.5") == 6.5
+    assert parse_band(7) == 7.0
+    assert parse_band("6.0-7.0") == 6.5
+    assert parse_band("n/a") == 6.0
+
+
+def test_merge_analyses_is_weighted_and_deterministic():
+    first = {
+        "band_estimate": "6.0",
+        "errors": [{"error": "he go", "correction": "he goes", "explanation": "agreement"}],
+        "repetitions": [{"word": "Good", "count": 2, "alternatives": ["great"]}],
+        "hesitation_count": 3,
+        "coherence": "fair",
+    }
+    second = {
+        "band_estimate": "7.0",
+        "errors": [{"error": "he go", "correction": "he goes", "explanation": "again"}],
+        "repetitions": [{"word": "good", "count": 3, "alternatives": ["fine"]}],
+        "hesitation_count": 1,
+        "coherence": "good",
+    }
+    merged = merge_analyses([first, second], [10, 30])
+    assert merged["band_estimate"] == "7.0"  # 6.75 rounds up
+    assert len(merged["errors"]) == 1
+    assert merged["repetitions"] == [{"word": "good", "count": 5, "alternatives": ["great", "fine"]}]
+    assert merged["hesitation_count"] == 4
+    assert merged["coherence"] == "good"
+    assert merge_analyses([first, second], [10, 30]) == merged
+
+
+def test_score_turns_makes_a_single_llm_call():
+    llm = StubLLMService()
+    scorer = ScoringOrchestratorAgent(llm)
+    turn = {
+        "fluency": {"band_estimate": "6.0"},
+        "grammar": {"band_estimate": "6.5"},
+        "vocabulary": {"band_estimate": "6.0"},
+        "pronunciation": {"band_estimate": "7.0"},
+    }
+    score = scorer.score_turns([turn, turn], [20, 40])
+    assert len(llm.prompts) == 1
+    assert score["overall_band"] == "6.5"
+    assert score["turns_scored"] == 2
+    assert set(score["detailed_analyses"]) == {"fluency", "grammar", "vocabulary", "pronunciation"}
+    assert merge_criterion_analyses([turn, turn])["grammar"]["band_estimate"] == "6.5"
+
+
+def test_segment_transcript_respects_boundaries():
+    transcript = "One two three. Four five six seven.\nEight nine ten eleven twelve thirteen"
+    segments = segment_transcript(transcript, max_words=4)
+    assert segments == ["One two three.", "Four five six seven.", "Eight nine ten eleven", "twelve thirteen"]
+    assert all(len(s.split()) <= 4 for s in segments)
+
+
+def test_long_transcript_is_scored_per_segment(monkeypatch):
+    monkeypatch.setattr(settings, "scoring_segment_words", 5)
+    llm = StubLLMService()
+    scorer = ScoringOrchestratorAgent(llm)
+    analyses = scorer.analyze_criteria("a b c d e. f g h i j. k l", {})
+    # 3 segments x 3 mapped criteria + 1 pronunciation call
+    assert len(llm.prompts) == 10
+    assert analyses["grammar"]["band_estimate"] == "6.0"
+
+
+def test_segments_get_their_share_of_the_recording(monkeypatch):
+    monkeypatch.setattr(settings, "scoring_segment_words", 5)
+    llm = StubLLMService()
+    metadata = {
+        "duration_seconds": 120,
+        "audio": {"pause_count": 12, "max_pause_seconds": 3.0, "speech_ratio": 0.8}
+    }
+    ScoringOrchestratorAgent(llm).analyze_criteria("a b c d e. f g h i j. k l", metadata)
+
+    fluency = [p for p in llm.prompts if "segment_word_share" in p]
+    durations = sorted(json.loads(p.split("Metadata: ", 1)[1].split("\n\n", 1)[0])["duration_seconds"] for p in fluency)
+    # 5 + 5 + 2 words of a 120 s recording
+    assert durations == [20.0, 50.0, 50.0]
+    assert all('"max_pause_seconds"' not in p and '"speech_ratio": 0.8' in p for p in fluency)
+    # Pronunciation runs once, on the recording-wide audio features
+    assert sum('"max_pause_seconds": 3.0' in p for p in llm.prompts) == 1
+
+
+def test_fused_mode_keeps_output_shape():
+    fused = {c: {"band_estimate": "7.0"} for c in ("fluency", "grammar", "vocabulary", "pronunciation")}
+    fused["overall"] = {"detailed_feedback": "Good"}
+    llm = StubLLMService(json.dumps(fused))
+    scorer = ScoringOrchestratorAgent(llm)
+    score = scorer.score_response("Short Part 1 answer.", {}, mode="auto")
+    assert len(llm.prompts) == 1
+    assert score["scoring_mode"] == "fused"
+    assert score["overall_band"] == "7.0"
+    assert score["grammar_band"] == "7.0"
+    assert set(score["detailed_analyses"]) == {"fluency", "grammar", "vocabulary", "pronunciation"}
+
+
+def test_fused_mode_falls_back_to_multi_agent():
+    llm = StubLLMService()
+    score = ScoringOrchestratorAgent(llm).score_response("Short answer.", {}, mode="fused")
+    assert score["scoring_mode"] == "multi_agent"
+    assert len(llm.prompts) == 6
+
+
+def test_local_validator_fixes_overall_band_without_llm(monkeypatch):
+    monkeypatch.setattr(settings, "qa_llm_sample_rate", 0.0)
+    llm = StubLLMService()
+    score = {
+        "fluency_band": "6.0", "grammar_band": "6.5",
+        "vocabulary_band": "6.0", "pronunciation_band": "6.5",
+        "overall_band": "6.0",  # mean 6.25 rounds up to 6.5
+        "strengths": ["Clear"], "weaknesses": ["Pauses"], "priority_improvements": [],
+        "detailed_feedback": "Solid answer", "confidence": "0.8",
+    }
+    validation = ScoringOrchestratorAgent(llm).validate_score(score)
+    assert llm.prompts == []
+    assert validation["valid"] is False
+    assert validation["corrections"] == {"overall_band": "6.5"}
+
+
+def test_local_validator_escalates_inconsistent_scores(monkeypatch):
+    monkeypatch.setattr(settings, "qa_llm_sample_rate", 0.0)
+    llm = StubLLMService()
+    score = {
+        "fluency_band": "8.0", "grammar_band": "8.0",
+        "vocabulary_band": "8.0", "pronunciation_band": "8.0", "overall_band": "8.0",
+        "strengths": ["Fluent"], "weaknesses": [], "priority_improvements": [],
+        "detailed_feedback": "Excellent", "confidence": "0.9",
+        "detailed_analyses": {"grammar": {"band_estimate": "5.5"}},
+    }
+    validation = ScoringOrchestratorAgent(llm).validate_score(score)
+    assert len(llm.prompts) == 1
+    assert validation["source"] == "llm"
+    assert validation["review_reasons"] == ["grammar_band disagrees with the grammar agent"]
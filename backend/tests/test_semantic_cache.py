@@ -0,0 +1,82 @@
+"""
+Tests for the local semantic cache
+"""
+import json
+from app.services.agents.support_agents import ContentAgent
+from app.services.semantic_cache import SemanticCache
+
+
+class CountingLLM:
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def generate_response(self, messages, temperature=0.7, max_tokens=2048):
+        self.calls += 1
+        return self.response
+
+
+def test_near_matches_hit_and_unrelated_topics_miss():
+    cache = SemanticCache(max_entries=10, threshold=0.7)
+    cache.put("Technology in education", {"id": 1}, "ideas")
+    cache.put("Protecting the environment", {"id": 2}, "ideas")
+    cache.put("Living in a big city", {"id": 3}, "ideas")
+
+    assert cache.get("technology in education?", "ideas") == {"id": 1}
+    assert cache.get("Education and technology", "ideas") == {"id": 1}
+    assert cache.get("Your favourite food", "ideas") is None
+    assert cache.get("Technology in education", "other") is None  # namespaces are separate
+
+    keys = [key for key, _ in cache.search("environmental protection", "ideas", k=2)]
+    assert keys[0] == "Protecting the environment"
+
+    metrics = cache.metrics()
+    assert metrics["hits"] == 2 and metrics["misses"] == 2 and metrics["hit_rate"] == 0.5
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticCache(max_entries=2, threshold=0.9)
+    cache.put("Working from home", "a")
+    cache.put("Learning a foreign language", "b")
+    assert cache.get("working from home") == "a"  # b is now least recently used
+
+    cache.put("Social media and teenagers", "c")
+    assert len(cache) == 2 and cache.metrics()["evictions"] == 1
+    assert cache.get("Learning a foreign language") is None
+    assert cache.get("Working from home") == "a"
+    assert cache.get("social media and teenagers") == "c"
+
+
+def test_expired_entries_are_evicted_first_and_zero_ttl_never_expires():
+    cache = SemanticCache(max_entries=2, threshold=0.9, ttl_seconds=60)
+    cache.put("Working from home", "a")
+    cache.put("Learning a foreign language", "b")
+    cache.created[0] -= 120  # a has expired
+    cache.last_used[1] -= 10  # b is least recently used
+
+    cache.put("Social media and teenagers", "c")
+    assert cache.keys == ["Social media and teenagers", "Learning a foreign language"]
+    assert cache.get("learning a foreign language") == "b"
+
+    cache = SemanticCache(max_entries=2, threshold=0.9, ttl_seconds=0)
+    assert cache.ttl_seconds is None
+    cache.put("Working from home", "a")
+    cache.created[0] -= 10 ** 6
+    assert cache.get("working from home") == "a"
+
+
+def test_content_agent_reuses_ideas_for_similar_topics():
+    ideas = {"main_ideas": ["access"], "examples": [], "contrasts": [], "structure": "flow"}
+    llm = CountingLLM(json.dumps(ideas))
+    agent = ContentAgent(llm, cache=SemanticCache(max_entries=10))
+
+    assert agent.generate_ideas("The role of technology in education") == ideas
+    assert agent.generate_ideas("the role of technology in education.") == ideas
+    assert llm.calls == 1
+    agent.generate_ideas("The role of technology in education", "problem_solution")
+    assert llm.calls == 2
+
+    # Fallback ideas are not cached
+    failing = ContentAgent(CountingLLM("not json"), cache=SemanticCache(max_entries=10))
+    failing.generate_ideas("Tourism")
+    assert len(failing.cache) == 0
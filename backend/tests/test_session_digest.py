@@ -0,0 +1,98 @@
+"""
+Tests for per-session digests
+"""
+import json
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.database import Base
+from app.services.agents.exam_flow import ExamState
+from app.services.agents.support_agents import ReflectionAgent
+from app.services.session_digest import MAX_TEXT, build_digest
+from app.services.session_store import SessionStore
+
+
+def make_session(user_id=3, started_at="2026-10-18T10:00:00"):
+    answers = [
+        ("I really like my job because my job is interesting and my job pays well.", 1, 20),
+        ("My job is in a bank, um, I like the people.", 2, 15),
+        ("Describe... I read a book about my job last year.", 2, 110),
+        ("Books are important because books teach people.", 3, 30),
+    ]
+    return {
+        "user_id": user_id, "type": "mock", "started_at": started_at,
+        "exam": ExamState(user_id=user_id).dict(),
+        "exchanges": [
+            {
+                "user_response": text,
+                "metadata": {"duration_seconds": seconds},
+                "examiner_response": {"question": "?", "part": next_part}
+            }
+            for text, next_part, seconds in answers
+        ]
+    }
+
+
+SCORE = {
+    "overall_band": "6.0", "fluency_band": "6.0", "grammar_band": "5.5",
+    "vocabulary_band": "6.0", "pronunciation_band": "6.5",
+    "priority_improvements": ["Vary vocabulary " * 20, "Extend answers", "Use more linkers"],
+    "detailed_analyses": {"grammar": {"errors": [
+        {"error": f"error {i}", "correction": f"fix {i}"} for i in range(10)
+    ]}}
+}
+
+
+def test_digest_is_compact_and_fixed_size():
+    digest = build_digest(make_session(), SCORE)
+    assert digest["bands"] == {
+        "overall": 6.0, "fluency": 6.0, "grammar": 5.5, "vocabulary": 6.0, "pronunciation": 6.5
+    }
+    assert digest["top_errors"] == ["error 0 -> fix 0", "error 1 -> fix 1", "error 2 -> fix 2"]
+    assert len(digest["priorities"]) == 2 and len(digest["priorities"][0]) == MAX_TEXT
+    assert digest["repeated_words"][0] == {"word": "job", "count": 5}
+    # A turn answers the question asked at the end of the previous turn
+    assert digest["parts"] == {
+        "1": {"turns": 2, "seconds": 35.0},
+        "2": {"turns": 2, "seconds": 140.0}
+    }
+
+    # Size does not grow with the number of exchanges or errors
+    long_session = make_session()
+    long_session["exchanges"] *= 50
+    assert len(json.dumps(build_digest(long_session, SCORE))) < 1000
+
+
+class RecordingLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def generate_response(self, messages, temperature=0.7, max_tokens=2048):
+        self.prompts.append(messages[0]["content"])
+        return "{}"
+
+
+def test_reflection_reads_the_last_digests(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    store = SessionStore(sessionmaker(bind=engine))
+    for day in range(1, 6):
+        session = make_session(started_at=f"2026-10-0{day}T10:00:00")
+        session_id = f"3_{day}"
+        store.create_session(session_id, session)
+        store.complete_session(session_id, session, SCORE, {"valid": True}, build_digest(session, SCORE))
+
+    digests = store.recent_digests(3, limit=3)
+    assert [d["date"] for d in digests] == ["2026-10-05", "2026-10-04", "2026-10-03"]
+    assert store.recent_digests(4) == []
+
+    llm = RecordingLLM()
+    current = make_session(started_at="2026-10-06T10:00:00")
+    current["exchanges"] *= 50
+    current_digest = build_digest(current, SCORE)
+    ReflectionAgent(llm).generate_reflection(current_digest, store.recent_digests(3, limit=5), history_limit=4)
+    prompt = llm.prompts[0]
+    history = prompt.split("Previous Sessions (digests, newest first): ")[1].splitlines()[0]
+    assert [d["date"] for d in json.loads(history)] == ["2026-10-05", "2026-10-04", "2026-10-03", "2026-10-02"]
+    # The current session is sent as its digest, not its raw exchanges
+    current_line = prompt.split("Current Session (digest): ")[1].splitlines()[0]
+    assert json.loads(current_line) == current_digest and len(current_line) < 1000
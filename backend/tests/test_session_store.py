@@ -0,0 +1,98 @@
+"""
+Tests for persistent IELTS sessions
+"""
+import asyncio
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.database import Base, make_async_engine, make_async_sessionmaker
+from app.db.write_behind import WriteBehindQueue
+from app.models import models
+from app.services.agent_orchestrator import AgentOrchestrator
+from app.services.agents.exam_flow import ExamState
+from app.services.session_store import SessionStore
+
+
+def make_store(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    async_engine = make_async_engine(url, pool_size=1, max_overflow=0)
+    writes = WriteBehindQueue(make_async_sessionmaker(async_engine))
+    return SessionStore(sessionmaker(bind=engine), writes), async_engine
+
+
+def exchange(text, part=1):
+    return {
+        "user_response": text,
+        "metadata": {"duration_seconds": 20},
+        "confidence_analysis": {"confidence_level": "medium"},
+        "examiner_response": {"question": "Why?", "part": part},
+        "timestamp": "2026-10-19T10:00:00"
+    }
+
+
+def test_sessions_survive_a_restart(tmp_path):
+    store, async_engine = make_store(tmp_path)
+    state = ExamState(user_id=7, part2_topic="a book you enjoyed").dict()
+    session = {
+        "user_id": 7, "type": "mock", "started_at": "2026-10-19T09:59:00",
+        "exam": state, "incremental_scoring": True, "exchanges": []
+    }
+    assert store.create_session("7_1", session)
+    store.append_turn("7_1", 0, exchange("I live in Hanoi."), {**state, "part_turns": 1})
+    store.append_turn(
+        "7_1", 1, exchange("I study law.", part=2), {**state, "part": 2},
+        audio_features={"duration_seconds": 21.5}, live_stats={"words_per_minute": 118}
+    )
+    asyncio.run(store.writes.flush())
+
+    # A fresh orchestrator (restart, other worker) picks the session up
+    orchestrator = AgentOrchestrator(store=store)
+    restored = orchestrator.get_session("7_1")
+    assert [ex["user_response"] for ex in restored["exchanges"]] == ["I live in Hanoi.", "I study law."]
+    assert restored["exam"]["part"] == 2 and restored["type"] == "mock"
+    assert restored["exchanges"][1]["examiner_response"]["part"] == 2
+    assert "signals" not in restored["exchanges"][1]
+    # Turn signals come back under int turn indexes
+    assert restored["audio_features"] == {1: {"duration_seconds": 21.5}}
+    assert restored["live_stats"] == {1: {"words_per_minute": 118}}
+
+    score = {
+        "overall_band": "6.5", "fluency_band": "6.0", "grammar_band": "6.5",
+        "vocabulary_band": "7.0", "pronunciation_band": "6.5"
+    }
+    # Queued turns are flushed before a reload reads them
+    store.append_turn("7_1", 2, exchange("Mostly novels.", part=2), {**state, "part": 2, "part_turns": 1})
+    assert len(AgentOrchestrator(store=store).get_session("7_1")["exchanges"]) == 3
+    # A copy cached before another worker took that turn is refreshed
+    assert len(orchestrator.get_session("7_1")["exchanges"]) == 3
+    restored = orchestrator.get_session("7_1")
+
+    assert store.complete_session("7_1", restored, score, {"valid": True})
+    assert store.load_session("7_1") is None  # completed sessions are not resumed
+    # Workers that still cache it stop serving it
+    with pytest.raises(ValueError):
+        orchestrator.get_session("7_1")
+    assert "7_1" not in orchestrator.active_sessions
+
+    history = orchestrator.recent_sessions(7)
+    assert len(history) == 1
+    assert history[0]["overall_band"] == 6.5 and history[0]["turns"] == 3
+    assert orchestrator.recent_sessions(8) == []
+    asyncio.run(async_engine.dispose())
+
+
+def test_storage_failures_do_not_break_sessions(tmp_path):
+    # No tables: every statement fails
+    store = SessionStore(sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'empty.db'}")))
+    session = {
+        "user_id": 1, "type": "practice", "started_at": "2026-10-19T09:59:00",
+        "exam": ExamState(user_id=1).dict(), "exchanges": []
+    }
+    assert not store.create_session("1_1", session)
+    # Turns of an unpersisted session are not queued (they would violate the FK)
+    store.append_turn("1_1", 0, exchange("Hello."), session["exam"])
+    assert not store.writes.has_pending(models.IELTSTurn, session_id="1_1")
+    assert store.load_session("1_1") is None
+    assert store.recent_sessions(1) == []
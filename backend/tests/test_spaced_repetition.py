@@ -0,0 +1,86 @@
+"""
+Tests for SM-2 vocabulary review scheduling
+"""
+import asyncio
+from datetime import datetime, timedelta
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from app.api.routes import router
+from app.db.database import Base, get_async_db, make_async_engine, make_async_sessionmaker
+from app.services.spaced_repetition import MIN_EASINESS, sm2
+
+
+def test_sm2_intervals_grow_and_lapses_restart():
+    state = (0, 2.5, 0)
+    intervals = []
+    for _ in range(4):
+        state = sm2(4, *state)
+        intervals.append(state[2])
+    assert intervals == [1, 6, 15.0, 37.5]
+    assert state[1] == 2.5  # grade 4 keeps easiness
+
+    repetitions, easiness, interval = sm2(1, *state)
+    assert repetitions == 0 and interval == 1 and easiness < 2.5
+
+    # Easiness never drops below the SM-2 floor
+    state = (0, 1.4, 1)
+    for _ in range(5):
+        state = sm2(0, *state)
+    assert state[1] == MIN_EASINESS
+
+    with pytest.raises(ValueError):
+        sm2(6, 0, 2.5, 0)
+
+
+def test_due_items_and_bulk_reviews(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    Base.metadata.create_all(bind=create_engine(url))
+    sessions = make_async_sessionmaker(make_async_engine(url, pool_size=1, max_overflow=0))
+
+    async def override():
+        async with sessions() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_async_db] = override
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            ids = []
+            for word in ("abundant", "candid", "diligent"):
+                saved = await client.post("/vocabulary/save", params={"user_id": 1}, json={
+                    "word": word, "definition": "-", "example": "-", "language": "English"
+                })
+                ids.append(saved.json()["id"])
+
+            due = (await client.get("/users/1/vocabulary/due", params={"limit": 2})).json()
+            assert [item["id"] for item in due] == ids[:2]
+
+            reviewed = await client.post("/vocabulary/reviews", params={"user_id": 1}, json={
+                "reviews": [{"item_id": ids[0], "quality": 5}, {"item_id": ids[1], "quality": 4}]
+            })
+            assert reviewed.status_code == 200
+            first = next(item for item in reviewed.json() if item["id"] == ids[0])
+            assert first["repetitions"] == 1 and first["interval_days"] == 1
+            assert datetime.fromisoformat(first["next_due_at"]) > datetime.utcnow() + timedelta(hours=23)
+
+            due = (await client.get("/users/1/vocabulary/due")).json()
+            assert [item["id"] for item in due] == [ids[2]]
+
+            # One unknown item rejects the whole batch
+            rejected = await client.post("/vocabulary/reviews", params={"user_id": 1}, json={
+                "reviews": [{"item_id": ids[2], "quality": 5}, {"item_id": 999, "quality": 5}]
+            })
+            assert rejected.status_code == 404
+            assert len((await client.get("/users/1/vocabulary/due")).json()) == 1
+
+            invalid = await client.post("/vocabulary/reviews", params={"user_id": 1}, json={
+                "reviews": [{"item_id": ids[2], "quality": 7}]
+            })
+            assert invalid.status_code == 422
+
+    asyncio.run(scenario())
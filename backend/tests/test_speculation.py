@@ -0,0 +1,92 @@
+"""
+Tests for speculative next-question generation
+"""
+import json
+import threading
+from app.core.config import settings
+from app.services.agents.exam_flow import ExamState
+from app.services.agents.examiner_agent import ExaminerAgent
+from app.services.speculation import QuestionSpeculator, speculation_report
+from app.services.question_bank import QuestionBank
+
+
+class CountingLLM:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def generate_response(self, messages, temperature=0.7, max_tokens=2048):
+        with self.lock:
+            self.calls += 1
+            n = self.calls
+        return json.dumps({"question": f"Question {n}?"})
+
+
+def _session(**state):
+    return {"exam": ExamState(**state).dict(), "exchanges": []}
+
+
+def _answer(words):
+    return " ".join(["word"] * words)
+
+
+def test_follow_up_hit_reuses_candidate():
+    llm = CountingLLM()
+    examiner = ExaminerAgent(llm, question_bank=QuestionBank([]))
+    speculator = QuestionSpeculator(examiner, max_workers=2)
+    session = _session()
+
+    assert speculator.speculate("s", session, _answer(30), elapsed_seconds=12) == 1
+    state = ExamState(**session["exam"])
+    result = examiner.process_response(
+        _answer(35), {"duration_seconds": 14}, state,
+        prefetched=lambda st, d, r: speculator.take("s", session, st, d, r)
+    )
+    assert result["action"] == "follow_up"
+    assert result["question"] == "Question 1?"
+    assert llm.calls == 1
+    report = speculation_report(session["speculation"])
+    assert report["hits"] == 1 and report["hit_rate"] == 1.0
+
+
+def test_low_coverage_regenerates_and_other_actions_are_dropped():
+    llm = CountingLLM()
+    examiner = ExaminerAgent(llm, question_bank=QuestionBank([]))
+    speculator = QuestionSpeculator(examiner, max_workers=2)
+    # Third question on the topic near the end of Part 1: ending now switches
+    # topic, a longer answer crosses 4 minutes and moves to Part 2
+    session = _session(topic_turns=2, part_turns=8, part_elapsed_seconds=200)
+
+    assert speculator.speculate("s", session, _answer(20), elapsed_seconds=8) == 2
+    state = ExamState(**session["exam"])
+    result = examiner.process_response(
+        _answer(200), {"duration_seconds": 80}, state,
+        prefetched=lambda st, d, r: speculator.take("s", session, st, d, r)
+    )
+    assert result["action"] == "transition" and result["part"] == 2
+    assert result["question"] in ("Question 1?", "Question 2?")
+    assert speculator.candidates == {}
+
+    # Follow-up candidates that saw too little of the answer are not used
+    session = _session()
+    speculator.speculate("s", session, _answer(16), elapsed_seconds=6)
+    state = ExamState(**session["exam"])
+    result = examiner.process_response(
+        _answer(100), {"duration_seconds": 40}, state,
+        prefetched=lambda st, d, r: speculator.take("s", session, st, d, r)
+    )
+    assert session["speculation"]["misses"] == 1
+    assert result["question"] == f"Question {llm.calls}?"
+
+
+def test_budget_limits_speculative_calls(monkeypatch):
+    monkeypatch.setattr(settings, "speculation_budget", 2)
+    speculator = QuestionSpeculator(ExaminerAgent(CountingLLM(), question_bank=QuestionBank([])), max_workers=1)
+    session = _session()
+    submitted = sum(
+        speculator.speculate("s", session, _answer(words), elapsed_seconds=words / 2.5)
+        for words in (20, 40, 60, 80)
+    )
+    assert submitted == 2
+    assert speculation_report(session["speculation"])["budget_left"] == 0
+    speculator.cancel("s")
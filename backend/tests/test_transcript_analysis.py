@@ -0,0 +1,33 @@
+"""
+Tests for local transcript feature extraction
+"""
+from app.services.transcript_analysis import analyze_transcript, quick_feedback
+
+TRANSCRIPT = (
+    "Um, I think, like, my hometown is, you know, very nice. "
+    "It is nice because the people are nice, although the weather is bad. "
+    "Nice nice. So, er, for example I go to the park when it is sunny"
+)
+
+
+def test_fillers_and_speech_rate():
+    features = analyze_transcript(TRANSCRIPT, duration_seconds=30)
+    assert features.fillers == {"um": 1, "er": 1, "you know": 1, "like": 1}
+    assert features.word_count == 39
+    assert features.words_per_minute == 70.0  # (39 - 4) words in 30 s
+
+
+def test_repetitions_connectors_and_complexity():
+    features = analyze_transcript(TRANSCRIPT)
+    assert features.repetitions == [{"word": "nice", "count": 5, "positions": [10, 13, 18, 24, 25]}]
+    assert features.connectors["for example"] == 1
+    assert features.sentence_count == 4
+    assert features.complex_sentence_ratio == 0.5
+    assert features.words_per_minute is None
+
+
+def test_empty_transcript_and_quick_feedback():
+    assert analyze_transcript("").word_count == 0
+    feedback = quick_feedback(analyze_transcript(TRANSCRIPT, duration_seconds=30))
+    assert any("fillers" in tip for tip in feedback["tips"])
+    assert feedback["features"]["filler_count"] == 4
@@ -0,0 +1,123 @@
+"""
+Tests for write-behind batched persistence
+"""
+import asyncio
+import threading
+from sqlalchemy import create_engine, func, select
+from app.db.database import Base, make_async_engine, make_async_sessionmaker
+from app.db.write_behind import WriteBehindQueue
+from app.models import models
+
+
+def make_queue(tmp_path, **options):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    Base.metadata.create_all(bind=create_engine(url))
+    engine = make_async_engine(url, pool_size=1, max_overflow=0)
+    sessions = make_async_sessionmaker(engine)
+    return WriteBehindQueue(sessions, **options), sessions, engine
+
+
+async def count(sessions, model):
+    async with sessions() as db:
+        return await db.scalar(select(func.count()).select_from(model))
+
+
+def test_rows_are_written_in_batches_and_on_shutdown(tmp_path):
+    writes, sessions, engine = make_queue(tmp_path, batch_size=5, flush_interval=60)
+
+    async def scenario():
+        await writes.start()
+        for i in range(5):
+            writes.add(models.Message, conversation_id=1, role="user", content=f"m{i}")
+        await asyncio.sleep(0.2)  # a full batch wakes the flusher
+        assert await count(sessions, models.Message) == 5
+
+        # Producers on other threads (threadpool routes) are fine too
+        thread = threading.Thread(target=lambda: writes.add(
+            models.GrammarCorrection, original_text="he go", corrected_text="he goes", mistakes=[], language="English"
+        ))
+        thread.start()
+        thread.join()
+        writes.add(models.Message, conversation_id=2, role="user", content="last")
+        assert writes.has_pending(models.Message, conversation_id=2)
+        assert not writes.has_pending(models.Message, conversation_id=1)
+
+        await writes.stop()
+        assert await count(sessions, models.Message) == 6
+        assert await count(sessions, models.GrammarCorrection) == 1
+        await engine.dispose()
+
+    asyncio.run(scenario())
+    assert writes.metrics() == {"queued": 7, "written": 7, "batches": 2, "failures": 0, "dropped": 0, "dead_lettered": 0, "pending": 0}
+
+
+def test_timestamps_are_taken_at_enqueue_and_order_is_kept(tmp_path):
+    writes, sessions, engine = make_queue(tmp_path, batch_size=100, flush_interval=0.05)
+
+    async def scenario():
+        await writes.start()
+        first = writes.add(models.Message, conversation_id=1, role="user", content="first")
+        await asyncio.sleep(0.01)
+        writes.add(models.Message, conversation_id=1, role="assistant", content="second")
+        assert first["created_at"] is not None
+        await asyncio.sleep(0.2)  # flushed by the time window
+        assert writes.metrics()["pending"] == 0
+
+        async with sessions() as db:
+            rows = (await db.scalars(select(models.Message).order_by(models.Message.created_at))).all()
+        assert [r.content for r in rows] == ["first", "second"]
+        await writes.stop()
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_failed_flush_keeps_rows_queued(tmp_path):
+    # No tables in this database, so the INSERT fails
+    engine = make_async_engine(f"sqlite:///{tmp_path / 'empty.db'}", pool_size=1, max_overflow=0)
+    writes = WriteBehindQueue(make_async_sessionmaker(engine))
+
+    async def scenario():
+        writes.add(models.Message, conversation_id=1, role="user", content="kept")
+        await writes.flush()
+        assert writes.has_pending(models.Message, content="kept")
+        assert writes.metrics()["failures"] == 1
+
+        # Bounded while the database stays unreachable
+        writes.max_pending = 3
+        for i in range(5):
+            writes.add(models.Message, conversation_id=1, role="user", content=f"m{i}")
+        await writes.flush()
+        assert writes.metrics()["pending"] == 3 and writes.metrics()["dropped"] == 3
+        assert writes.has_pending(models.Message, content="m4")
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_bad_rows_are_dead_lettered_without_blocking_the_queue(tmp_path):
+    writes, sessions, engine = make_queue(tmp_path, batch_size=100, flush_interval=60)
+    turn = {"session_id": "s1", "part": 1, "user_response": "hi", "exchange": {}, "exam_state": {}}
+
+    async def scenario():
+        writes.add(models.IELTSTurn, turn_index=0, **turn)
+        writes.add(models.IELTSTurn, turn_index=0, **turn)  # duplicate (session_id, turn_index)
+        writes.add(models.IELTSTurn, turn_index=1, **turn)
+        writes.add(models.Message, conversation_id=1, role="user", content="behind")
+        await writes.flush()
+
+        assert await count(sessions, models.IELTSTurn) == 2
+        assert await count(sessions, models.Message) == 1
+        assert writes.metrics()["pending"] == 0
+        [(model, row, error)] = writes.dead_letters
+        assert model is models.IELTSTurn and row["turn_index"] == 0 and "UNIQUE" in error
+
+        # Later flushes are not held back
+        writes.add(models.Message, conversation_id=1, role="user", content="next")
+        await writes.flush_if_pending(models.Message, conversation_id=1)
+        assert await count(sessions, models.Message) == 2
+        await engine.dispose()
+
+    asyncio.run(scenario())
+    metrics = writes.metrics()
+    assert metrics["written"] == 4 and metrics["dead_lettered"] == 1 and metrics["failures"] == 0
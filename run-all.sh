@@ -50,7 +50,8 @@ fi
 echo -e "${BLUE}📡 Starting Backend Server (FastAPI)...${NC}"
 cd backend
 source venv/bin/activate
-uvicorn main:app --reload --port 8000 > ../backend.log 2>&1 &
+alembic upgrade head > ../backend.log 2>&1 || echo -e "${YELLOW}⚠️  Database migrations failed, see backend.log${NC}"
+uvicorn main:app --reload --port 8000 >> ../backend.log 2>&1 &
 BACKEND_PID=$!
 cd ..
 
@@ -176,7 +176,8 @@ class SpeakFluentAPI {
         userId: number,
         quizId: number,
         answers: Record<number, string>
-    ): Promise<{ id: number; score: number; completed_at: string }> {
+    ): Promise<{ id: number | null; score: number; completed_at: string }> {
+        // id is null: the attempt is saved after the response is sent
         return this.request(`/quiz/submit?user_id=${userId}`, {
             method: 'POST',
             body: JSON.stringify({ quiz_id: quizId, answers }),